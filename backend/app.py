@@ -1,13 +1,70 @@
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from backend.routes import health, run, results, limits
+from fastapi.middleware.gzip import GZipMiddleware
+from backend.routes import health, run, runs, results, distribution, limits, history, risk, figures, metrics
+from src.engine.metrics import REQUEST_LATENCY
+from backend.jobs import get_job_manager, shutdown_job_manager
+from src.engine.database import init_db
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema migration runs once at startup, not at the start of every pipeline stage
+    init_db()
+    # Spawn the engine workers now so the first run does not pay for interpreter start-up and imports
+    get_job_manager().start()
+    yield
+    shutdown_job_manager()
+
 
 app = FastAPI(
     title="Quantum–Classical Market Risk API",
     description="Production-style wrapper for portfolio VaR/CVaR engine",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
+# Compresses JSON and streamed binary bodies for clients that send Accept-Encoding: gzip
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+
+class RequestLatencyMiddleware:
+    """
+    Records request latency per route template (not raw path, so run ids do not become separate series),
+    measured until the response headers are sent. Plain ASGI, so streamed bodies pass through untouched.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        started = time.perf_counter()
+
+        async def send_and_record(message):
+            if message["type"] == "http.response.start":
+                route = scope.get("route")
+                REQUEST_LATENCY.observe(
+                    time.perf_counter() - started, method=scope["method"],
+                    route=getattr(route, "path", "unmatched"), status=message["status"],
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_and_record)
+
+
+app.add_middleware(RequestLatencyMiddleware)
+
 app.include_router(health.router)
 app.include_router(run.router)
+app.include_router(runs.router)
 app.include_router(results.router)
-app.include_router(limits.router)
\ No newline at end of file
+app.include_router(distribution.router)
+app.include_router(limits.router)
+app.include_router(history.router)
+app.include_router(risk.router)
+app.include_router(figures.router)
+app.include_router(metrics.router)
\ No newline at end of file
@@ -0,0 +1,119 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from fastapi import HTTPException, Request, Response
+from backend.config import RESULTS_CACHE_ENTRIES, RESULTS_CACHE_BYTES
+from src.engine.scenario_store import (
+    run_dir, latest_run_id, open_run, MANIFEST_NAME, RunNotFoundError
+)
+
+
+class ResultsCache:
+    """
+    LRU of serialized JSON response bodies.
+    Entries are keyed by (endpoint, run id, params) and carry a version, the run manifest's
+    mtime; a manifest rewrite (e.g. limits attached after the scenario stage) invalidates them.
+    """
+
+    def __init__(self, max_entries=RESULTS_CACHE_ENTRIES, max_bytes=RESULTS_CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (version, body)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, version, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[1])
+            self._entries[key] = (version, body)
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+
+results_cache = ResultsCache()
+
+
+def run_version(run_id=None):
+    """Resolves run_id (latest when None) and its manifest mtime with one stat, without decoding anything."""
+    try:
+        run_id = run_id or latest_run_id()
+        return run_id, (run_dir(run_id) / MANIFEST_NAME).stat().st_mtime_ns
+    except (RunNotFoundError, ValueError, FileNotFoundError):
+        raise HTTPException(status_code=404, detail="Risk state not found")
+
+
+def _etag(key, version):
+    digest = hashlib.sha1(repr((key, version)).encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def _not_modified(request, etag):
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def conditional(request: Request, endpoint, run_id, **params):
+    """
+    Resolves the run and its version-derived ETag for a request.
+    Returns (run_id, key, version, headers, not_modified).
+    """
+    run_id, version = run_version(run_id)
+    key = (endpoint, run_id, tuple(sorted(params.items())))
+    etag = _etag(key, version)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    return run_id, key, version, headers, _not_modified(request, etag)
+
+
+def open_run_or_404(run_id):
+    try:
+        return open_run(run_id)
+    except (RunNotFoundError, ValueError):
+        raise HTTPException(status_code=404, detail="Risk state not found")
+
+
+def cached_response(request: Request, endpoint, run_id, build, **params):
+    """
+    Serves build(run) for a run through the cache, with a version-derived ETag.
+    A matching If-None-Match returns 304 before the run is opened or the cache is consulted.
+    """
+    run_id, key, version, headers, not_modified = conditional(request, endpoint, run_id, **params)
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+
+    body = results_cache.get(key, version)
+    if body is None:
+        body = json.dumps(build(open_run_or_404(run_id))).encode()
+        results_cache.put(key, version, body)
+
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -6,4 +6,20 @@ SRC_DIR = PROJECT_ROOT / "src"
 DATA_DIR = PROJECT_ROOT / "data"
 FIGURES_DIR = PROJECT_ROOT / "figures"
 
-RISK_STATE_FILE = DATA_DIR / "risk_state.npz"
+RUNS_DIR = DATA_DIR / "runs"
+
+# Job manager
+ENGINE_EXECUTOR = "process"  # "process": warm worker processes, "thread": in the API process
+RUN_WORKERS = 1          # Concurrent pipelines; keep at 1 for "thread" (pyplot state is process-global)
+MAX_PENDING_RUNS = 8     # Queued + running jobs before POST /run answers 429
+JOB_HISTORY = 200        # Finished jobs kept in memory for /runs/{id}
+
+# Results cache (serialized response bodies, invalidated by run manifest mtime)
+RESULTS_CACHE_ENTRIES = 128
+RESULTS_CACHE_BYTES = 64 * 1024 ** 2
+ARRAY_CHUNK_ROWS = 65_536  # Rows per chunk when streaming binary scenario arrays
+
+# Progress events (Server-Sent Events)
+SSE_POLL_INTERVAL = 0.25       # Seconds between reads of a run's events file
+SSE_HEARTBEAT_SECONDS = 15     # Comment line sent when idle, keeps proxies from closing the stream
+SSE_ORPHAN_SECONDS = 300       # A run no job here tracks is reported failed after this long without new events
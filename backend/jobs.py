@@ -0,0 +1,286 @@
+import logging
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+from functools import partial
+
+from backend.config import ENGINE_EXECUTOR, RUN_WORKERS, MAX_PENDING_RUNS, JOB_HISTORY
+from src.engine.scenario_store import new_run_id
+from src.engine.metrics import REGISTRY, RUNS
+from src.engine.progress import run_started_at
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, SUCCESS, FAILED = "QUEUED", "RUNNING", "SUCCESS", "FAILED"
+
+
+class QueueFullError(RuntimeError):
+    pass
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+# -- worker side -------------------------------------------------------------
+
+# Set in engine worker processes, whose metrics are shipped back to the API with each result
+_in_worker = False
+
+
+def _warm_worker():
+    """Process-pool initializer: pays the heavy imports once per worker, not once per run."""
+    global _in_worker
+    _in_worker = True
+    import matplotlib
+    matplotlib.use("Agg")
+    import pennylane  # noqa: F401
+    import scipy.stats  # noqa: F401
+    import backend.runner  # noqa: F401  (imports every pipeline stage)
+
+
+def _ping():
+    return os.getpid()
+
+
+def _run_pipeline(mode, run_id=None, **params):
+    # Imported here so the API process never loads the engine stack
+    from backend.runner import run_engine_pipeline
+    try:
+        result = run_engine_pipeline(mode, run_id=run_id, **params)
+    except Exception as e:
+        if _in_worker:
+            e.metrics = REGISTRY.drain()  # exception attributes survive pickling
+        raise
+    if _in_worker:
+        # Metrics recorded in this worker since its last run, merged into the API's /metrics
+        result = {**result, "metrics": REGISTRY.drain()}
+    return result
+
+
+# -- API side ----------------------------------------------------------------
+
+class Job:
+    def __init__(self, run_id, mode, params):
+        self.run_id = run_id
+        self.mode = mode
+        self.params = params
+        self.submitted_at = _now()
+        self._started_at = None
+        self.finished_at = None
+        self.coalesced = 0  # Requests served by this job besides the one that created it
+        self.future = None
+        self.outcome = None
+        self.result = None
+        self.error = None
+
+    @property
+    def status(self):
+        if self.outcome is not None:
+            return self.outcome
+        # A process pool marks the next queued call as running slightly early; good enough for polling
+        if self.future is not None and self.future.running():
+            return RUNNING
+        return QUEUED
+
+    @property
+    def done(self):
+        return self.outcome is not None
+
+    @property
+    def started_at(self):
+        """When the pipeline began in its worker, from the run_started event it writes first."""
+        if self._started_at is None and self.future is not None and (self.future.running() or self.future.done()):
+            self._started_at = run_started_at(self.run_id) or (self.result or {}).get("start_time")
+        return self._started_at
+
+    def to_dict(self):
+        return {
+            "run_id": self.run_id,
+            "mode": self.mode,
+            "params": self.params,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "coalesced_requests": self.coalesced,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """
+    Runs engine pipelines on a bounded worker pool.
+    Each accepted request gets a run id. A request identical to one still queued or running
+    (same mode and inputs) is attached to that job instead of starting a second pipeline,
+    and at most MAX_PENDING_RUNS jobs may be waiting or running at once.
+
+    With executor="process" pipelines run in spawned worker processes that import the engine
+    stack up front, so simulation and plotting never hold the API process's GIL. Workers hand
+    results back through the run store and database; only the small execution log is returned.
+    """
+
+    def __init__(self, pipeline=_run_pipeline, executor=ENGINE_EXECUTOR, max_workers=RUN_WORKERS,
+                 max_pending=MAX_PENDING_RUNS, history=JOB_HISTORY, initializer=_warm_worker):
+        if executor not in ("process", "thread"):
+            raise ValueError(f"Unknown engine executor: {executor!r}")
+        self.pipeline = pipeline
+        self.executor_kind = executor
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.history = history
+        self.initializer = initializer
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()  # run_id -> Job, oldest first
+        self._inflight = {}         # coalescing key -> run_id
+        self._executor = None
+        self._warmup = []
+
+    def _make_executor(self):
+        if self.executor_kind == "thread":
+            return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="engine")
+        # spawn, not fork: the API process has live threads (audit writer, DB pool) a fork would copy
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=self.initializer,
+        )
+
+    def start(self):
+        """Creates the pool and, for processes, spawns every worker now rather than on the first run."""
+        with self._lock:
+            self._start_locked()
+
+    def _start_locked(self):
+        if self._executor is None:
+            self._executor = self._make_executor()
+            if self.executor_kind == "process":
+                self._warmup = [self._executor.submit(_ping) for _ in range(self.max_workers)]
+
+    def readiness(self):
+        """
+        "STOPPED" before start(), "WARMING" while workers are still importing the engine stack,
+        "FAILED" if a worker died during warm-up (the next submit replaces the pool), else "READY".
+        """
+        if self._executor is None:
+            return "STOPPED"
+        if not all(f.done() for f in self._warmup):
+            return "WARMING"
+        if any(f.exception() is not None for f in self._warmup):
+            return "FAILED"
+        return "READY"
+
+    def warmed_up(self):
+        return self.readiness() == "READY"
+
+    @staticmethod
+    def _key(mode, params):
+        return (mode, tuple(sorted(params.items())))
+
+    def submit(self, mode, **params):
+        """Returns (job, coalesced). Raises QueueFullError when the pending limit is reached."""
+        params = {k: v for k, v in params.items() if v is not None}
+        key = self._key(mode, params)
+        with self._lock:
+            run_id = self._inflight.get(key)
+            if run_id is not None:
+                job = self._jobs[run_id]
+                job.coalesced += 1
+                return job, True
+
+            if len(self._inflight) >= self.max_pending:
+                raise QueueFullError(f"{len(self._inflight)} runs already pending")
+
+            job = Job(new_run_id(), mode, params)
+            self._start_locked()
+            try:
+                future = self._executor.submit(self.pipeline, mode, run_id=job.run_id, **params)
+            except BrokenProcessPool:
+                # A worker died earlier; replace the pool once and retry
+                self._executor = None
+                self._start_locked()
+                future = self._executor.submit(self.pipeline, mode, run_id=job.run_id, **params)
+
+            job.future = future
+            executor = self._executor
+            self._jobs[job.run_id] = job
+            self._inflight[key] = job.run_id
+            self._trim()
+
+        future.add_done_callback(partial(self._finish, job, key, executor))
+        return job, False
+
+    def _finish(self, job, key, executor, future):
+        try:
+            job.result = future.result()
+            if isinstance(job.result, dict):
+                REGISTRY.merge(job.result.pop("metrics", None))
+            job.outcome = SUCCESS
+        except Exception as e:
+            logger.error("Run %s failed: %s", job.run_id, e)
+            REGISTRY.merge(getattr(e, "metrics", None))
+            job.error = str(e) or type(e).__name__
+            job.outcome = FAILED
+            if isinstance(e, BrokenProcessPool):
+                # The worker died before the runner could count the run
+                RUNS.inc(mode=job.mode, status="CRASHED")
+                # Replace the dead pool now (once, whichever of its jobs finishes first), so
+                # readiness reports the new workers warming up instead of a pool that cannot run
+                with self._lock:
+                    if self._executor is executor:
+                        self._executor = None
+                        self._start_locked()
+        finally:
+            job.finished_at = _now()
+            with self._lock:
+                if self._inflight.get(key) == job.run_id:
+                    del self._inflight[key]
+
+    def _trim(self):
+        # Forget the oldest finished jobs; their results stay in the run store and database
+        finished = [rid for rid, job in self._jobs.items() if job.done]
+        for rid in finished[: max(0, len(self._jobs) - self.history)]:
+            del self._jobs[rid]
+
+    def get(self, run_id):
+        with self._lock:
+            return self._jobs.get(run_id)
+
+    def pending(self):
+        """Jobs queued or running."""
+        with self._lock:
+            return len(self._inflight)
+
+    def list_jobs(self):
+        with self._lock:
+            return [job.to_dict() for job in reversed(self._jobs.values())]
+
+    def shutdown(self, wait=False):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager():
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
+
+
+def shutdown_job_manager():
+    global _manager
+    with _manager_lock:
+        if _manager is not None:
+            _manager.shutdown()
+            _manager = None
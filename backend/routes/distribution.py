@@ -0,0 +1,125 @@
+from typing import Optional
+
+import numpy as np
+from fastapi import APIRouter, HTTPException, Query, Request
+from src.engine.risk_metrics import calculate_var_cvar, calculate_weighted_var_cvar, weighted_quantile
+from backend.cache import cached_response
+from backend.routes.results import SERIES, _parse_series
+
+router = APIRouter()
+
+DEFAULT_QUANTILES = "0.001,0.01,0.025,0.05,0.1,0.25,0.5,0.75,0.9,0.95,0.99"
+
+
+def _load(run, name):
+    """Portfolio returns for one series plus its likelihood-ratio weights (None unless importance-sampled)."""
+    values_name, weights_name = SERIES[name]
+    values = np.asarray(run.array(values_name), dtype=np.float64)
+    weights = np.asarray(run.array(weights_name), dtype=np.float64) if run.has_array(weights_name) else None
+    return values, weights
+
+
+def histogram_payload(run, names, bins):
+    loaded = {name: _load(run, name) for name in names}
+    lo = min(values.min() for values, _ in loaded.values())
+    hi = max(values.max() for values, _ in loaded.values())
+    # Shared edges so the series overlay bin for bin
+    edges = np.linspace(lo, hi, bins + 1)
+
+    series = {}
+    for name, (values, weights) in loaded.items():
+        counts, _ = np.histogram(values, bins=edges, weights=weights)
+        series[name] = {
+            "counts": counts.tolist(),
+            "n": int(values.size),
+            "weighted": weights is not None,
+        }
+    return {"run_id": run.run_id, "edges": edges.tolist(), "series": series}
+
+
+def quantiles_payload(run, names, levels):
+    series = {}
+    for name in names:
+        values, weights = _load(run, name)
+        if weights is None:
+            series[name] = np.quantile(values, levels).tolist()
+        else:
+            series[name] = [float(weighted_quantile(values, weights, q)) for q in levels]
+    return {"run_id": run.run_id, "levels": list(levels), "series": series}
+
+
+def tail_payload(run, names, confidence, max_points):
+    """Losses beyond VaR, worst first, evenly thinned to at most max_points (extremes always kept)."""
+    series = {}
+    for name in names:
+        values, weights = _load(run, name)
+        if weights is None:
+            var, cvar = calculate_var_cvar(values, confidence)
+        else:
+            var, cvar = calculate_weighted_var_cvar(values, weights, confidence)
+
+        tail_idx = np.flatnonzero(values <= -var)
+        tail_idx = tail_idx[np.argsort(values[tail_idx])]
+        if tail_idx.size > max_points:
+            tail_idx = tail_idx[np.unique(np.linspace(0, tail_idx.size - 1, max_points).round().astype(int))]
+
+        entry = {
+            "VaR": float(var),
+            "CVaR": float(cvar),
+            "tail_count": int(np.count_nonzero(values <= -var)),
+            "returns": values[tail_idx].tolist(),
+        }
+        if weights is not None:
+            entry["weights"] = weights[tail_idx].tolist()
+        series[name] = entry
+    return {"run_id": run.run_id, "confidence": confidence, "series": series}
+
+
+@router.get("/results/distribution/histogram")
+def distribution_histogram(
+    request: Request,
+    run_id: Optional[str] = None,
+    series: str = "quantum,classical",
+    bins: int = Query(50, ge=1, le=1000),
+):
+    names = _parse_series(series)
+    return cached_response(
+        request, "histogram", run_id, lambda run: histogram_payload(run, names, bins),
+        series=tuple(names), bins=bins,
+    )
+
+
+@router.get("/results/distribution/quantiles")
+def distribution_quantiles(
+    request: Request,
+    run_id: Optional[str] = None,
+    series: str = "quantum,classical",
+    q: str = DEFAULT_QUANTILES,
+):
+    names = _parse_series(series)
+    try:
+        levels = tuple(float(level) for level in q.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid quantile levels: {q!r}")
+    if not levels or any(not 0.0 <= level <= 1.0 for level in levels):
+        raise HTTPException(status_code=400, detail="Quantile levels must lie in [0, 1]")
+
+    return cached_response(
+        request, "quantiles", run_id, lambda run: quantiles_payload(run, names, levels),
+        series=tuple(names), q=levels,
+    )
+
+
+@router.get("/results/distribution/tail")
+def distribution_tail(
+    request: Request,
+    run_id: Optional[str] = None,
+    series: str = "quantum,classical",
+    confidence: float = Query(0.99, gt=0.5, lt=1.0),
+    max_points: int = Query(500, ge=2, le=10_000),
+):
+    names = _parse_series(series)
+    return cached_response(
+        request, "tail", run_id, lambda run: tail_payload(run, names, confidence, max_points),
+        series=tuple(names), confidence=confidence, max_points=max_points,
+    )
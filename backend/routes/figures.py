@@ -0,0 +1,39 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from src.engine.config import FIGURE_DPI, FIGURE_MAX_DPI
+from src.engine.figures import FIGURES, FigureUnavailableError, available_figures, render_figure
+from backend.cache import conditional, open_run_or_404
+
+router = APIRouter()
+
+
+@router.get("/figures")
+def list_figures(run_id: Optional[str] = None):
+    run = open_run_or_404(run_id)
+    return {"run_id": run.run_id, "available_figures": available_figures(run)}
+
+
+@router.get("/figures/{name}")
+def get_figure(
+    request: Request,
+    name: str,
+    run_id: Optional[str] = None,
+    dpi: int = Query(FIGURE_DPI, ge=50, le=FIGURE_MAX_DPI),
+):
+    """
+    One figure of a run as PNG, rendered from the run's stored data on first request
+    and served from the run directory afterwards.
+    """
+    if name not in FIGURES:
+        raise HTTPException(status_code=404, detail=f"Unknown figure {name!r}; expected one of {sorted(FIGURES)}")
+    run_id, _, _, headers, not_modified = conditional(request, f"figure:{name}", run_id, dpi=dpi)
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+
+    run = open_run_or_404(run_id)
+    try:
+        png = render_figure(run, name, dpi)
+    except FigureUnavailableError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return Response(content=png, media_type="image/png", headers=headers)
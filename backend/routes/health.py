@@ -1,9 +1,14 @@
-from fastapi import APIRouter
-from backend.schemas import HealthResponse
+import time
+
+from fastapi import APIRouter, Response
+from backend.schemas import HealthResponse, ReadyResponse
 from backend.config import SRC_DIR
+from backend.jobs import get_job_manager
 
 router = APIRouter()
 
+_STARTED = time.monotonic()
+
 
 @router.get("/health", response_model=HealthResponse)
 def health_check():
@@ -27,3 +32,21 @@ def health_check():
         engine_available=True,
         message="Risk engine files detected",
     )
+
+
+@router.get("/ready", response_model=ReadyResponse)
+def readiness_check(response: Response):
+    """
+    Readiness: 200 once the engine workers have finished importing the pipeline, 503 before that
+    (or if warm-up failed). /health stays a cheap liveness check that never touches the engine.
+    """
+    manager = get_job_manager()
+    status = manager.readiness()
+    if status != "READY":
+        response.status_code = 503
+    return ReadyResponse(
+        status=status,
+        executor=manager.executor_kind,
+        workers=manager.max_workers,
+        uptime_sec=round(time.monotonic() - _STARTED, 3),
+    )
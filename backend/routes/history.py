@@ -0,0 +1,53 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from src.engine.database import (
+    list_runs, get_run, get_run_metrics, get_run_attribution, get_backtest_series, get_metric_history
+)
+
+router = APIRouter()
+
+
+def _page(fetch, *args, **kwargs):
+    try:
+        return fetch(*args, **kwargs)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/history/runs")
+def history_runs(limit: int = Query(50, ge=1, le=500), cursor: Optional[str] = None):
+    items, next_cursor = _page(list_runs, limit=limit, cursor=cursor)
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/history/runs/{run_id}")
+def history_run(run_id: str):
+    run = get_run(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
+    return {
+        **run,
+        "metrics": get_run_metrics(run_id),
+        "attribution": get_run_attribution(run_id),
+    }
+
+
+@router.get("/history/runs/{run_id}/backtest")
+def history_backtest(run_id: str, after_day: int = -1, limit: int = Query(500, ge=1, le=5000)):
+    items, next_after = get_backtest_series(run_id, after_day=after_day, limit=limit)
+    return {"items": items, "next_after_day": next_after}
+
+
+@router.get("/history/metrics")
+def history_metrics(
+    engine: str = "quantum",
+    confidence: float = 0.99,
+    horizon_days: int = 1,
+    limit: int = Query(250, ge=1, le=5000),
+    cursor: Optional[str] = None,
+):
+    items, next_cursor = _page(
+        get_metric_history, engine, confidence, horizon_days, limit=limit, cursor=cursor
+    )
+    return {"items": items, "next_cursor": next_cursor}
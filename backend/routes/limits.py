@@ -1,14 +1,23 @@
 import json
-from fastapi import APIRouter, HTTPException
-from pathlib import Path
+from typing import Optional
 
-router = APIRouter()
+from fastapi import APIRouter, HTTPException, Query
+from src.engine.config import LIMITS_FILE
+from src.engine.database import get_limit_results
+from src.engine.limits_tree import STATUSES
+from backend.cache import open_run_or_404
 
-LIMITS_FILE = Path("data") / "risk_limits.json"
+router = APIRouter()
 
 
 @router.get("/results/limits")
-def get_risk_limits():
+def get_risk_limits(run_id: Optional[str] = None):
+    if run_id is not None:
+        limits = open_run_or_404(run_id).manifest.get("limits")
+        if limits is None:
+            raise HTTPException(status_code=404, detail=f"Run {run_id} has no limit check")
+        return limits
+
     if not LIMITS_FILE.exists():
         raise HTTPException(
             status_code=404,
@@ -16,4 +25,26 @@ def get_risk_limits():
         )
 
     with open(LIMITS_FILE, "r") as f:
-        return json.load(f)
\ No newline at end of file
+        return json.load(f)
+
+
+@router.get("/results/limits/tree")
+def get_limit_tree(
+    run_id: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    cursor: Optional[str] = None,
+):
+    """Summary of the hierarchical limit check plus one page of per-node rows, optionally filtered by status."""
+    if status is not None and status not in STATUSES:
+        raise HTTPException(status_code=400, detail=f"Unknown status {status!r}; expected one of {list(STATUSES)}")
+    run = open_run_or_404(run_id)
+    summary = run.manifest.get("limit_tree")
+    if summary is None:
+        raise HTTPException(status_code=404, detail=f"Run {run.run_id} has no limit tree results")
+
+    try:
+        items, next_cursor = get_limit_results(run.run_id, status=status, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"run_id": run.run_id, "summary": summary, "items": items, "next_cursor": next_cursor}
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Response
+from src.engine.metrics import REGISTRY
+from src.engine.batch_risk import result_cache, simulate_universe
+from src.engine.audit import get_audit_writer
+from backend.cache import results_cache
+from backend.jobs import get_job_manager
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@REGISTRY.collector
+def cache_metrics():
+    # The caches keep their own hit/miss counts; they are read here instead of counted twice
+    universe = simulate_universe.cache_info()
+    caches = {
+        "results": results_cache.stats(),
+        "risk_results": result_cache.stats(),
+        "risk_universes": {"hits": universe.hits, "misses": universe.misses, "entries": universe.currsize},
+    }
+    return [
+        ("risk_cache_requests_total", "counter", "Cache lookups by cache and result.", [
+            ({"cache": name, "result": result}, stats[f"{result}es" if result == "miss" else f"{result}s"])
+            for name, stats in caches.items() for result in ("hit", "miss")
+        ]),
+        ("risk_cache_entries", "gauge", "Entries held per cache.", [
+            ({"cache": name}, stats["entries"]) for name, stats in caches.items()
+        ]),
+    ]
+
+
+@REGISTRY.collector
+def service_metrics():
+    manager = get_job_manager()
+    audit = get_audit_writer().stats()
+    return [
+        ("risk_engine_ready", "gauge", "1 when the engine workers are warm (GET /ready).", [
+            ({}, int(manager.readiness() == "READY")),
+        ]),
+        ("risk_runs_pending", "gauge", "Runs queued or running.", [({}, manager.pending())]),
+        ("risk_audit_queue_depth", "gauge", "Audit rows waiting to be written by the API process.", [
+            ({}, audit["queue_depth"]),
+        ]),
+    ]
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    """Engine and API metrics in the Prometheus text exposition format, including engine workers' runs."""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
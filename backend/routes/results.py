@@ -1,70 +1,176 @@
+from typing import Optional
+
 import numpy as np
-from fastapi import APIRouter, HTTPException
-from src.engine.database import get_connection
-from backend.config import RISK_STATE_FILE, FIGURES_DIR
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from src.engine.database import fetch_all
+from backend.cache import cached_response, conditional, open_run_or_404, run_version
+from src.engine.figures import available_figures
+from backend.config import ARRAY_CHUNK_ROWS
+from backend import transport
 
 router = APIRouter()
 
-@router.get("/results/summary")
-def results_summary():
-    if not RISK_STATE_FILE.exists():
-        raise HTTPException(status_code=404, detail="Risk state not found")
-
-    data = np.load(RISK_STATE_FILE)
 
+def summary_payload(run):
+    data = run.metrics
     return {
+        "run_id": run.run_id,
         "portfolio": {
             "quantum": {
-                "VaR": float(data["q_port_VaR"]),
-                "CVaR": float(data["q_port_CVaR"]),
-                "MVaR": data["q_mvar"].tolist(),
-                "ComponentVaR": data["q_comp_var"].tolist(),
+                "VaR": data["q_port_VaR"],
+                "CVaR": data["q_port_CVaR"],
+                "MVaR": data["q_mvar"],
+                "ComponentVaR": data["q_comp_var"],
             },
             "classical": {
-                "VaR": float(data["c_port_VaR"]),
-                "CVaR": float(data["c_port_CVaR"]),
+                "VaR": data["c_port_VaR"],
+                "CVaR": data["c_port_CVaR"],
             },
         },
-        "tickers": data["tickers"].tolist() if "tickers" in data else []
+        "tickers": run.manifest.get("tickers", []),
     }
 
 
+SERIES = {
+    "quantum": ("portfolio_returns_q", "q_lr_weights"),
+    "classical": ("portfolio_returns_c", "c_lr_weights"),
+}
+
+
+def _parse_series(series):
+    names = [name.strip() for name in series.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SERIES]
+    if not names or unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown series {unknown}; expected {sorted(SERIES)}")
+    return names
+
+
+def arrays_payload(run, start=0, stop=None, names=("quantum", "classical")):
+    # Memory-mapped: only the requested slice is read from disk
+    window = slice(start, stop)
+    payload = {"run_id": run.run_id}
+    for name in names:
+        payload[f"portfolio_returns_{name}"] = run.array(SERIES[name][0])[window].tolist()
+    return payload
+
+
+def backtest_payload(run):
+    backtest = run.manifest.get("backtest")
+    if backtest is not None:
+        return backtest
+
+    # Runs stored before backtest summaries were kept in the manifest
+    rows = fetch_all(
+        'SELECT * FROM backtest_results WHERE run_id = ? ORDER BY timestamp DESC LIMIT 1', (run.run_id,)
+    )
+    if not rows:
+        raise HTTPException(status_code=404, detail=f"No backtest results for run {run.run_id}")
+    return rows[0]
+
+
+def figures_payload(run):
+    # Names for GET /figures/{name}; each is rendered on first request
+    return {"run_id": run.run_id, "available_figures": available_figures(run)}
+
+
+@router.get("/results/latest")
+def results_latest(run_id: Optional[str] = None):
+    """
+    The latest run (or run_id) and its version, from one stat and no file reads.
+    The version changes whenever the run's stored results do, so clients can key caches on it.
+    """
+    run_id, version = run_version(run_id)
+    return {"run_id": run_id, "version": str(version)}
+
+
+@router.get("/results/summary")
+def results_summary(request: Request, run_id: Optional[str] = None):
+    return cached_response(request, "summary", run_id, summary_payload)
+
+
 @router.get("/results/arrays")
-def results_arrays():
-    if not RISK_STATE_FILE.exists():
-        raise HTTPException(status_code=404, detail="Risk state not found")
+def results_arrays(
+    request: Request,
+    run_id: Optional[str] = None,
+    start: int = 0,
+    stop: Optional[int] = None,
+    series: str = "quantum,classical",
+    fmt: Optional[str] = Query(None, alias="format"),
+    dtype: str = Query("float32", pattern="^(float32|float64)$"),
+):
+    """
+    Scenario portfolio returns, content-negotiated via Accept (or ?format=):
+    JSON lists (default), raw little-endian (rows, series) matrix, .npy, or an Arrow IPC stream.
+    Binary bodies are streamed chunk by chunk from the memory-mapped arrays.
+    """
+    names = _parse_series(series)
+    try:
+        media = transport.negotiate(request.headers.get("accept"), fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if media == transport.MEDIA_JSON:
+        return cached_response(
+            request, "arrays", run_id, lambda run: arrays_payload(run, start, stop, names),
+            start=start, stop=stop, series=tuple(names),
+        )
+    if media == transport.MEDIA_ARROW and not transport.arrow_available():
+        raise HTTPException(status_code=406, detail="Arrow IPC requires pyarrow on the server")
 
-    data = np.load(RISK_STATE_FILE)
+    run_id, _, _, headers, not_modified = conditional(
+        request, f"arrays:{media}", run_id, start=start, stop=stop, series=tuple(names), dtype=dtype
+    )
+    if not_modified:
+        return Response(status_code=304, headers=headers)
 
-    return {
-        "portfolio_returns_quantum": data["portfolio_returns_q"].tolist(),
-        "portfolio_returns_classical": data["portfolio_returns_c"].tolist(),
-    }
+    run = open_run_or_404(run_id)
+    window = slice(start, stop)
+    arrays = [run.array(SERIES[name][0])[window] for name in names]
+    wire_dtype = np.dtype(dtype).newbyteorder("<")
+    headers.update({
+        "X-Run-Id": run.run_id,
+        "X-Array-Columns": ",".join(names),
+        "X-Array-Shape": f"{len(arrays[0])},{len(names)}",
+        "X-Array-Dtype": wire_dtype.str,
+    })
+
+    if media == transport.MEDIA_RAW:
+        chunks = transport.raw_chunks(arrays, wire_dtype, ARRAY_CHUNK_ROWS)
+    elif media == transport.MEDIA_NPY:
+        chunks = transport.npy_chunks(arrays, wire_dtype, ARRAY_CHUNK_ROWS)
+    else:
+        chunks = transport.arrow_chunks(names, arrays, wire_dtype, ARRAY_CHUNK_ROWS)
+    return StreamingResponse(chunks, media_type=media, headers=headers)
 
 
 @router.get("/results/figures")
-def results_figures():
-    if not FIGURES_DIR.exists():
-        raise HTTPException(status_code=404, detail="Figures directory missing")
+def results_figures(request: Request, run_id: Optional[str] = None):
+    return cached_response(request, "figures", run_id, figures_payload)
 
-    return {
-        "available_figures": sorted(
-            f.name for f in FIGURES_DIR.glob("*.png")
-        )
-    }
 
 @router.get("/results/backtest")
-def results_backtest():
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM backtest_results ORDER BY timestamp DESC LIMIT 1')
-    row = cursor.fetchone()
-    
-    if not row:
-        conn.close()
-        raise HTTPException(status_code=404, detail="No backtest results found")
-        
-    col_names = [description[0] for description in cursor.description]
-    conn.close()
-    
-    return dict(zip(col_names, row))
+def results_backtest(request: Request, run_id: Optional[str] = None):
+    return cached_response(request, "backtest", run_id, backtest_payload)
+
+
+@router.get("/results/bundle")
+def results_bundle(request: Request, run_id: Optional[str] = None, include_arrays: bool = False):
+    """Everything the dashboard renders for one run, in a single cached response."""
+
+    def build(run):
+        bundle = {
+            "run_id": run.run_id,
+            "summary": summary_payload(run),
+            "limits": run.manifest.get("limits"),
+            "figures": figures_payload(run),
+        }
+        try:
+            bundle["backtest"] = backtest_payload(run)
+        except HTTPException:
+            bundle["backtest"] = None
+        if include_arrays:
+            bundle["arrays"] = arrays_payload(run)
+        return bundle
+
+    return cached_response(request, "bundle", run_id, build, include_arrays=include_arrays)
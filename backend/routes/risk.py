@@ -0,0 +1,31 @@
+import time
+
+from fastapi import APIRouter
+from backend.schemas import RiskRequest
+from src.engine.batch_risk import compute_batch, data_date, result_cache
+
+router = APIRouter()
+
+
+@router.post("/risk")
+def portfolio_risk(request: RiskRequest):
+    """
+    VaR/CVaR for a batch of portfolios. Each distinct ticker universe is calibrated and
+    simulated once per data date; repeated portfolios are served from the result cache.
+    """
+    start = time.perf_counter()
+    as_of = data_date()
+    portfolios = [p.model_dump() for p in request.portfolios]
+    results, simulated = compute_batch(portfolios, mode=request.mode, as_of=as_of)
+
+    return {
+        "data_date": as_of,
+        "mode": request.mode,
+        "universes_evaluated": simulated,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+        "cache": result_cache.stats(),
+        "portfolios": [
+            {"id": p["id"], "weights": dict(zip(p["tickers"], p["weights"])), **result}
+            for p, result in zip(portfolios, results)
+        ],
+    }
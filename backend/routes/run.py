@@ -1,21 +1,49 @@
-from fastapi import APIRouter, BackgroundTasks, HTTPException
-from backend.runner import run_engine_pipeline, EngineExecutionError
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from backend.jobs import get_job_manager, QueueFullError
+from src.engine.config import SAMPLER
+from src.engine.profiling import parse_options
 
 router = APIRouter()
 
-def execute_pipeline_task(mode: str):
-    try:
-        run_engine_pipeline(mode)
-    except Exception as e:
-        print(f"Background execution failed: {e}")
 
 @router.post("/run")
-def run_risk_engine(background_tasks: BackgroundTasks, mode: str = "FULL"):
+def run_risk_engine(
+    mode: str = Query("FULL", pattern="^(FAST|FULL|ADAPTIVE)$"),
+    importance_sampling: Optional[bool] = None,
+    figures: Optional[bool] = None,
+    profile: Optional[str] = None,
+):
     """
-    Triggers the risk engine pipeline to run asynchronously in the background.
+    Queues the risk engine pipeline and returns its run id.
+    mode=ADAPTIVE grows the scenario count until the VaR/CVaR standard error meets ADAPTIVE_TARGET_REL_ERROR.
+    An identical request that is still queued or running is joined instead of started again.
+    figures=true also renders every figure at the end of the run (default: RENDER_FIGURES);
+    otherwise they are rendered on first request to /figures/{name}.
+    profile=spans,cprofile,tracemalloc (or all, or off) overrides PROFILE for this run; see GET /runs/{run_id}/profile.
     """
-    background_tasks.add_task(execute_pipeline_task, mode)
+    if importance_sampling and SAMPLER != "structured":
+        raise HTTPException(
+            status_code=400, detail=f"importance_sampling requires the structured sampler (SAMPLER={SAMPLER!r})"
+        )
+    if profile is not None:
+        try:
+            profile = ",".join(sorted(parse_options(profile))) or "off"
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    try:
+        job, coalesced = get_job_manager().submit(
+            mode, importance_sampling=importance_sampling, figures=figures, profile=profile
+        )
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=f"Too many pending runs: {e}")
+
     return {
         "status": "ACCEPTED",
-        "message": f"Risk engine started in {mode} mode. Check results/summary when complete.",
+        "run_id": job.run_id,
+        "job_status": job.status,
+        "coalesced": coalesced,
+        "message": f"Risk engine {'already running' if coalesced else 'started'} in {mode} mode. "
+                   f"Poll /runs/{job.run_id} for status.",
     }
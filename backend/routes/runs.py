@@ -0,0 +1,160 @@
+import asyncio
+import json
+import time
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import FileResponse, StreamingResponse
+from backend.jobs import get_job_manager, SUCCESS
+from backend.cache import open_run_or_404
+from backend.config import SSE_POLL_INTERVAL, SSE_HEARTBEAT_SECONDS, SSE_ORPHAN_SECONDS
+from backend.routes.results import summary_payload
+from src.engine.database import get_run
+from src.engine.progress import read_events, EVENTS_NAME, TERMINAL_EVENTS
+from src.engine.profiling import read_profile, PSTATS_NAME, TRACEMALLOC_NAME
+from src.engine.scenario_store import run_dir
+
+router = APIRouter()
+
+
+@router.get("/runs")
+def list_jobs():
+    """Jobs known to this API process, newest first. Older runs are in /history/runs."""
+    return {"items": get_job_manager().list_jobs()}
+
+
+@router.get("/runs/{run_id}")
+def run_status(run_id: str):
+    job = get_job_manager().get(run_id)
+    if job is not None:
+        return job.to_dict()
+
+    # Not submitted through this process (or forgotten): fall back to the run history
+    run = get_run(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
+    return {"run_id": run_id, "mode": run["mode"], "status": run["status"]}
+
+
+@router.get("/runs/{run_id}/results")
+def run_results(run_id: str):
+    job = get_job_manager().get(run_id)
+    if job is not None and job.status != SUCCESS:
+        raise HTTPException(status_code=409, detail=f"Run {run_id} is {job.status}: {job.error or 'not finished'}")
+
+    run = open_run_or_404(run_id)
+    return {
+        **summary_payload(run),
+        "limits": run.manifest.get("limits"),
+        "execution": job.result if job is not None else None,
+    }
+
+
+@router.get("/runs/{run_id}/profile")
+def run_profile(run_id: str, format: str = Query("json", pattern="^(json|pstats|tracemalloc)$")):
+    """
+    Where a profiled run spent its time: timing spans per stage, plus the top cProfile functions and
+    tracemalloc allocation sites when those were captured. format=pstats|tracemalloc downloads the raw
+    snapshot (load with pstats.Stats / tracemalloc.Snapshot.load).
+    """
+    try:
+        directory = run_dir(run_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
+    if format != "json":
+        path = directory / (PSTATS_NAME if format == "pstats" else TRACEMALLOC_NAME)
+        if not path.exists():
+            raise HTTPException(status_code=404, detail=f"Run {run_id} has no {format} snapshot")
+        return FileResponse(path, media_type="application/octet-stream", filename=f"{run_id}.{format}")
+
+    profile = read_profile(run_id)
+    if profile is None:
+        job = get_job_manager().get(run_id)
+        if job is not None and not job.done:
+            raise HTTPException(status_code=409, detail=f"Run {run_id} is {job.status}; its profile is written when it ends")
+        raise HTTPException(status_code=404, detail=f"Run {run_id} was not profiled (POST /run?profile=spans)")
+    return profile
+
+
+def _sse(event):
+    return f"id: {event['seq']}\nevent: {event['event']}\ndata: {json.dumps(event)}\n\n"
+
+
+def _orphan_failure(run_id, events_path):
+    """
+    Why a run no job in this process tracks (e.g. after an API restart) will never send a final
+    event, or None while it may still be running: its history row says FAILED, or its events file
+    has not changed for SSE_ORPHAN_SECONDS (the worker died).
+    """
+    run = get_run(run_id)
+    if run is not None and run["status"] == "FAILED":
+        return "Run failed"
+    try:
+        idle = time.time() - events_path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+    if idle > SSE_ORPHAN_SECONDS:
+        return f"No progress for {idle:.0f} s; the worker running it is gone"
+    return None
+
+
+@router.get("/runs/{run_id}/events")
+async def run_events(run_id: str, request: Request):
+    """
+    Server-Sent Events stream of a run's progress (stage start/finish, throughput, ETA),
+    ending with run_finished or run_failed. Reconnecting clients resume after Last-Event-ID.
+    A run no job in this process tracks ends with run_failed once it is known to have failed or stalls.
+    """
+    try:
+        events_path = run_dir(run_id) / EVENTS_NAME
+    except ValueError:
+        raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
+    manager = get_job_manager()
+    if manager.get(run_id) is None and not events_path.exists():
+        raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
+
+    try:
+        last_seq = int(request.headers.get("last-event-id", 0))
+    except ValueError:
+        last_seq = 0
+
+    async def stream():
+        offset = 0
+        seen = last_seq
+        last_sent = time.monotonic()
+        last_checked = float("-inf")
+        yield "retry: 2000\n\n"
+        while True:
+            job = manager.get(run_id)
+            job_done = job is not None and job.done
+            events, offset = read_events(run_id, offset)
+            for event in events:
+                if event["seq"] <= seen:
+                    continue
+                seen = event["seq"]
+                yield _sse(event)
+                last_sent = time.monotonic()
+                if event["event"] in TERMINAL_EVENTS:
+                    return
+
+            if job_done:
+                # The job ended (and its file was fully read) without a final event, e.g. a worker crash
+                final = "run_finished" if job.status == SUCCESS else "run_failed"
+                yield _sse({"seq": seen + 1, "event": final, "status": job.status, "error": job.error})
+                return
+            if await request.is_disconnected():
+                return
+            if job is None and time.monotonic() - last_checked > SSE_HEARTBEAT_SECONDS:
+                error = _orphan_failure(run_id, events_path)
+                if error is not None:
+                    yield _sse({"seq": seen + 1, "event": "run_failed", "status": "FAILED", "error": error})
+                    return
+                last_checked = time.monotonic()
+            if time.monotonic() - last_sent > SSE_HEARTBEAT_SECONDS:
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+            await asyncio.sleep(SSE_POLL_INTERVAL)
+
+    return StreamingResponse(
+        stream(), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
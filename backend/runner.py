@@ -6,73 +6,137 @@ from src.scenario_portfolio_risk import run_scenario_risk
 from src.risk_limits import run_risk_limits
 from src.backtesting import run_backtesting
 from src.stress_testing import run_stress_testing
+from src.engine.scenario_store import new_run_id, list_runs, read_manifest, update_manifest, open_run, RunNotFoundError
+from src.engine.figures import export_figures
+from src.engine.config import RENDER_FIGURES
+from src.engine.database import record_run
+from src.engine.audit import get_audit_writer
+from src.engine.progress import get_reporter, release_reporter
+from src.engine.profiling import start_profile, stop_profile
+from src.engine.metrics import STAGE_DURATION, RUN_DURATION, RUNS
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Runs scanned for stage timings when estimating the remaining time of a new run
+ETA_LOOKBACK_RUNS = 5
+
 class EngineExecutionError(RuntimeError):
     pass
 
-def run_engine_pipeline(mode: str = "FULL") -> dict:
+def expected_stage_durations(mode):
+    """Stage durations of the most recent successful run in the same mode, or {} if there is none."""
+    for past_run in reversed(list_runs()[-ETA_LOOKBACK_RUNS:]):
+        try:
+            manifest = read_manifest(past_run)
+        except (RunNotFoundError, ValueError):
+            continue
+        if manifest.get("mode") == mode and manifest.get("timings"):
+            return manifest["timings"]
+    return {}
+
+def run_engine_pipeline(mode: str = "FULL", run_id: str = None, importance_sampling: bool = None,
+                        figures: bool = None, profile: str = None) -> dict:
     """
     Executes the risk engine pipeline sequentially in-process.
     Replaces the old subprocess approach for better performance and thread-safety.
+    All stages share one run id, which names the run's directory in the scenario store.
+    importance_sampling=None and figures=None keep the configured defaults. Stages only persist data;
+    figures=True adds a final stage that renders every figure and refreshes figures/.
+    Stage start/finish, throughput and ETA events are appended to the run's events.jsonl.
+    profile ("spans", "cprofile", "tracemalloc", comma-separated or "all"; default PROFILE) writes
+    per-stage timing spans and optional snapshots to the run directory before run_finished is emitted.
     """
+    run_id = run_id or new_run_id()
     execution_log = {
+        "run_id": run_id,
         "start_time": datetime.now(timezone.utc).isoformat(),
         "steps": [],
         "status": "RUNNING",
     }
-    
-    try:
+    scenario_kwargs = {} if importance_sampling is None else {"importance_sampling": importance_sampling}
+    stages = [
         # Step 1: Scenario Generation & Portfolio Risk
-        logger.info(f"Starting Scenario Risk Engine in {mode} mode")
-        start_t = time.time()
-        risk_metrics = run_scenario_risk(mode)
-        execution_log["steps"].append({
-            "script": "scenario_portfolio_risk",
-            "duration_sec": round(time.time() - start_t, 2),
-            "status": "SUCCESS"
-        })
-        
+        ("scenario_portfolio_risk", lambda: run_scenario_risk(mode, run_id=run_id, **scenario_kwargs)),
         # Step 2: Risk Limits Governance
-        logger.info("Starting Risk Limits Check")
-        start_t = time.time()
-        limits_status = run_risk_limits()
-        execution_log["steps"].append({
-            "script": "risk_limits",
-            "duration_sec": round(time.time() - start_t, 2),
-            "status": "SUCCESS"
-        })
-        
+        ("risk_limits", lambda: run_risk_limits(run_id)),
         # Step 3: Rolling Backtesting
-        logger.info("Starting Rolling Backtesting")
-        start_t = time.time()
-        backtest_results = run_backtesting()
-        execution_log["steps"].append({
-            "script": "backtesting",
-            "duration_sec": round(time.time() - start_t, 2),
-            "status": "SUCCESS"
-        })
-        
+        ("backtesting", lambda: run_backtesting(run_id)),
         # Step 4: Volatility Stress Testing
-        logger.info("Starting Volatility Stress Testing")
-        start_t = time.time()
-        run_stress_testing(mode)
-        execution_log["steps"].append({
-            "script": "stress_testing",
-            "duration_sec": round(time.time() - start_t, 2),
-            "status": "SUCCESS"
-        })
-        
+        ("stress_testing", lambda: run_stress_testing(mode, run_id=run_id)),
+    ]
+    render_figures = RENDER_FIGURES if figures is None else figures
+    if render_figures:
+        # Step 5 (optional): Render every figure from the stored data
+        stages.append(("figures", lambda: export_figures(open_run(run_id))))
+
+    progress = get_reporter(run_id)
+    profiler = start_profile(run_id, profile)
+    expected = expected_stage_durations(mode)
+    progress.emit("run_started", mode=mode, stages=[name for name, _ in stages],
+                  eta_sec=round(sum(expected.values()), 2) if expected else None)
+    run_start = time.time()
+    current = None
+
+    try:
+        for index, (name, stage) in enumerate(stages):
+            current = name
+            logger.info(f"Starting {name} ({mode} mode)")
+            remaining = [expected.get(n) for n, _ in stages[index:]]
+            progress.stage_started(
+                name, index, len(stages),
+                eta_sec=round(sum(remaining), 2) if expected and None not in remaining else None,
+            )
+            start_t = time.time()
+            if profiler is not None:
+                profiler.stage = name
+            stage()
+            progress.stage_finished(name)
+            current = None
+            duration = time.time() - start_t
+            STAGE_DURATION.observe(duration, stage=name, mode=mode, status="SUCCESS")
+            execution_log["steps"].append({
+                "script": name,
+                "duration_sec": round(duration, 2),
+                "status": "SUCCESS"
+            })
+
         execution_log["status"] = "SUCCESS"
         execution_log["end_time"] = datetime.now(timezone.utc).isoformat()
-        
+        update_manifest(run_id, timings={s["script"]: s["duration_sec"] for s in execution_log["steps"]})
+
     except Exception as e:
         logger.error(f"Pipeline failed: {str(e)}", exc_info=True)
+        if current is not None:
+            progress.stage_finished(current, status="FAILED")
+            STAGE_DURATION.observe(time.time() - start_t, stage=current, mode=mode, status="FAILED")
         execution_log["status"] = "FAILED"
         execution_log["error"] = str(e)
         execution_log["end_time"] = datetime.now(timezone.utc).isoformat()
+        get_audit_writer().submit_call(record_run, run_id, mode, "FAILED")
         raise EngineExecutionError(f"Engine failed: {str(e)}") from e
-        
+    finally:
+        # Audit rows and figures are written behind the stages; make them durable before returning
+        audit = get_audit_writer()
+        if profiler is not None:
+            profiler.stage = "audit_flush"
+        if not audit.flush():
+            logger.warning("Audit flush timed out for run %s", run_id)
+        execution_log["audit"] = audit.stats()
+        RUNS.inc(mode=mode, status=execution_log["status"])
+        RUN_DURATION.observe(time.time() - run_start, mode=mode)
+        if profiler is not None:
+            report = stop_profile(profiler)
+            execution_log["profile"] = None if report is None else {
+                "options": report["options"], "spans": len(report["spans"]),
+            }
+        # Emitted last, so a subscriber that sees it can fetch complete results
+        progress.emit(
+            "run_finished" if execution_log["status"] == "SUCCESS" else "run_failed",
+            status=execution_log["status"],
+            error=execution_log.get("error"),
+            duration_sec=round(time.time() - run_start, 2),
+        )
+        release_reporter(run_id)
+
     return execution_log
@@ -1,8 +1,45 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import List, Literal, Optional
+
+from src.engine.config import RISK_MAX_PORTFOLIOS, TRADING_DAYS
 
 
 class HealthResponse(BaseModel):
     status: str
     engine_available: bool
     message: Optional[str] = None
+
+
+class ReadyResponse(BaseModel):
+    status: str
+    executor: str
+    workers: int
+    uptime_sec: float
+
+
+class PortfolioRequest(BaseModel):
+    id: Optional[str] = None
+    tickers: List[str] = Field(min_length=1)
+    weights: List[float] = Field(min_length=1)
+    confidence_levels: List[float] = Field(default_factory=lambda: [0.95, 0.99], min_length=1)
+    horizon_days: int = Field(default=1, ge=1, le=TRADING_DAYS)
+
+    @field_validator("confidence_levels")
+    @classmethod
+    def _levels_in_range(cls, levels):
+        if any(not 0.5 < c < 1.0 for c in levels):
+            raise ValueError("confidence levels must lie in (0.5, 1)")
+        return levels
+
+    @model_validator(mode="after")
+    def _weights_match_tickers(self):
+        if len(self.weights) != len(self.tickers):
+            raise ValueError("weights and tickers must have the same length")
+        if len(set(self.tickers)) != len(self.tickers):
+            raise ValueError("tickers must be unique")
+        return self
+
+
+class RiskRequest(BaseModel):
+    portfolios: List[PortfolioRequest] = Field(min_length=1, max_length=RISK_MAX_PORTFOLIOS)
+    mode: Literal["FAST", "FULL"] = "FAST"
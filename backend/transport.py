@@ -0,0 +1,95 @@
+import io
+
+import numpy as np
+
+MEDIA_JSON = "application/json"
+MEDIA_RAW = "application/octet-stream"
+MEDIA_NPY = "application/x-npy"
+MEDIA_ARROW = "application/vnd.apache.arrow.stream"
+
+FORMATS = {"json": MEDIA_JSON, "raw": MEDIA_RAW, "npy": MEDIA_NPY, "arrow": MEDIA_ARROW}
+
+
+def arrow_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def negotiate(accept, fmt=None):
+    """
+    Picks a media type: an explicit ?format= wins, otherwise the highest-q supported type in Accept.
+    Falls back to JSON so plain clients keep working.
+    """
+    if fmt is not None:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format {fmt!r}; expected one of {sorted(FORMATS)}")
+        return FORMATS[fmt]
+
+    candidates = []
+    for position, part in enumerate((accept or "").split(",")):
+        media, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if media in FORMATS.values() and q > 0:
+            candidates.append((-q, position, media))
+    return min(candidates)[2] if candidates else MEDIA_JSON
+
+
+def _blocks(arrays, dtype, chunk_rows):
+    """Yields (rows, columns) blocks of the column-stacked arrays, converting one chunk at a time."""
+    n = len(arrays[0])
+    for start in range(0, max(n, 1), chunk_rows):
+        block = np.empty((min(chunk_rows, n - start), len(arrays)), dtype=dtype)
+        for j, arr in enumerate(arrays):
+            block[:, j] = arr[start:start + chunk_rows]
+        yield block
+
+
+def raw_chunks(arrays, dtype, chunk_rows):
+    """Row-major (n, k) little-endian matrix, with no header."""
+    for block in _blocks(arrays, dtype, chunk_rows):
+        yield block.tobytes()
+
+
+def npy_chunks(arrays, dtype, chunk_rows):
+    """The same matrix as a .npy file: a format 1.0 header followed by the raw rows."""
+    header = io.BytesIO()
+    np.lib.format.write_array_header_1_0(header, {
+        "descr": np.lib.format.dtype_to_descr(dtype),
+        "fortran_order": False,
+        "shape": (len(arrays[0]), len(arrays)),
+    })
+    yield header.getvalue()
+    yield from raw_chunks(arrays, dtype, chunk_rows)
+
+
+def arrow_chunks(names, arrays, dtype, chunk_rows):
+    """Arrow IPC stream, one record batch per chunk."""
+    import pyarrow as pa
+
+    sink = io.BytesIO()
+    schema = pa.schema([(name, pa.from_numpy_dtype(dtype)) for name in names])
+    writer = pa.ipc.new_stream(sink, schema)
+
+    def drain():
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    for block in _blocks(arrays, dtype, chunk_rows):
+        writer.write_batch(pa.record_batch(
+            [np.ascontiguousarray(block[:, j]) for j in range(len(names))], schema=schema
+        ))
+        yield drain()
+    writer.close()
+    yield drain()
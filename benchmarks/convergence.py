@@ -0,0 +1,241 @@
+"""
+Shots-vs-accuracy convergence of the quantum and classical scenario generators.
+
+Every (engine, shots, seed) cell of the grid draws fresh scenarios and estimates the portfolio VaR
+and CVaR. The estimates are compared with a high-precision classical reference on the same
+calibration, giving bias, spread and RMSE next to the CPU seconds each estimate cost. Cells run in a
+process pool. All seeds are spawned from one SeedSequence, so a report depends on --seed and not on
+--workers or scheduling.
+
+The quantum circuit is built and calibrated once, from --circuit-seed. The seeds only drive
+sampling, so the spread measures shot noise, and the bias measures how far the 2^qubits-level
+discretisation sits from the continuous model.
+
+    python benchmarks/convergence.py --seeds 32 --plot benchmarks/results/convergence.png
+    python benchmarks/convergence.py --shots 1000 10000 --seeds 8 --reference-shots 500000
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.suite import machine_info  # noqa: E402
+from src.engine import backtester  # noqa: E402
+from src.engine.config import CONFIDENCE_LEVELS, DEFAULT_WEIGHTS, QUBITS_PER_ASSET  # noqa: E402
+from src.engine.risk_metrics import calculate_var_cvar  # noqa: E402
+
+SHOTS = [1_000, 2_000, 5_000, 10_000, 20_000, 50_000, 100_000]
+ENGINES = ["quantum", "classical"]
+DEFAULT_OUTPUT = PROJECT_ROOT / "benchmarks" / "results" / "convergence.json"
+
+
+def calibration(history_seed=0, days=500):
+    """(mu, sigma, corr) estimated from the seeded mock history, as run_scenario_risk does from market data."""
+    np.random.seed(history_seed)
+    history = backtester.generate_mock_history(days)
+    mu = np.mean(history, axis=0) * 252
+    sigma = np.std(history, axis=0) * np.sqrt(252)
+    corr = np.corrcoef(history, rowvar=False)
+    return mu, sigma, corr
+
+
+def _engine(shots, circuit_seed, corr):
+    from src.engine.quantum_engine import QuantumRiskEngine
+    engine = QuantumRiskEngine(num_assets=len(corr), qubits_per_asset=QUBITS_PER_ASSET, shots=shots, seed=circuit_seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine.calibrate(corr)
+    return engine
+
+
+def estimates(portfolio_returns):
+    out = {}
+    for cl in CONFIDENCE_LEVELS:
+        var, cvar = calculate_var_cvar(portfolio_returns, cl)
+        out[f"VaR_{cl}"] = float(var)
+        out[f"CVaR_{cl}"] = float(cvar)
+    return out
+
+
+def _warm_worker(circuit_seed, market):
+    """Pays lazy imports (the quantum ppf map loads SciPy) before any timed cell."""
+    for engine_name in ENGINES:
+        run_cell(engine_name, 100, 0, circuit_seed, market)
+
+
+def run_cell(engine_name, shots, seed, circuit_seed, market):
+    """One estimate: draws `shots` scenarios with a generator seeded from `seed` (a SeedSequence)."""
+    mu, sigma, corr = market
+    weights = np.array(DEFAULT_WEIGHTS)
+    engine = _engine(shots, circuit_seed, corr)
+    engine.rng = np.random.default_rng(seed)
+    cpu, wall = time.process_time(), time.perf_counter()
+    if engine_name == "quantum":
+        returns = engine.generate_correlated_returns(mu, sigma, corr)
+    else:
+        returns = engine.generate_classical_returns(mu, sigma, corr)
+    result = estimates(returns @ weights)
+    return {
+        "engine": engine_name,
+        "shots": shots,
+        "cpu_sec": time.process_time() - cpu,
+        "wall_sec": time.perf_counter() - wall,
+        "estimates": result,
+    }
+
+
+def reference(shots, seed, circuit_seed, market):
+    """High-precision classical VaR/CVaR: the target every cell's error is measured against."""
+    return run_cell("classical", shots, seed, circuit_seed, market)["estimates"]
+
+
+def summarize(cells, ref):
+    """Bias, spread, RMSE and mean cost per (engine, shots) over the seeds."""
+    groups = {}
+    for cell in cells:
+        groups.setdefault((cell["engine"], cell["shots"]), []).append(cell)
+    rows = []
+    for (engine_name, shots), group in sorted(groups.items(), key=lambda item: (ENGINES.index(item[0][0]), item[0][1])):
+        metrics = {}
+        for key, truth in ref.items():
+            values = np.array([cell["estimates"][key] for cell in group])
+            errors = values - truth
+            rmse = float(np.sqrt(np.mean(errors ** 2)))
+            metrics[key] = {
+                "bias": float(errors.mean()),
+                "std": float(values.std(ddof=1)) if len(values) > 1 else 0.0,
+                "rmse": rmse,
+                "rel_rmse": rmse / abs(truth),
+            }
+        rows.append({
+            "engine": engine_name,
+            "shots": shots,
+            "seeds": len(group),
+            "cpu_sec": float(np.mean([cell["cpu_sec"] for cell in group])),
+            "wall_sec": float(np.mean([cell["wall_sec"] for cell in group])),
+            "metrics": metrics,
+        })
+    return rows
+
+
+def recommend(rows, target):
+    """Per engine, the fewest shots in the grid whose worst relative RMSE is within target."""
+    picks = {}
+    for row in rows:
+        worst = max(m["rel_rmse"] for m in row["metrics"].values())
+        if worst <= target and row["engine"] not in picks:
+            picks[row["engine"]] = {"shots": row["shots"], "rel_rmse": worst, "cpu_sec": row["cpu_sec"]}
+    return {engine_name: picks.get(engine_name) for engine_name in ENGINES}
+
+
+def print_table(rows, ref):
+    keys = list(ref)
+    print(f"\n{'engine':<10}{'shots':>9}{'cpu ms':>10}" + "".join(f"{k:>22}" for k in keys))
+    print(f"{'':<10}{'':>9}{'':>10}" + "".join(f"{'bias / rel RMSE':>22}" for _ in keys))
+    for row in rows:
+        cells = "".join(
+            f"{row['metrics'][k]['bias']:>+11.4f} /{row['metrics'][k]['rel_rmse']:>8.2%}" for k in keys
+        )
+        print(f"{row['engine']:<10}{row['shots']:>9}{row['cpu_sec'] * 1000:>10.2f}{cells}")
+
+
+def plot(rows, ref, path):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    keys = list(ref)
+    fig, axes = plt.subplots(1, len(keys), figsize=(4 * len(keys), 3.6), sharey=True)
+    for ax, key in zip(np.atleast_1d(axes), keys):
+        for engine_name, marker in zip(ENGINES, ("o", "s")):
+            series = [row for row in rows if row["engine"] == engine_name]
+            ax.loglog([row["cpu_sec"] for row in series], [row["metrics"][key]["rel_rmse"] for row in series],
+                      marker=marker, label=engine_name)
+        ax.set_title(key)
+        ax.set_xlabel("CPU seconds per estimate")
+        ax.grid(True, which="both", alpha=0.3)
+    np.atleast_1d(axes)[0].set_ylabel("relative RMSE")
+    np.atleast_1d(axes)[0].legend()
+    fig.tight_layout()
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(path, dpi=120)
+    plt.close(fig)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--shots", type=int, nargs="+", default=SHOTS)
+    parser.add_argument("--seeds", type=int, default=32, help="Independent estimates per (engine, shots)")
+    parser.add_argument("--seed", type=int, default=2024, help="Root of the SeedSequence all seeds are spawned from")
+    parser.add_argument("--circuit-seed", type=int, default=0, help="Seed of the quantum circuit parameters")
+    parser.add_argument("--reference-shots", type=int, default=4_000_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--target", type=float, default=0.02,
+                        help="Relative RMSE the recommended shot counts must reach, e.g. 0.02 for 2%%")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT))
+    parser.add_argument("--plot", help="Write the error vs CPU-seconds plot (PNG) to this path")
+    args = parser.parse_args()
+
+    market = calibration()
+    root = np.random.SeedSequence(args.seed)
+    ref_seed, *cell_seeds = root.spawn(1 + len(args.shots) * args.seeds)
+    grid = [
+        (engine_name, shots, cell_seeds[i * args.seeds + s])
+        for engine_name in ENGINES
+        for i, shots in enumerate(args.shots)
+        for s in range(args.seeds)
+    ]
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_warm_worker,
+                             initargs=(args.circuit_seed, market)) as pool:
+        ref_future = pool.submit(reference, args.reference_shots, ref_seed, args.circuit_seed, market)
+        futures = [pool.submit(run_cell, e, n, seed, args.circuit_seed, market) for e, n, seed in grid]
+        ref = ref_future.result()
+        cells = [future.result() for future in futures]
+    elapsed = time.perf_counter() - started
+
+    rows = summarize(cells, ref)
+    picks = recommend(rows, args.target)
+    print_table(rows, ref)
+    print(f"\nReference ({args.reference_shots:,} classical shots): "
+          + ", ".join(f"{k} {v:.4f}" for k, v in ref.items()))
+    for engine_name, pick in picks.items():
+        if pick is None:
+            print(f"{engine_name}: no grid point reaches {args.target:.1%} relative RMSE")
+        else:
+            print(f"{engine_name}: {pick['shots']:,} shots reach {pick['rel_rmse']:.2%} relative RMSE "
+                  f"at {pick['cpu_sec'] * 1000:.1f} CPU ms per estimate")
+    print(f"{len(cells)} estimates in {elapsed:.1f} s")
+
+    report = {
+        "machine": machine_info(),
+        "config": {
+            "shots": args.shots, "seeds": args.seeds, "seed": args.seed, "circuit_seed": args.circuit_seed,
+            "reference_shots": args.reference_shots, "qubits_per_asset": QUBITS_PER_ASSET,
+            "confidence_levels": CONFIDENCE_LEVELS, "target_rel_rmse": args.target,
+        },
+        "reference": ref,
+        "results": rows,
+        "recommended_shots": picks,
+    }
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Wrote {output}")
+    if args.plot:
+        plot(rows, ref, args.plot)
+        print(f"Wrote {args.plot}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Load test of the API with simulated dashboard users and run triggers.
+
+Viewers loop like dashboard sessions: ask /results/latest for the newest run, then fetch the
+bundle, summary, histogram or health check it shows, with exponential think time between
+requests. Triggers POST /run (FAST or FULL), poll /runs/{run_id} until the run finishes and then
+read its results. Every request is timed per route template. The report has throughput, error
+rate, rejections (429) and p50/p95/p99 latency per route and overall, and is written to JSON with
+machine info. `compare` diffs two reports and exits 1 on a p95 regression beyond --threshold.
+
+    python benchmarks/load_test.py run --serve --users 20 --triggers 2 --duration 60
+    python benchmarks/load_test.py run --base-url http://127.0.0.1:8000 --full-share 0
+    python benchmarks/load_test.py compare benchmarks/results/load-baseline.json benchmarks/results/load-latest.json
+
+--serve starts a local uvicorn and waits for /ready. Set RISK_PRICE_SOURCE=local (after
+`python -m src.engine.synthetic`) to keep the engine off the network.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.suite import machine_info  # noqa: E402
+
+DEFAULT_OUTPUT = PROJECT_ROOT / "benchmarks" / "results" / "load-latest.json"
+# Viewer actions after /results/latest, with their relative weights
+VIEWER_ACTIONS = [
+    ("/results/bundle", 4),
+    ("/results/summary", 3),
+    ("/results/distribution/histogram", 2),
+    ("/health", 1),
+]
+TERMINAL = ("SUCCESS", "FAILED")
+
+
+class Recorder:
+    """(latency, status) samples per route template; status 0 is a transport error or timeout."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    async def request(self, client, method, route, path=None, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path or route, **kwargs)
+            status = response.status_code
+        except httpx.HTTPError:
+            response, status = None, 0
+        self.samples[f"{method} {route}"].append(((time.perf_counter() - started) * 1000.0, status))
+        return response
+
+
+async def pause(rng, mean, deadline):
+    """Exponential think time, cut short at the end of the test."""
+    if mean > 0:
+        await asyncio.sleep(min(rng.expovariate(1.0 / mean), max(deadline - time.perf_counter(), 0.0)))
+
+
+async def viewer(client, recorder, rng, deadline, think):
+    while time.perf_counter() < deadline:
+        latest = await recorder.request(client, "GET", "/results/latest")
+        run_id = latest.json()["run_id"] if latest is not None and latest.status_code == 200 else None
+        paths = [path for path, _ in VIEWER_ACTIONS]
+        path = rng.choices(paths, weights=[w for _, w in VIEWER_ACTIONS])[0]
+        params = {"run_id": run_id} if run_id and path != "/health" else None
+        await recorder.request(client, "GET", path, params=params)
+        await pause(rng, think, deadline)
+
+
+async def trigger(client, recorder, rng, deadline, think, full_share, poll):
+    while time.perf_counter() < deadline:
+        mode = "FULL" if rng.random() < full_share else "FAST"
+        response = await recorder.request(client, "POST", f"/run?mode={mode}", "/run", params={"mode": mode})
+        if response is not None and response.status_code == 200:
+            run_id = response.json()["run_id"]
+            status = None
+            while status not in TERMINAL and time.perf_counter() < deadline:
+                await asyncio.sleep(min(poll, max(deadline - time.perf_counter(), 0.0)))
+                job = await recorder.request(client, "GET", "/runs/{run_id}", f"/runs/{run_id}")
+                status = job.json().get("status") if job is not None and job.status_code == 200 else status
+            if status == "SUCCESS":
+                await recorder.request(client, "GET", "/results/bundle", params={"run_id": run_id})
+        await pause(rng, think, deadline)
+
+
+async def run_load(args):
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.users + args.triggers, max_keepalive_connections=args.users + args.triggers)
+    timeout = httpx.Timeout(args.timeout)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=timeout) as client:
+        started = time.perf_counter()
+        deadline = started + args.duration
+        tasks = []
+        for i in range(args.users + args.triggers):
+            rng = random.Random(args.seed * 1000 + i)
+            # Users start staggered over the ramp-up so they do not move in lockstep
+            await asyncio.sleep(args.ramp / max(args.users + args.triggers, 1))
+            if i < args.users:
+                tasks.append(asyncio.create_task(viewer(client, recorder, rng, deadline, args.think)))
+            else:
+                tasks.append(asyncio.create_task(
+                    trigger(client, recorder, rng, deadline, args.trigger_think, args.full_share, args.poll)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+    return recorder.samples, elapsed
+
+
+def summarize(samples, elapsed):
+    """Throughput, error/rejection rates and latency percentiles for one route's samples."""
+    ms = np.array([s[0] for s in samples])
+    statuses = [s[1] for s in samples]
+    errors = sum(1 for s in statuses if s == 0 or s >= 500)
+    rejected = sum(1 for s in statuses if s == 429)
+    counts = defaultdict(int)
+    for s in statuses:
+        counts[str(s)] += 1
+    return {
+        "requests": len(samples),
+        "rps": round(len(samples) / elapsed, 2),
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4),
+        "rejected": rejected,
+        "status": dict(sorted(counts.items())),
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(ms, 95)), 2),
+        "p99_ms": round(float(np.percentile(ms, 99)), 2),
+        "max_ms": round(float(ms.max()), 2),
+    }
+
+
+def wait_ready(base_url, timeout):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if httpx.get(f"{base_url}/ready", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"{base_url} not ready after {timeout} s")
+
+
+def ensure_run(base_url, timeout):
+    """Results routes need a stored run: start a FAST one if there is none yet."""
+    if httpx.get(f"{base_url}/results/latest", timeout=10).status_code == 200:
+        return
+    run_id = httpx.post(f"{base_url}/run", params={"mode": "FAST"}, timeout=30).json()["run_id"]
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if httpx.get(f"{base_url}/runs/{run_id}", timeout=10).json()["status"] in TERMINAL:
+            return
+        time.sleep(0.5)
+    raise RuntimeError(f"Seed run {run_id} did not finish within {timeout} s")
+
+
+def wait_idle(base_url, timeout):
+    """Waits for runs the triggers left queued or running, so a server we started is stopped between runs."""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        jobs = httpx.get(f"{base_url}/runs", timeout=10).json()["items"]
+        if all(job["status"] in TERMINAL for job in jobs):
+            return
+        time.sleep(0.5)
+
+
+def print_report(routes, overall):
+    print(f"\n{'route':<44}{'requests':>9}{'rps':>8}{'err %':>7}{'429':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for route, r in list(routes.items()) + [("overall", overall)]:
+        print(f"{route:<44}{r['requests']:>9}{r['rps']:>8.1f}{r['error_rate']:>7.1%}{r['rejected']:>6}"
+              f"{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}")
+
+
+def run(args):
+    server = None
+    if args.serve:
+        port = args.base_url.rsplit(":", 1)[-1].strip("/")
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "backend.app:app", "--port", port],
+            cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=os.environ.copy(),
+        )
+    try:
+        wait_ready(args.base_url, args.startup_timeout)
+        ensure_run(args.base_url, args.startup_timeout)
+        samples, elapsed = asyncio.run(run_load(args))
+        if server is not None:
+            wait_idle(args.base_url, args.startup_timeout)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    routes = {route: summarize(s, elapsed) for route, s in sorted(samples.items())}
+    overall = summarize([x for s in samples.values() for x in s], elapsed)
+    print_report(routes, overall)
+
+    report = {
+        "machine": machine_info(),
+        "config": {key: getattr(args, key) for key in (
+            "base_url", "users", "triggers", "duration", "ramp", "think", "trigger_think", "full_share", "seed")},
+        "elapsed_sec": round(elapsed, 2),
+        "overall": overall,
+        "routes": routes,
+    }
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nWrote {output}")
+    return 1 if overall["errors"] else 0
+
+
+def compare(args):
+    baseline = json.loads(Path(args.baseline).read_text())
+    current = json.loads(Path(args.current).read_text())
+    if baseline["config"] != current["config"]:
+        print("warning: the two reports used different workloads")
+    regressions = 0
+    print(f"{'route':<44}{'p95 before':>12}{'p95 now':>10}{'change':>9}{'rps before':>12}{'rps now':>9}")
+    for route, now in list(current["routes"].items()) + [("overall", current["overall"])]:
+        before = baseline["overall"] if route == "overall" else baseline["routes"].get(route)
+        if before is None:
+            continue
+        change = now["p95_ms"] / before["p95_ms"] - 1.0 if before["p95_ms"] > 0 else 0.0
+        # A p95 over a handful of requests is noise: shown, but not gated
+        gated = min(before["requests"], now["requests"]) >= args.min_requests
+        regressed = gated and change > args.threshold
+        regressions += regressed
+        flag = "REGRESSION" if regressed else ("" if gated else "(too few requests)")
+        print(f"{route:<44}{before['p95_ms']:>12.1f}{now['p95_ms']:>10.1f}{change:>+9.1%}"
+              f"{before['rps']:>12.1f}{now['rps']:>9.1f}  {flag}")
+    print(f"\n{regressions} routes with p95 worse than the baseline by more than {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run a load test and write a JSON report")
+    run_parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    run_parser.add_argument("--serve", action="store_true", help="Start uvicorn on the --base-url port for the test")
+    run_parser.add_argument("--users", type=int, default=20, help="Concurrent dashboard viewers")
+    run_parser.add_argument("--triggers", type=int, default=1, help="Concurrent users submitting runs")
+    run_parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load after ramp-up starts")
+    run_parser.add_argument("--ramp", type=float, default=2.0, help="Seconds over which users are started")
+    run_parser.add_argument("--think", type=float, default=0.5, help="Mean viewer think time in seconds (0: none)")
+    run_parser.add_argument("--trigger-think", type=float, default=2.0, help="Mean pause between runs per trigger")
+    run_parser.add_argument("--full-share", type=float, default=0.2, help="Share of triggered runs in FULL mode")
+    run_parser.add_argument("--poll", type=float, default=0.5, help="Run status poll interval in seconds")
+    run_parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    run_parser.add_argument("--startup-timeout", type=float, default=180.0)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--output", default=str(DEFAULT_OUTPUT))
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="Fail on p95 regressions against a baseline report")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current", nargs="?", default=str(DEFAULT_OUTPUT))
+    compare_parser.add_argument("--threshold", type=float, default=0.20,
+                                help="Allowed relative p95 increase per route, e.g. 0.20 for 20%%")
+    compare_parser.add_argument("--min-requests", type=int, default=50,
+                                help="Routes with fewer requests in either report are not gated")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    sys.exit(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Read-path latency while the engine is busy.
+
+Hammers the API's read endpoints from a few client threads, first with the engine idle and
+then while a pipeline run is in progress, and reports p50/p95/p99 per phase. Start the API
+first (uvicorn backend.app:app) and make sure at least one run exists.
+
+    python benchmarks/read_latency.py --mode FAST --concurrency 8
+"""
+import argparse
+import json
+import threading
+import time
+
+import numpy as np
+import requests
+
+DEFAULT_PATHS = ["/health", "/results/summary", "/results/limits"]
+
+
+def _hammer(base_url, paths, stop, samples):
+    session = requests.Session()
+    i = 0
+    while not stop.is_set():
+        path = paths[i % len(paths)]
+        t0 = time.perf_counter()
+        try:
+            ok = session.get(f"{base_url}{path}", timeout=30).ok
+        except requests.RequestException:
+            ok = False
+        samples.append((path, (time.perf_counter() - t0) * 1000.0, ok))
+        i += 1
+
+
+def measure(base_url, paths, concurrency, until):
+    """Runs client threads until `until()` returns True; returns [(path, ms, ok), ...]."""
+    stop = threading.Event()
+    samples = []
+    threads = [
+        threading.Thread(target=_hammer, args=(base_url, paths[k:] + paths[:k], stop, samples), daemon=True)
+        for k in range(concurrency)
+    ]
+    for t in threads:
+        t.start()
+    while not until():
+        time.sleep(0.05)
+    stop.set()
+    for t in threads:
+        t.join()
+    return samples
+
+
+def summarize(samples):
+    ms = np.array([s[1] for s in samples]) if samples else np.zeros(1)
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for s in samples if not s[2]),
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(ms, 95)), 2),
+        "p99_ms": round(float(np.percentile(ms, 99)), 2),
+        "max_ms": round(float(ms.max()), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--mode", default="FAST", choices=["FAST", "FULL"])
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--idle-seconds", type=float, default=5.0)
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS)
+    parser.add_argument("--output", help="Write the report as JSON to this path")
+    args = parser.parse_args()
+
+    deadline = time.time() + args.idle_seconds
+    idle = measure(args.base_url, args.paths, args.concurrency, lambda: time.time() > deadline)
+
+    run = requests.post(f"{args.base_url}/run", params={"mode": args.mode}, timeout=30).json()
+    run_id = run["run_id"]
+
+    def finished():
+        status = requests.get(f"{args.base_url}/runs/{run_id}", timeout=30).json()["status"]
+        return status in ("SUCCESS", "FAILED")
+
+    started = time.time()
+    busy = measure(args.base_url, args.paths, args.concurrency, finished)
+
+    report = {
+        "run_id": run_id,
+        "mode": args.mode,
+        "run_seconds": round(time.time() - started, 2),
+        "concurrency": args.concurrency,
+        "idle": summarize(idle),
+        "during_run": summarize(busy),
+    }
+    print(f"{'phase':<12}{'requests':>10}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for phase in ("idle", "during_run"):
+        r = report[phase]
+        print(f"{phase:<12}{r['requests']:>10}{r['errors']:>8}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{r['max_ms']:>10}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
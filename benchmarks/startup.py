@@ -0,0 +1,128 @@
+"""
+Cold-start cost of the API and engine entry points.
+
+Imports each target in a fresh interpreter under `python -X importtime`, then reports the total
+import time, the slowest top-level packages and whether any of the heavy scientific dependencies
+were loaded. With --serve it also starts uvicorn and times /health (process up) and /ready
+(engine workers warm).
+
+    python benchmarks/startup.py --repeat 3
+    python benchmarks/startup.py --targets backend.app --serve
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+import requests
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_TARGETS = ["backend.app", "src.engine.batch_risk", "backend.runner"]
+HEAVY = ["pennylane", "scipy", "matplotlib", "yfinance", "pandas", "pyarrow"]
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def import_profile(target):
+    """Returns (wall seconds, {module: (self_us, cumulative_us, depth)}) for one fresh import."""
+    env = {**os.environ, "PYTHONPATH": str(PROJECT_ROOT)}
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {target} failed:\n{proc.stderr[-2000:]}")
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us), len(indent) // 2)
+    return wall, modules
+
+
+def summarize(target, runs, top):
+    walls = [wall for wall, _ in runs]
+    _, modules = runs[-1]
+    # Time attributed to each top-level package (self time of all its modules), e.g. "pennylane"
+    packages = defaultdict(int)
+    for name, (self_us, _, _) in modules.items():
+        packages[name.split(".")[0]] += self_us
+    return {
+        "target": target,
+        "wall_ms": round(float(np.median(walls)) * 1000, 1),
+        "import_ms": round(modules[target][1] / 1000, 1) if target in modules else None,
+        "modules": len(modules),
+        "heavy_loaded": [pkg for pkg in HEAVY if pkg in packages],
+        "top_packages": [
+            {"package": pkg, "ms": round(us / 1000, 1)}
+            for pkg, us in sorted(packages.items(), key=lambda item: -item[1])[:top]
+        ],
+    }
+
+
+def serve_timings(port, timeout):
+    """Seconds from launching uvicorn until /health answers and until /ready returns 200."""
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.app:app", "--port", str(port)],
+        cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    started = time.perf_counter()
+    timings = {"health_sec": None, "ready_sec": None}
+    try:
+        while time.perf_counter() - started < timeout and timings["ready_sec"] is None:
+            for key, path in (("health_sec", "/health"), ("ready_sec", "/ready")):
+                if timings[key] is not None:
+                    continue
+                try:
+                    if requests.get(f"http://127.0.0.1:{port}{path}", timeout=1).status_code == 200:
+                        timings[key] = round(time.perf_counter() - started, 3)
+                except requests.RequestException:
+                    pass
+            time.sleep(0.02)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--targets", nargs="+", default=DEFAULT_TARGETS)
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh imports per target (median wall time)")
+    parser.add_argument("--top", type=int, default=8)
+    parser.add_argument("--serve", action="store_true", help="Also time uvicorn start-up to /health and /ready")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--output", help="Write the report as JSON to this path")
+    args = parser.parse_args()
+
+    report = {"python": sys.version.split()[0], "targets": []}
+    for target in args.targets:
+        summary = summarize(target, [import_profile(target) for _ in range(args.repeat)], args.top)
+        report["targets"].append(summary)
+        print(f"\n{target}: {summary['wall_ms']} ms wall, {summary['import_ms']} ms import, "
+              f"{summary['modules']} modules, heavy: {', '.join(summary['heavy_loaded']) or 'none'}")
+        for entry in summary["top_packages"]:
+            print(f"    {entry['package']:<24}{entry['ms']:>10} ms")
+
+    if args.serve:
+        report["serve"] = serve_timings(args.port, args.timeout)
+        print(f"\nuvicorn: /health after {report['serve']['health_sec']} s, /ready after {report['serve']['ready_sec']} s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
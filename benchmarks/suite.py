@@ -0,0 +1,269 @@
+"""
+Micro and macro benchmarks for the risk engine, with stored results and a regression gate.
+
+`run` times the scenario generators and risk metrics over a grid of shots, assets and qubits per
+asset, plus rolling backtesting and the full pipeline, and writes the timings with machine info to
+JSON. Market data comes from the seeded mock history and every database/run-store write goes to a
+temporary directory, so nothing touches the network or data/.
+
+`compare` matches the cases of two result files and exits 1 when any case is slower than the
+baseline by more than --threshold (relative, on the fastest repeat).
+
+    python benchmarks/suite.py run --output benchmarks/results/baseline.json
+    python benchmarks/suite.py run --quick --output benchmarks/results/current.json
+    python benchmarks/suite.py compare benchmarks/results/baseline.json benchmarks/results/current.json --threshold 0.15
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.engine import backtester, database, scenario_store  # noqa: E402
+from src.engine.config import MOCK_MU, MOCK_SIGMA, MOCK_CORR  # noqa: E402
+
+SHOTS = [1_000, 10_000, 100_000, 1_000_000]
+QUICK_SHOTS = [1_000, 10_000]
+ASSETS = [3, 10]
+QUBITS = [4, 8]
+MODES = ["FAST", "FULL"]
+DEFAULT_OUTPUT = PROJECT_ROOT / "benchmarks" / "results" / "latest.json"
+# Stage modules that load market history; each gets the seeded mock instead
+HISTORY_USERS = ["src.scenario_portfolio_risk", "src.stress_testing", "src.backtesting"]
+
+
+def machine_info():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or None,
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+    }
+
+
+def mock_history(tickers=None, days=500):
+    """Seeded stand-in for get_historical_data: same shape, no network."""
+    np.random.seed(0)
+    return backtester.generate_mock_history(days, len(tickers) if tickers is not None else None)
+
+
+@contextlib.contextmanager
+def sandbox():
+    """Mock market data, a throwaway database and run store, and silenced stage output."""
+    import importlib
+
+    modules = [importlib.import_module(name) for name in HISTORY_USERS]
+    saved = [module.get_historical_data for module in modules]
+    saved_runs = scenario_store.RUNS_DIR
+    with tempfile.TemporaryDirectory(prefix="risk-bench-") as tmp:
+        tmp = Path(tmp)
+        import src.risk_limits as risk_limits
+        saved_limits = risk_limits.LIMITS_FILE
+        try:
+            for module in modules:
+                module.get_historical_data = mock_history
+            scenario_store.RUNS_DIR = tmp / "runs"
+            risk_limits.LIMITS_FILE = tmp / "risk_limits.json"
+            database.configure(tmp / "bench.db")
+            database.init_db()
+            logging.getLogger("backend.runner").setLevel(logging.WARNING)
+            with contextlib.redirect_stdout(io.StringIO()):
+                yield
+        finally:
+            from src.engine.audit import get_audit_writer
+            get_audit_writer().flush()
+            for module, fn in zip(modules, saved):
+                module.get_historical_data = fn
+            scenario_store.RUNS_DIR = saved_runs
+            risk_limits.LIMITS_FILE = saved_limits
+            database.configure()
+
+
+def market(num_assets):
+    corr = np.full((num_assets, num_assets), MOCK_CORR)
+    np.fill_diagonal(corr, 1.0)
+    return np.full(num_assets, MOCK_MU), np.full(num_assets, MOCK_SIGMA), corr
+
+
+def _engine(shots, assets, qubits):
+    from src.engine.quantum_engine import QuantumRiskEngine
+    return QuantumRiskEngine(num_assets=assets, qubits_per_asset=qubits, shots=shots, seed=0)
+
+
+def case_independent_shocks(shots, assets, qubits):
+    engine = _engine(shots, assets, qubits)
+    return engine.generate_independent_shocks
+
+
+def case_correlated_returns(shots, assets, qubits):
+    engine = _engine(shots, assets, qubits)
+    mu, sigma, corr = market(assets)
+    return lambda: engine.generate_correlated_returns(mu, sigma, corr)
+
+
+def case_var_cvar(shots):
+    from src.engine.risk_metrics import calculate_var_cvar
+    returns = np.random.default_rng(0).normal(0.0, 0.2, size=shots)
+    return lambda: calculate_var_cvar(returns, 0.95)
+
+
+def case_marginal_var(shots, assets):
+    from src.engine.risk_metrics import calculate_marginal_var
+    asset_returns = np.random.default_rng(0).normal(0.0, 0.2, size=(shots, assets))
+    portfolio = asset_returns @ np.full(assets, 1.0 / assets)
+    return lambda: calculate_marginal_var(asset_returns, portfolio, 0.95)
+
+
+def case_synthetic_market(assets, days):
+    from src.engine.synthetic import synthetic_returns
+    return lambda: synthetic_returns(assets, days, seed=0)
+
+
+def case_backtesting():
+    from src.backtesting import run_backtesting
+    return run_backtesting
+
+
+def case_pipeline(mode):
+    from backend.runner import run_engine_pipeline
+    return lambda: run_engine_pipeline(mode, figures=False)
+
+
+def cases(quick=False):
+    """(name, params, factory, repeats) for every benchmark; the factory builds the timed callable."""
+    shots = QUICK_SHOTS if quick else SHOTS
+    grid = list(itertools.product(shots, ASSETS, QUBITS))
+    for s, a, q in grid:
+        yield "generate_independent_shocks", {"shots": s, "assets": a, "qubits": q}, case_independent_shocks, None
+    for s, a, q in grid:
+        yield "generate_correlated_returns", {"shots": s, "assets": a, "qubits": q}, case_correlated_returns, None
+    for s in shots:
+        yield "calculate_var_cvar", {"shots": s}, case_var_cvar, None
+    for s, a in itertools.product(shots, ASSETS):
+        yield "calculate_marginal_var", {"shots": s, "assets": a}, case_marginal_var, None
+    for a in ASSETS + [1_000]:
+        yield "synthetic_returns", {"assets": a, "days": 2520}, case_synthetic_market, 3
+    yield "run_backtesting", {}, case_backtesting, 3
+    for mode in MODES[:1] if quick else MODES:
+        yield "run_engine_pipeline", {"mode": mode}, case_pipeline, 3
+
+
+def case_id(name, params):
+    return f"{name}[{','.join(f'{k}={v}' for k, v in params.items())}]" if params else name
+
+
+def time_case(fn, repeat):
+    fn()  # warm-up: imports, caches, first-touch page faults
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {
+        "min_ms": round(min(times) * 1000, 3),
+        "median_ms": round(float(np.median(times)) * 1000, 3),
+        "mean_ms": round(float(np.mean(times)) * 1000, 3),
+        "repeat": repeat,
+    }
+
+
+def run(args):
+    results = []
+    with sandbox():
+        for name, params, factory, repeat in cases(args.quick):
+            cid = case_id(name, params)
+            if args.filter and args.filter not in cid:
+                continue
+            timing = time_case(factory(**params), min(repeat or args.repeat, args.repeat))
+            results.append({"id": cid, "name": name, "params": params, **timing})
+            print(f"{cid:<72}{timing['min_ms']:>12.3f} ms", file=sys.__stdout__, flush=True)
+
+    report = {"machine": machine_info(), "quick": args.quick, "results": results}
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nWrote {len(results)} results to {output}")
+    return 0
+
+
+def compare_reports(baseline, current, threshold, stat="min_ms"):
+    """Rows of (id, baseline ms, current ms, relative change, regressed) for cases present in both."""
+    before = {r["id"]: r for r in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        if result["id"] not in before:
+            continue
+        old, new = before[result["id"]][stat], result[stat]
+        change = new / old - 1.0 if old > 0 else 0.0
+        rows.append((result["id"], old, new, change, change > threshold))
+    return rows
+
+
+def compare(args):
+    baseline = json.loads(Path(args.baseline).read_text())
+    current = json.loads(Path(args.current).read_text())
+    for key in ("platform", "processor", "cpu_count", "python", "numpy"):
+        if baseline["machine"].get(key) != current["machine"].get(key):
+            print(f"warning: {key} differs ({baseline['machine'].get(key)} vs {current['machine'].get(key)})")
+
+    rows = compare_reports(baseline, current, args.threshold, args.stat)
+    for cid, old, new, change, regressed in rows:
+        flag = "REGRESSION" if regressed else ""
+        print(f"{cid:<72}{old:>12.3f}{new:>12.3f} ms{change:>+9.1%}  {flag}")
+    missing = {r["id"] for r in baseline["results"]} - {r["id"] for r in current["results"]}
+    if missing:
+        print(f"{len(missing)} baseline cases not in the current run")
+
+    regressions = [row for row in rows if row[4]]
+    print(f"\n{len(rows)} cases compared, {len(regressions)} slower than the baseline by more than {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks and write a JSON report")
+    run_parser.add_argument("--output", default=str(DEFAULT_OUTPUT))
+    run_parser.add_argument("--repeat", type=int, default=5, help="Timed repeats per case after one warm-up")
+    run_parser.add_argument("--quick", action="store_true", help="Shots up to 10^4 and FAST mode only")
+    run_parser.add_argument("--filter", help="Only cases whose id contains this text")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="Fail on regressions against a baseline report")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current", nargs="?", default=str(DEFAULT_OUTPUT))
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="Allowed relative slowdown per case, e.g. 0.10 for 10%%")
+    compare_parser.add_argument("--stat", choices=["min_ms", "median_ms", "mean_ms"], default="min_ms")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    sys.exit(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Dashboard data layer: one pooled HTTP session and Streamlit caches keyed by (run_id, version).
+
+A rerun (widget click, section switch) first asks the API which run is latest, a single stat on
+the server, and reuses every cached payload while that answer is unchanged. Figures and histograms
+are fetched only when the section that shows them is opened.
+"""
+import os
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+
+API_BASE = os.environ.get("RISK_API_BASE", "http://127.0.0.1:8000")
+LATEST_TTL_SECONDS = 5
+CACHED_RUNS = 8
+
+
+@st.cache_resource
+def session():
+    s = requests.Session()
+    s.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+    s.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+    return s
+
+
+def get(path, **params):
+    r = session().get(f"{API_BASE}{path}", params=params or None, timeout=(5, 60))
+    r.raise_for_status()
+    return r
+
+
+def post(path, **params):
+    r = session().post(f"{API_BASE}{path}", params=params or None, timeout=(5, 60))
+    r.raise_for_status()
+    return r
+
+
+@st.cache_data(ttl=LATEST_TTL_SECONDS, show_spinner=False)
+def latest_run():
+    """(run_id, version) of the newest run; cleared as soon as a run submitted from this dashboard finishes."""
+    latest = get("/results/latest").json()
+    return latest["run_id"], latest["version"]
+
+
+# version is part of every cache key: limits and backtests are attached to a run after it is first stored
+@st.cache_data(max_entries=CACHED_RUNS, show_spinner=False)
+def bundle(run_id, version):
+    return get("/results/bundle", run_id=run_id).json()
+
+
+@st.cache_data(max_entries=CACHED_RUNS, show_spinner=False)
+def histogram(run_id, version):
+    return get("/results/distribution/histogram", run_id=run_id).json()
+
+
+@st.cache_data(max_entries=CACHED_RUNS * 4, show_spinner=False)
+def figure(run_id, version, name):
+    return get(f"/figures/{name}", run_id=run_id).content
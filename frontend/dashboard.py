@@ -1,10 +1,13 @@
+import json
+
 import streamlit as st
-import requests
+import api
+from sections.overview import render_overview
+from sections.distributions import render_distributions
+from sections.backtesting import render_backtesting
+from sections.stress import render_stress_tests
 from sections.limits import render_limits
 
-
-API_BASE = "http://127.0.0.1:8000"
-
 st.set_page_config(
     page_title="Quantum-Classical Market Risk",
     layout="wide",
@@ -18,10 +21,49 @@ st.caption(
 )
 
 
-def api_get(path):
-    r = requests.get(f"{API_BASE}{path}")
-    r.raise_for_status()
-    return r.json()
+def iter_sse(response):
+    """Parses a text/event-stream response into event dicts (the JSON in each data field)."""
+    for line in response.iter_lines(decode_unicode=True):
+        if line and line.startswith("data:"):
+            yield json.loads(line[5:])
+
+
+def run_engine(mode):
+    """
+    Submits a run and follows its progress events until it finishes.
+    Concurrent clicks join the same run on the server; results are fetched once, on the rerun.
+    """
+    run_id = api.post("/run", mode=mode).json()["run_id"]
+
+    bar = st.progress(0.0, text="Queued...")
+    final = {"run_id": run_id, "mode": mode, "status": "FAILED", "error": "event stream ended"}
+    with api.session().get(f"{api.API_BASE}/runs/{run_id}/events", stream=True, timeout=(5, 120)) as events:
+        events.raise_for_status()
+        for event in iter_sse(events):
+            kind = event["event"]
+            if kind == "stage_started":
+                eta = f" (~{event['eta_sec']:.0f}s left)" if event.get("eta_sec") else ""
+                bar.progress(event["index"] / event["total"], text=f"{event['stage']}{eta}")
+            elif kind == "progress" and event.get("eta_sec") is not None:
+                bar.progress(min(event["done"] / max(event["total"], 1), 1.0),
+                             text=f"{event['stage']}: {event['done']}/{event['total']} {event['unit']} "
+                                  f"(~{event['eta_sec']:.0f}s left)")
+            elif kind == "throughput" and event.get("per_sec"):
+                st.caption(f"{event['label'].capitalize()} sampling: {event['per_sec']:,.0f} {event['unit']}/s")
+            elif kind in ("run_finished", "run_failed"):
+                final.update(status=event["status"], error=event.get("error"))
+                break
+    bar.empty()
+    # Pick up the new run on this rerun instead of after the latest-run TTL
+    api.latest_run.clear()
+    return final
+
+
+def show_run_outcome(job):
+    if job["status"] == "SUCCESS":
+        st.success(f"{job['mode']} mode complete (run {job['run_id']})")
+    else:
+        st.error(f"Run {job['run_id']} failed: {job.get('error')}")
 
 # Sidebar
 st.sidebar.header("Execution Mode")
@@ -35,58 +77,58 @@ col1, col2 = st.sidebar.columns(2)
 with col1:
     if st.button("FAST"):
         with st.spinner("Running fast engine..."):
-            requests.post(f"{API_BASE}/run", params={"mode": "FAST"})
-            st.success("FAST mode complete")
+            show_run_outcome(run_engine("FAST"))
 
 with col2:
     if st.button("FULL"):
         with st.spinner("Running full engine..."):
-            requests.post(f"{API_BASE}/run", params={"mode": "FULL"})
-            st.success("FULL mode complete")
+            show_run_outcome(run_engine("FULL"))
 
 
-# Load data
+# Load data: a rerun with no newly finished run is served from the Streamlit cache
 try:
-    summary = api_get("/results/summary")
-    figures = api_get("/results/figures")
-    arrays = api_get("/results/arrays")
-    backtest = api_get("/results/backtest")
+    run_id, version = api.latest_run()
+    bundle = api.bundle(run_id, version)
 except Exception as e:
     st.error(f"Failed to fetch data from API: {e}")
     st.stop()
 
-# Tabs
-tabs = st.tabs([
+summary = bundle["summary"]
+figures = {**bundle["figures"], "version": version}
+backtest = bundle["backtest"]
+
+# Only the selected section renders, so figures and histograms load the first time it is opened
+SECTIONS = [
     "Overview & Risk Attribution",
     "Distributions",
     "Stress Tests",
     "Risk Limits",
     "Backtesting",
     "Quantum Theory (QAE)"
-])
-
-
-from sections.overview import render_overview
-from sections.distributions import render_distributions
-from sections.backtesting import render_backtesting
-from sections.stress import render_stress_tests
+]
+section = st.segmented_control(
+    "Section", SECTIONS, default=SECTIONS[0], key="section", label_visibility="collapsed"
+) or SECTIONS[0]
 
-with tabs[0]:
+if section == SECTIONS[0]:
     render_overview(summary)
 
-with tabs[1]:
-    render_distributions(figures)
+elif section == SECTIONS[1]:
+    render_distributions(figures, api.histogram(run_id, version))
 
-with tabs[2]:
+elif section == SECTIONS[2]:
     render_stress_tests(figures)
 
-with tabs[3]:
-    render_limits(figures)
+elif section == SECTIONS[3]:
+    render_limits(figures, bundle["limits"])
 
-with tabs[4]:
-    render_backtesting(figures, backtest)
+elif section == SECTIONS[4]:
+    if backtest:
+        render_backtesting(figures, backtest)
+    else:
+        st.info("No backtest results for this run yet.")
 
-with tabs[5]:
+else:
     st.subheader("Hybrid Quantum-Classical Architecture & QAE")
     st.markdown(r"""
     ### 1. Parameterized Quantum Circuit (PQC) & Entanglement
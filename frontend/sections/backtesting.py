@@ -1,4 +1,5 @@
 import streamlit as st
+from sections.figures import show_figure
 
 def render_backtesting(figures, backtest):
     st.subheader("Rolling Out-of-Sample Backtesting (Basel 99% VaR)")
@@ -22,14 +23,7 @@ def render_backtesting(figures, backtest):
         
     st.markdown("---")
 
-    import os
-    for fig in figures["available_figures"]:
-        if "backtesting" in fig or "confidence" in fig:
-            fig_path = f"figures/{fig}"
-            if os.path.exists(fig_path):
-                with open(fig_path, "rb") as f:
-                    img_bytes = f.read()
-                st.image(img_bytes, use_container_width=True)
+    show_figure(figures, "backtesting")
 
     st.markdown(
         r"""
@@ -1,18 +1,23 @@
 import streamlit as st
 import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
+from sections.figures import show_figure
 
-def render_distributions(figures):
+def render_distributions(figures, histogram=None):
     st.subheader("Risk Distributions")
 
-    import os
-    for fig in figures["available_figures"]:
-        if "distribution" in fig:
-            fig_path = f"figures/{fig}"
-            if os.path.exists(fig_path):
-                with open(fig_path, "rb") as f:
-                    img_bytes = f.read()
-                st.image(img_bytes, use_container_width=True)
+    if histogram:
+        # Server-side bins: a few KB instead of every scenario return
+        edges = np.asarray(histogram["edges"])
+        centers = (edges[:-1] + edges[1:]) / 2
+        chart = pd.DataFrame(
+            {name.capitalize(): s["counts"] for name, s in histogram["series"].items()},
+            index=pd.Index(np.round(centers, 4), name="Portfolio return"),
+        )
+        st.bar_chart(chart)
+
+    show_figure(figures, "distribution")
 
             
     st.markdown(
@@ -0,0 +1,9 @@
+import streamlit as st
+import api
+
+
+def show_figure(figures, name):
+    """Shows one figure of the loaded run; the API renders it from the run's data on first request."""
+    if name not in figures["available_figures"]:
+        return
+    st.image(api.figure(figures["run_id"], figures["version"], name), width="stretch")
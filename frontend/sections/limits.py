@@ -1,16 +1,14 @@
 import streamlit as st
-import requests
+from sections.figures import show_figure
 
-API_BASE = "http://127.0.0.1:8000"
-
-
-def render_limits(figures):
-    r = requests.get(f"{API_BASE}/results/limits")
-    r.raise_for_status()
-    limits = r.json()
 
+def render_limits(figures, limits):
     st.subheader("Daily Risk Limits")
 
+    if not limits:
+        st.info("No limit check for this run yet.")
+        return
+
     for metric, status in limits.items():
         if status == "PASS":
             st.success(f"{metric}: {status}")
@@ -21,14 +19,7 @@ def render_limits(figures):
 
     st.subheader("Plots")
 
-    import os
-    for fig in figures["available_figures"]:
-        if "risk_limits" in fig:
-            fig_path = f"figures/{fig}"
-            if os.path.exists(fig_path):
-                with open(fig_path, "rb") as f:
-                    img_bytes = f.read()
-                st.image(img_bytes, use_container_width=True)
+    show_figure(figures, "risk_limits")
     
     
     st.markdown(
@@ -1,13 +1,17 @@
 import os
+from datetime import datetime
 import numpy as np
-import matplotlib.pyplot as plt
 
-from src.engine.config import TICKERS, DEFAULT_WEIGHTS, BACKTEST_WINDOW, FIGURES_DIR
+from src.engine.config import TICKERS, DEFAULT_WEIGHTS, BACKTEST_WINDOW
 from src.engine.backtester import get_historical_data, get_basel_status
-from src.engine.database import log_backtest, init_db
+from src.engine.database import log_backtests, log_backtest_series, init_db
+from src.engine.audit import get_audit_writer
+from src.engine.scenario_store import update_manifest, add_arrays
+from src.engine.figures import export_figure
+from src.engine.progress import get_reporter
 from src.engine.risk_metrics import calculate_var_cvar
 
-def run_backtesting():
+def run_backtesting(run_id=None):
     init_db()
     print(f"Running rolling historical backtesting over {BACKTEST_WINDOW} days...")
     
@@ -36,7 +40,10 @@ def run_backtesting():
     exception_days_q = []
     exception_days_c = []
     
+    progress = get_reporter(run_id)
+    n_days = len(returns_history) - BACKTEST_WINDOW
     for t in range(BACKTEST_WINDOW, len(returns_history)):
+        progress.progress("backtesting", t - BACKTEST_WINDOW, n_days, unit="days")
         window_returns = portfolio_history[t - BACKTEST_WINDOW : t]
         actual_return = portfolio_history[t]
         actual_loss = -actual_return
@@ -70,37 +77,35 @@ def run_backtesting():
     print(f"Quantum Exceptions  : {q_exceptions}/{total_days} ({q_exceptions/total_days:.2%}) -> {q_status}")
     print(f"Classical Exceptions: {c_exceptions}/{total_days} ({c_exceptions/total_days:.2%}) -> {c_status}")
 
-    # Plot 1: Exception count bar chart
-    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
-    
-    colors_q = '#2ecc71' if q_status == 'GREEN' else '#f39c12' if q_status == 'YELLOW' else '#e74c3c'
-    colors_c = '#2ecc71' if c_status == 'GREEN' else '#f39c12' if c_status == 'YELLOW' else '#e74c3c'
-    
-    axes[0].bar(["Quantum", "Classical"], [q_exceptions, c_exceptions], color=[colors_q, colors_c])
-    axes[0].axhline(y=4, color='green', linestyle='--', alpha=0.7, label="Green Threshold (4)")
-    axes[0].axhline(y=9, color='orange', linestyle='--', alpha=0.7, label="Yellow Threshold (9)")
-    axes[0].set_ylabel("Number of Exceptions")
-    axes[0].set_title(f"Basel Traffic Light: 99% VaR ({total_days} days)")
-    axes[0].legend(fontsize=8)
-    
-    # Plot 2: Time series of losses vs VaR
-    days = np.arange(total_days)
-    axes[1].plot(days, daily_losses, alpha=0.5, linewidth=0.8, label="Actual Loss", color='gray')
-    axes[1].plot(days, daily_var_c, label="Classical 99% VaR", color='blue', linewidth=1.2)
-    axes[1].plot(days, daily_var_q, label="Quantum 99% VaR", color='red', linewidth=1.2, linestyle='--')
-    if exception_days_c:
-        exc_losses = [daily_losses[d] for d in exception_days_c]
-        axes[1].scatter(exception_days_c, exc_losses, color='red', s=20, zorder=5, label="Exceptions")
-    axes[1].set_xlabel("Trading Day")
-    axes[1].set_ylabel("Loss")
-    axes[1].set_title("Rolling VaR Exceedances")
-    axes[1].legend(fontsize=8)
-    
-    plt.tight_layout()
-    plt.savefig(str(FIGURES_DIR / "backtesting.png"), dpi=300)
-    plt.close()
-    
-    log_backtest(q_exceptions, c_exceptions, total_days, q_status)
+    audit = get_audit_writer()
+    timestamp = datetime.utcnow().isoformat()
+    audit.submit_rows(log_backtests, [
+        (timestamp, q_exceptions, c_exceptions, total_days, q_status, run_id)
+    ])
+    if run_id is not None:
+        # Same fields as the backtest_results row, so readers can serve it straight from the manifest
+        update_manifest(run_id, backtest={
+            "run_id": run_id,
+            "timestamp": timestamp,
+            "quantum_exceptions": q_exceptions,
+            "classical_exceptions": c_exceptions,
+            "total_days": total_days,
+            "basel_status": q_status,
+            "classical_status": c_status,
+        })
+        # Daily series for the backtesting figure, which is rendered on demand from the run store
+        add_arrays(run_id, {
+            "bt_losses": np.asarray(daily_losses),
+            "bt_var_q": np.asarray(daily_var_q),
+            "bt_var_c": np.asarray(daily_var_c),
+        })
+        exc_q = set(exception_days_q)
+        exc_c = set(exception_days_c)
+        audit.submit_rows(log_backtest_series, [
+            (day, float(daily_losses[day]), float(daily_var_q[day]), float(daily_var_c[day]),
+             int(day in exc_q), int(day in exc_c))
+            for day in range(total_days)
+        ], run_id)
     
     print("Backtesting completed.")
     return {
@@ -108,8 +113,13 @@ def run_backtesting():
         "classical_exceptions": c_exceptions,
         "total_days": total_days,
         "quantum_status": q_status,
-        "classical_status": c_status
+        "classical_status": c_status,
+        "losses": daily_losses,
+        "var_quantum": daily_var_q,
+        "var_classical": daily_var_c,
     }
 
 if __name__ == "__main__":
-    run_backtesting()
+    result = run_backtesting()
+    if result is not None:
+        export_figure("backtesting", {**result, "basel_status": result["quantum_status"]})
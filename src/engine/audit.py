@@ -0,0 +1,193 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from src.engine.config import (
+    AUDIT_QUEUE_SIZE, AUDIT_BATCH_SIZE, AUDIT_PUT_TIMEOUT, AUDIT_FLUSH_TIMEOUT
+)
+
+logger = logging.getLogger(__name__)
+
+_FLUSH = object()
+_STOP = object()
+
+
+class AuditWriter:
+    """
+    Write-behind sink for audit rows and artifacts.
+    Pipeline stages enqueue work and return immediately; one background thread drains the
+    bounded queue, merging consecutive row batches for the same writer into a single call
+    (one executemany / one transaction). When the queue is full, producers wait up to
+    AUDIT_PUT_TIMEOUT seconds (backpressure) and the item is then dropped and counted.
+    """
+
+    def __init__(self, max_queue=AUDIT_QUEUE_SIZE, batch_size=AUDIT_BATCH_SIZE, put_timeout=AUDIT_PUT_TIMEOUT):
+        self.batch_size = batch_size
+        self.put_timeout = put_timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stats = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped": 0,
+            "backpressure_waits": 0,
+            "errors": 0,
+            "max_depth": 0,
+        }
+
+    # -- producer side -----------------------------------------------------
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+
+    def _put(self, item):
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._lock:
+                self._stats["backpressure_waits"] += 1
+            try:
+                self._queue.put(item, timeout=self.put_timeout)
+            except queue.Full:
+                with self._lock:
+                    self._stats["dropped"] += 1
+                logger.warning("Audit queue full, dropped %s", getattr(item[0], "__name__", item[0]))
+                return False
+        with self._lock:
+            self._stats["enqueued"] += 1
+            self._stats["max_depth"] = max(self._stats["max_depth"], self._queue.qsize())
+        return True
+
+    def submit_rows(self, fn, rows, *args):
+        """Queues fn(*args, rows); consecutive submissions with the same fn and args are merged."""
+        return self._put((fn, args, list(rows)))
+
+    def submit_call(self, fn, *args, **kwargs):
+        """Queues a single fn(*args, **kwargs) call."""
+        return self._put((fn, args, kwargs))
+
+    def submit_file(self, path, data):
+        """Queues an atomic write of bytes to path."""
+        return self._put((_write_file, (str(path),), {"data": data}))
+
+    def flush(self, timeout=AUDIT_FLUSH_TIMEOUT):
+        """Blocks until everything queued before this call is written. Returns False on timeout."""
+        if self._thread is None:
+            return True
+        deadline = time.monotonic() + timeout
+        done = threading.Event()
+        try:
+            self._queue.put((_FLUSH, (), done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(max(deadline - time.monotonic(), 0.0))
+
+    def close(self, timeout=AUDIT_FLUSH_TIMEOUT):
+        if self._thread is None or not self._thread.is_alive():
+            return
+        if not self.flush(timeout):
+            logger.warning("Audit writer did not drain within %.1f s; %d items left", timeout, self._queue.qsize())
+            return
+        try:
+            self._queue.put((_STOP, (), None), timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, "queue_depth": self._queue.qsize()}
+
+    # -- writer thread -----------------------------------------------------
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not self._process(batch):
+                return
+
+    def _process(self, batch):
+        pending = None  # (fn, args, rows) being merged
+        keep_running = True
+
+        def write_pending():
+            if pending is not None:
+                fn, args, rows = pending
+                self._execute(fn, *args, rows, count=len(rows))
+
+        for fn, args, payload in batch:
+            if fn is _FLUSH or fn is _STOP:
+                write_pending()
+                pending = None
+                if fn is _FLUSH:
+                    payload.set()
+                else:
+                    keep_running = False
+            elif isinstance(payload, list):
+                if pending is not None and pending[0] is fn and pending[1] == args:
+                    pending[2].extend(payload)
+                else:
+                    write_pending()
+                    pending = (fn, args, list(payload))
+            else:
+                write_pending()
+                pending = None
+                self._execute(fn, *args, count=1, **payload)
+
+        write_pending()
+        for _ in batch:
+            self._queue.task_done()
+        return keep_running
+
+    def _execute(self, fn, *args, count=1, **kwargs):
+        try:
+            fn(*args, **kwargs)
+            with self._lock:
+                self._stats["written"] += count
+        except Exception:
+            with self._lock:
+                self._stats["errors"] += 1
+            logger.exception("Audit write failed: %s", getattr(fn, "__name__", fn))
+
+
+def _write_file(path, data):
+    # Unique temp name so concurrent writers of the same artifact never share a temp file
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+_writer = None
+_writer_pid = None
+_writer_lock = threading.Lock()
+
+
+def get_audit_writer():
+    """Process-wide writer (recreated after a fork, since threads do not survive it)."""
+    global _writer, _writer_pid
+    with _writer_lock:
+        if _writer is None or _writer_pid != os.getpid():
+            _writer = AuditWriter()
+            _writer_pid = os.getpid()
+        return _writer
+
+
+@atexit.register
+def _close_on_exit():
+    # Normal interpreter shutdown drains the queue so the audit trail is complete
+    if _writer is not None and _writer_pid == os.getpid():
+        _writer.close()
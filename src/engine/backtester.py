@@ -1,21 +1,30 @@
 import numpy as np
-import pandas as pd
 import datetime
 
-try:
-    import yfinance as yf
-    YFINANCE_AVAILABLE = True
-except ImportError:
-    YFINANCE_AVAILABLE = False
-
-from src.engine.config import TICKERS, HISTORY_DAYS, FALLBACK_MU, FALLBACK_SIGMA, FALLBACK_CORR
+from src.engine.config import (
+    TICKERS, HISTORY_DAYS, FALLBACK_MU, FALLBACK_SIGMA, FALLBACK_CORR, MOCK_MU, MOCK_SIGMA, MOCK_CORR,
+    PRICE_SOURCE
+)
 
 def get_historical_data(tickers=TICKERS, days=HISTORY_DAYS):
     """
     Fetches historical daily returns for the specified tickers.
     Falls back to a realistic multivariate normal mock generator if yfinance fails.
+    With PRICE_SOURCE = "local" the returns come from the local price store instead (no network).
     """
-    if YFINANCE_AVAILABLE:
+    if PRICE_SOURCE == "local":
+        from src.engine.price_store import read_returns
+        return read_returns(list(tickers), days)
+
+    # Imported on first use: pandas and yfinance add about a second to any process that imports the engine
+    try:
+        import pandas as pd
+        import yfinance as yf
+        yfinance_available = True
+    except ImportError:
+        yfinance_available = False
+
+    if yfinance_available:
         try:
             end_date = datetime.date.today()
             start_date = end_date - datetime.timedelta(days=int(days * 1.5))
@@ -42,22 +51,34 @@ def get_historical_data(tickers=TICKERS, days=HISTORY_DAYS):
             return returns.values
         except Exception as e:
             print(f"yfinance failed: {e}. Falling back to mock data.")
-            return generate_mock_history(days)
+            return generate_mock_history(days, len(tickers))
     else:
         print("yfinance not installed. Using mock data.")
-        return generate_mock_history(days)
+        return generate_mock_history(days, len(tickers))
 
-def generate_mock_history(days):
-    """Generates a realistic mock history of daily returns using a multivariate normal"""
-    mu = np.array(FALLBACK_MU) / 252.0  # Daily drift
-    sigma = np.array(FALLBACK_SIGMA) / np.sqrt(252.0)  # Daily volatility
-    corr = np.array(FALLBACK_CORR)
+def generate_mock_history(days, num_assets=None, seed=None):
+    """
+    Generates a realistic mock history of daily returns using a multivariate normal.
+    Universes other than the default one get generic equity-like parameters (one common factor).
+    Draws from the global RNG unless a seed is given; see src.engine.synthetic for larger,
+    fat-tailed universes.
+    """
+    if num_assets is None or num_assets == len(FALLBACK_MU):
+        mu = np.array(FALLBACK_MU) / 252.0  # Daily drift
+        sigma = np.array(FALLBACK_SIGMA) / np.sqrt(252.0)  # Daily volatility
+        corr = np.array(FALLBACK_CORR)
+    else:
+        mu = np.full(num_assets, MOCK_MU) / 252.0
+        sigma = np.full(num_assets, MOCK_SIGMA) / np.sqrt(252.0)
+        corr = np.full((num_assets, num_assets), MOCK_CORR)
+        np.fill_diagonal(corr, 1.0)
     
     # Construct covariance matrix
     cov = np.outer(sigma, sigma) * corr
     
     # Generate daily returns
-    returns = np.random.multivariate_normal(mu, cov, size=days)
+    rng = np.random if seed is None else np.random.default_rng(seed)
+    returns = rng.multivariate_normal(mu, cov, size=days)
     return returns
 
 def get_basel_status(exceptions, total_days):
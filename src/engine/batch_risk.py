@@ -0,0 +1,239 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timezone
+from functools import lru_cache
+
+import numpy as np
+
+from src.engine.config import (
+    QUBITS_PER_ASSET, FAST_SHOTS, DEFAULT_SHOTS, TRADING_DAYS, RISK_UNIVERSE_CACHE, RISK_RESULT_CACHE
+)
+from src.engine.backtester import get_historical_data
+from src.engine.compact import rescale_horizon
+from src.engine.profiling import traced
+from src.engine.quantum_engine import QuantumRiskEngine
+
+ENGINES = ("quantum", "classical")
+
+
+class UniverseScenarios:
+    """Calibrated parameters and one-year scenario asset returns for a ticker universe."""
+
+    def __init__(self, tickers, mu, sigma, returns):
+        self.tickers = tickers
+        self.mu = mu
+        self.sigma = sigma
+        self.returns = returns  # engine -> (shots, n_assets), read-only
+
+    def horizon_returns(self, engine, horizon_days):
+        base = self.returns[engine]
+        if horizon_days == TRADING_DAYS:
+            return base
+        return rescale_horizon(base, self.mu, self.sigma, 1.0, horizon_days / TRADING_DAYS)
+
+
+def data_date():
+    """As-of date of the market data: daily history changes at most once per day."""
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+def calibrate_history(returns_history):
+    """Annualised drift, volatility and a positive semi-definite correlation matrix."""
+    mu = np.mean(returns_history, axis=0) * TRADING_DAYS
+    sigma = np.std(returns_history, axis=0) * np.sqrt(TRADING_DAYS)
+    corr = np.atleast_2d(np.corrcoef(returns_history, rowvar=False))
+    min_eig = np.min(np.real(np.linalg.eigvals(corr)))
+    if min_eig < 0:
+        corr -= 1.1 * min_eig * np.eye(*corr.shape)
+    return mu, sigma, corr
+
+
+@lru_cache(maxsize=RISK_UNIVERSE_CACHE)
+def simulate_universe(universe, as_of, shots):
+    """
+    Calibrates and simulates one ticker universe (a sorted tuple) once per data date.
+    The seed is derived from (universe, date), so an evicted universe is rebuilt identically.
+    """
+    mu, sigma, corr = calibrate_history(get_historical_data(list(universe)))
+    seed = int.from_bytes(hashlib.sha256(repr((universe, as_of)).encode()).digest()[:8], "little")
+
+    engine = QuantumRiskEngine(num_assets=len(universe), qubits_per_asset=QUBITS_PER_ASSET, shots=shots, seed=seed)
+    engine.calibrate(corr)
+    returns = {
+        "quantum": engine.generate_correlated_returns(mu, sigma, corr),
+        "classical": engine.generate_classical_returns(mu, sigma, corr),
+    }
+    for arr in returns.values():
+        arr.setflags(write=False)
+    return UniverseScenarios(universe, mu, sigma, returns)
+
+
+@traced("risk.batch_portfolios")
+def evaluate_portfolios(asset_returns, weights, confidence_levels, scenario_weights=None):
+    """
+    VaR/CVaR for many portfolios over the same scenarios in one pass.
+    asset_returns (shots, n), weights (P, n) -> var, cvar of shape (P, C), with the same estimators as
+    calculate_var_cvar (or calculate_weighted_var_cvar when likelihood-ratio scenario_weights are given).
+    The order statistics are found with partial partitions rather than a full sort;
+    P&L is laid out (P, shots) so every partition runs over contiguous memory.
+    """
+    port = np.asarray(weights, dtype=asset_returns.dtype) @ asset_returns.T  # (P, shots)
+    if scenario_weights is not None:
+        return _evaluate_weighted(port, np.asarray(scenario_weights, dtype=np.float64), confidence_levels)
+
+    shots = port.shape[1]
+    positions = [(1 - c) * (shots - 1) for c in confidence_levels]
+    # Partition in place at the largest tail position, then at each smaller one within the selected prefix
+    cuts = sorted({int(np.floor(pos)) for pos in positions}, reverse=True)
+    port.partition(cuts[0], axis=1)
+    for prev, cut in zip(cuts, cuts[1:]):
+        port[:, :prev].partition(cut, axis=1)
+
+    var = np.empty((port.shape[0], len(confidence_levels)))
+    cvar = np.empty_like(var)
+    for j, pos in enumerate(positions):
+        lo = int(np.floor(pos))
+        hi = min(lo + 1, shots - 1)
+        # Everything after lo is no smaller than port[lo], so the next order statistic is their minimum
+        next_stat = port[:, hi:].min(axis=1)
+        threshold = port[:, lo] + (pos - lo) * (next_stat - port[:, lo])
+        # The tail is the partitioned prefix, plus values tied with the threshold in rows where the next order statistic reaches it
+        tail_sum = port[:, :lo + 1].sum(axis=1, dtype=np.float64)
+        tail_n = np.full(port.shape[0], lo + 1)
+        tied = np.flatnonzero(next_stat <= threshold) if hi > lo else []
+        if len(tied):
+            rest = port[tied, lo + 1:]
+            in_tail = rest <= threshold[tied, None]
+            tail_sum[tied] += np.where(in_tail, rest, 0).sum(axis=1)
+            tail_n[tied] += in_tail.sum(axis=1)
+        var[:, j] = -threshold
+        cvar[:, j] = -tail_sum / tail_n
+    return var, cvar
+
+
+def _evaluate_weighted(port, scenario_weights, confidence_levels):
+    # Weighted quantiles need the full order: sort each row once and read VaR/CVaR off cumulative sums
+    shots = port.shape[1]
+    order = np.argsort(port, axis=1)
+    sorted_port = np.take_along_axis(port, order, axis=1)
+    w = scenario_weights[order]
+    cum_w = np.cumsum(w, axis=1)
+    cum_wx = np.cumsum(w * sorted_port, axis=1)
+    rows = np.arange(port.shape[0])
+
+    var = np.empty((port.shape[0], len(confidence_levels)))
+    cvar = np.empty_like(var)
+    for j, c in enumerate(confidence_levels):
+        # Normalised by N, as in weighted_quantile
+        idx = np.minimum((cum_w < (1 - c) * shots).sum(axis=1), shots - 1)
+        threshold = sorted_port[rows, idx]
+        k = (sorted_port <= threshold[:, None]).sum(axis=1)  # tail is a prefix of the sorted row, ties included
+        var[:, j] = -threshold
+        cvar[:, j] = -cum_wx[rows, k - 1] / cum_w[rows, k - 1]
+    return var, cvar
+
+
+class ResultCache:
+    """Thread-safe LRU of per-portfolio results keyed by request fingerprint."""
+
+    def __init__(self, maxsize=RISK_RESULT_CACHE):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+result_cache = ResultCache()
+
+
+def fingerprint(universe, weights, confidence_levels, horizon_days, shots, as_of):
+    """Stable key for one portfolio request; weights are in universe order."""
+    payload = json.dumps(
+        [list(universe), [round(float(w), 12) for w in weights], sorted(confidence_levels), horizon_days, shots, as_of]
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def compute_batch(portfolios, mode="FAST", as_of=None):
+    """
+    Risk for a batch of portfolios, each a dict with tickers, weights, confidence_levels and horizon_days.
+    Portfolios are grouped by ticker universe, so every universe is simulated once, and each
+    (universe, horizon) group is evaluated in one vectorized pass. Results are memoized by fingerprint
+    and data date. Returns (results in request order, number of universes simulated).
+    """
+    as_of = as_of or data_date()
+    shots = FAST_SHOTS if mode == "FAST" else DEFAULT_SHOTS
+    results = [None] * len(portfolios)
+    pending = defaultdict(list)  # (universe, horizon) -> [(position, universe weights, levels, key)]
+
+    for pos, p in enumerate(portfolios):
+        universe = tuple(sorted(p["tickers"]))
+        by_ticker = dict(zip(p["tickers"], p["weights"]))
+        weights = [by_ticker[t] for t in universe]
+        levels = tuple(sorted(set(p["confidence_levels"])))
+        key = fingerprint(universe, weights, levels, p["horizon_days"], shots, as_of)
+        cached = result_cache.get(key)
+        if cached is not None:
+            results[pos] = {**cached, "cached": True}
+        else:
+            pending[(universe, p["horizon_days"])].append((pos, weights, levels, key))
+
+    universes = {universe for universe, _ in pending}
+    for (universe, horizon), group in pending.items():
+        scenarios = simulate_universe(universe, as_of, shots)
+        all_levels = sorted({c for _, _, levels, _ in group for c in levels})
+        weights = np.array([w for _, w, _, _ in group])
+        column = {c: j for j, c in enumerate(all_levels)}
+
+        per_engine = {}
+        for engine in ENGINES:
+            per_engine[engine] = evaluate_portfolios(scenarios.horizon_returns(engine, horizon), weights, all_levels)
+
+        for row, (pos, _, levels, key) in enumerate(group):
+            result = {
+                "tickers": list(universe),
+                "horizon_days": horizon,
+                "data_date": as_of,
+                "metrics": {
+                    engine: {
+                        str(c): {
+                            "VaR": float(per_engine[engine][0][row, column[c]]),
+                            "CVaR": float(per_engine[engine][1][row, column[c]]),
+                        }
+                        for c in levels
+                    }
+                    for engine in ENGINES
+                },
+            }
+            result_cache.put(key, result)
+            results[pos] = {**result, "cached": False}
+
+    return results, len(universes)
@@ -0,0 +1,89 @@
+import numpy as np
+
+from src.engine.profiling import traced
+
+
+def code_dtype(bits):
+    """Smallest unsigned integer dtype that holds a `bits`-wide code."""
+    for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if bits <= np.iinfo(dtype).bits:
+            return np.dtype(dtype)
+    raise ValueError(f"Codes wider than 64 bits cannot be packed ({bits} bits)")
+
+
+def pack_codes(codes, qubits_per_asset):
+    """
+    Packs per-asset codes of shape (shots, num_assets) into one integer per scenario.
+    Asset i occupies bits [i*q, (i+1)*q). 3 assets x 4 qubits -> one uint16 per scenario.
+    If the scenario does not fit in 64 bits the per-asset matrix is returned unchanged.
+    """
+    codes = np.asarray(codes)
+    num_assets = codes.shape[1]
+    total_bits = num_assets * qubits_per_asset
+    if total_bits > 64:
+        return codes.astype(code_dtype(qubits_per_asset), copy=False)
+
+    dtype = code_dtype(total_bits)
+    packed = np.zeros(codes.shape[0], dtype=dtype)
+    for i in range(num_assets):
+        packed |= codes[:, i].astype(dtype) << dtype.type(i * qubits_per_asset)
+    return packed
+
+
+def unpack_codes(packed, num_assets, qubits_per_asset):
+    """Inverse of pack_codes: returns per-asset codes of shape (shots, num_assets)."""
+    packed = np.asarray(packed)
+    if packed.ndim == 2:
+        return packed
+
+    dtype = packed.dtype
+    mask = dtype.type((1 << qubits_per_asset) - 1)
+    codes = np.empty((packed.shape[0], num_assets), dtype=code_dtype(qubits_per_asset))
+    for i in range(num_assets):
+        codes[:, i] = (packed >> dtype.type(i * qubits_per_asset)) & mask
+    return codes
+
+
+def rebuild_shocks(packed, lut, num_assets, qubits_per_asset):
+    """Rebuilds independent shocks (shots, num_assets) from stored codes and the level lookup table."""
+    return np.asarray(lut)[unpack_codes(packed, num_assets, qubits_per_asset)]
+
+
+def rebuild_returns(packed, lut, chol, mu, sigma, qubits_per_asset, T=1.0):
+    """Rebuilds correlated GBM asset returns from stored codes, identical to the engine's own mapping."""
+    chol = np.asarray(chol)
+    z = rebuild_shocks(packed, lut, chol.shape[0], qubits_per_asset)
+    return shocks_to_returns(z, chol, mu, sigma, T)
+
+
+@traced("gbm_returns")
+def shocks_to_returns(z_indep, chol, mu, sigma, T=1.0):
+    """
+    Correlates independent shocks and maps them to GBM returns,
+    R = exp((mu - sigma^2/2) T + sigma sqrt(T) Z) - 1, with a single (shots, n_assets) allocation.
+    """
+    dtype = z_indep.dtype
+    mu = np.asarray(mu, dtype=dtype)
+    sigma = np.asarray(sigma, dtype=dtype)
+
+    returns = z_indep @ np.asarray(chol, dtype=dtype).T
+    returns *= sigma * dtype.type(np.sqrt(T))
+    returns += (mu - dtype.type(0.5) * sigma ** 2) * dtype.type(T)
+    np.expm1(returns, out=returns)
+    return returns
+
+
+def rescale_horizon(returns, mu, sigma, T_from, T_to):
+    """
+    Re-maps GBM returns simulated over T_from to horizon T_to using the same underlying shocks,
+    so every horizon of a run is evaluated on identical scenarios.
+    """
+    dtype = returns.dtype
+    drift = np.asarray(mu, dtype=dtype) - dtype.type(0.5) * np.asarray(sigma, dtype=dtype) ** 2
+
+    out = np.log1p(returns)
+    out -= drift * dtype.type(T_from)
+    out *= dtype.type(np.sqrt(T_to / T_from))
+    out += drift * dtype.type(T_to)
+    np.expm1(out, out=out)
+    return out
@@ -6,12 +6,13 @@ PROJECT_ROOT = Path(__file__).resolve().parents[2]
 DATA_DIR = PROJECT_ROOT / "data"
 FIGURES_DIR = PROJECT_ROOT / "figures"
 DB_PATH = DATA_DIR / "risk_system.db"
-RISK_STATE_FILE = DATA_DIR / "risk_state.npz"
+RUNS_DIR = DATA_DIR / "runs"
 LIMITS_FILE = DATA_DIR / "risk_limits.json"
 
 # Ensure directories exist
 os.makedirs(DATA_DIR, exist_ok=True)
 os.makedirs(FIGURES_DIR, exist_ok=True)
+os.makedirs(RUNS_DIR, exist_ok=True)
 
 # Assets Configuration
 TICKERS = ["SPY", "AAPL", "GLD"]
@@ -26,10 +27,15 @@ FALLBACK_CORR = [
     [0.6, 1.0, 0.1],
     [-0.1, 0.1, 1.0]
 ]
+# Generic per-asset parameters for mock histories of other ticker universes
+MOCK_MU = 0.07
+MOCK_SIGMA = 0.20
+MOCK_CORR = 0.3
 
 # Risk Configuration
 CONFIDENCE_LEVELS = [0.95, 0.99]
 HORIZONS = [1, 10]  # in days
+TRADING_DAYS = 252  # Headline metrics use a one-year (T=1.0) horizon
 DISTRIBUTION = "Normal"  # or "Student-t"
 STUDENT_T_DF = 4.0
 
@@ -42,11 +48,92 @@ DEFAULT_SHOTS = 10000
 FAST_SHOTS = 2000
 USE_NOISE = False
 NOISE_PROBABILITY = 0.01
+# "analytic": depolarizing noise applied as vectorized bit flips on pure-state samples (fast)
+# "density_matrix": DepolarizingChannel on the default.mixed simulator (4^n memory)
+NOISE_MODEL = "analytic"
+
+# "structured": exact per-register sampling along the CNOT chain, linear in the number of registers
+# "statevector": PennyLane QNode over the full 2^(assets*qubits) state (small systems / reference)
+SAMPLER = "structured"
+
+# Importance sampling: shocks are shifted IS_SHIFT standard deviations towards portfolio
+# losses and every scenario carries a likelihood-ratio weight (tuned for 99%/99.9% tails)
+IMPORTANCE_SAMPLING = False
+IS_SHIFT = 2.5
+
+# Adaptive shots (mode "ADAPTIVE"): scenarios are generated in growing rounds until the batch-means
+# standard error of every VaR/CVaR estimate is within ADAPTIVE_TARGET_REL_ERROR of the estimate,
+# or the time budget or shot cap is reached
+ADAPTIVE_INITIAL_SHOTS = 2000
+ADAPTIVE_MAX_SHOTS = 1_000_000
+ADAPTIVE_TARGET_REL_ERROR = 0.01
+ADAPTIVE_TIME_BUDGET_SEC = 60.0
+ADAPTIVE_BATCHES = 20
+ADAPTIVE_MAX_GROWTH = 8.0  # at most 8x the shots so far per round
+
+# Numerics: "float64" (default) or "float32" (half the memory for scenario matrices)
+COMPUTE_DTYPE = "float64"
 
 # Training/Calibration
 CALIBRATION_EPOCHS = 20
 LEARNING_RATE = 0.1
 
+# SQLite access layer
+DB_POOL_SIZE = 8
+DB_CACHE_KIB = 16 * 1024        # Page cache per connection
+DB_BUSY_TIMEOUT_MS = 5000
+
+# Write-behind audit sink (SQLite audit rows and figure files)
+AUDIT_QUEUE_SIZE = 1000
+AUDIT_BATCH_SIZE = 200          # Queue items drained per writer wake-up
+AUDIT_PUT_TIMEOUT = 1.0         # Seconds a producer waits on a full queue before dropping
+AUDIT_FLUSH_TIMEOUT = 30.0
+
+# Scenario Store (one directory per run under data/runs/)
+RUN_RETENTION = 20                       # Completed runs kept on disk
+RUN_RETENTION_BYTES = 2 * 1024 ** 3      # Upper bound on total store size
+STALE_RUN_SECONDS = 24 * 3600            # Unfinished run directories older than this are removed
+PROGRESS_MIN_INTERVAL = 0.5              # Seconds between progress events within a stage
+
+# Profiling: "spans" times the engine hot paths (sampling, ppf mapping, Cholesky, risk kernels, SQLite
+# writes, plotting) per stage; "cprofile" and "tracemalloc" also capture snapshots. Written to the run
+# directory and served by GET /runs/{id}/profile. Comma-separated, "all" for every option; POST /run?profile=
+PROFILE = os.environ.get("RISK_PROFILE", "")
+PROFILE_TOP = 30                         # Functions / allocation sites kept in the report
+
+# Operational metrics (GET /metrics, Prometheus text format): histogram bucket bounds in seconds
+STAGE_DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+RUN_DURATION_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+REQUEST_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+DB_WRITE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+
+# Figures are rendered on demand from a run's stored data (GET /figures/{name}) and cached in its directory.
+# RENDER_FIGURES additionally renders all of them at the end of every pipeline run and refreshes figures/.
+RENDER_FIGURES = False
+FIGURE_DPI = 150                         # Default resolution of on-demand figures
+FIGURE_MAX_DPI = 300
+
+# Batch portfolio risk (POST /risk)
+RISK_UNIVERSE_CACHE = 8                  # Simulated ticker universes kept in memory
+RISK_RESULT_CACHE = 4096                 # Memoized per-portfolio results
+RISK_MAX_PORTFOLIOS = 1000               # Portfolios per request
+
+# Market data: "yfinance" (the mock history when offline) or "local", the price store in PRICE_STORE_DIR
+# (e.g. a synthetic market written by `python -m src.engine.synthetic`)
+PRICE_SOURCE = os.environ.get("RISK_PRICE_SOURCE", "yfinance")
+PRICE_STORE_DIR = DATA_DIR / "prices"
+
+# Synthetic market (src/engine/synthetic.py): factor model with Student-t shocks, GARCH(1,1)
+# volatility clustering and a calm/stress Markov regime
+SYNTH_FACTORS = 3
+SYNTH_DF = 5.0                           # Student-t degrees of freedom of every shock
+SYNTH_GARCH_ALPHA = 0.08
+SYNTH_GARCH_BETA = 0.90
+SYNTH_REGIME_STAY = (0.99, 0.95)         # Daily probability of staying calm / stressed
+SYNTH_REGIME_DRIFT = (0.10, -0.30)       # Annual drift, calm / stressed
+SYNTH_STRESS_VOL = 1.8                   # Volatility multiplier when stressed
+SYNTH_STRESS_FACTOR = 1.6                # Extra factor volatility when stressed (correlations rise)
+
 # Backtesting Configuration
 HISTORY_DAYS = 500
 BACKTEST_WINDOW = 250
@@ -57,3 +144,7 @@ LIMITS = {
     "VaR_95": 0.22,
     "CVaR_95": 0.28
 }
+# Hierarchical limits (firm -> desk -> book); without the file the firm holds the default portfolio
+LIMIT_TREE_FILE = DATA_DIR / "limit_tree.json"
+LIMIT_WARNING_RATIO = 0.9                # WARNING above this share of a limit
+LIMIT_NODE_CHUNK = 512                   # Nodes evaluated (and persisted) per batch
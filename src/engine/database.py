@@ -1,16 +1,20 @@
+import base64
+import json
+import os
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from src.engine.config import DB_PATH
+from src.engine.config import DB_PATH, DB_POOL_SIZE, DB_CACHE_KIB, DB_BUSY_TIMEOUT_MS
+from src.engine.profiling import span
+from src.engine.metrics import DB_WRITE
 
-def get_connection():
-    return sqlite3.connect(DB_PATH)
-
-def init_db():
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    # Executions log
-    cursor.execute('''
+# Schema migrations, applied in order at most once per database (tracked in PRAGMA user_version)
+MIGRATIONS = [
+    # 1: initial schema
+    [
+        '''
         CREATE TABLE IF NOT EXISTS execution_logs (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             timestamp TEXT NOT NULL,
@@ -21,10 +25,8 @@ def init_db():
             quantum_cvar_95 REAL,
             classical_cvar_95 REAL
         )
-    ''')
-    
-    # Backtesting results
-    cursor.execute('''
+        ''',
+        '''
         CREATE TABLE IF NOT EXISTS backtest_results (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             timestamp TEXT NOT NULL,
@@ -33,57 +35,464 @@ def init_db():
             total_days INTEGER,
             basel_status TEXT
         )
-    ''')
-    
+        ''',
+    ],
+    # 2: normalized run history (one row per run; metrics, attribution and backtest series keyed by run_id)
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS runs (
+            run_id TEXT PRIMARY KEY,
+            created_at TEXT NOT NULL,
+            mode TEXT NOT NULL,
+            status TEXT NOT NULL,
+            shots INTEGER,
+            tickers TEXT,
+            weights TEXT
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_runs_created_at ON runs (created_at, run_id)",
+        '''
+        CREATE TABLE IF NOT EXISTS run_metrics (
+            run_id TEXT NOT NULL,
+            engine TEXT NOT NULL,
+            confidence REAL NOT NULL,
+            horizon_days INTEGER NOT NULL,
+            var REAL,
+            cvar REAL,
+            PRIMARY KEY (run_id, engine, confidence, horizon_days)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS run_attribution (
+            run_id TEXT NOT NULL,
+            engine TEXT NOT NULL,
+            asset TEXT NOT NULL,
+            marginal_var REAL,
+            component_var REAL,
+            PRIMARY KEY (run_id, engine, asset)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS backtest_series (
+            run_id TEXT NOT NULL,
+            day INTEGER NOT NULL,
+            loss REAL,
+            var_quantum REAL,
+            var_classical REAL,
+            exception_quantum INTEGER,
+            exception_classical INTEGER,
+            PRIMARY KEY (run_id, day)
+        ) WITHOUT ROWID
+        ''',
+        "ALTER TABLE execution_logs ADD COLUMN run_id TEXT",
+        "ALTER TABLE backtest_results ADD COLUMN run_id TEXT",
+        "CREATE INDEX IF NOT EXISTS idx_execution_logs_timestamp ON execution_logs (timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_backtest_results_timestamp ON backtest_results (timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_execution_logs_run_id ON execution_logs (run_id)",
+        "CREATE INDEX IF NOT EXISTS idx_backtest_results_run_id ON backtest_results (run_id, timestamp)",
+    ],
+    # 3: per-node results of the hierarchical limit check (firm -> desk -> book)
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS limit_results (
+            run_id TEXT NOT NULL,
+            node_id TEXT NOT NULL,
+            engine TEXT NOT NULL,
+            metric TEXT NOT NULL,
+            parent_id TEXT,
+            depth INTEGER,
+            value REAL,
+            limit_value REAL,
+            utilization REAL,
+            status TEXT NOT NULL,
+            PRIMARY KEY (run_id, node_id, engine, metric)
+        ) WITHOUT ROWID
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_limit_results_status ON limit_results (run_id, status, node_id)",
+    ],
+    # 4: achieved relative standard error of adaptive-shot runs
+    [
+        "ALTER TABLE runs ADD COLUMN rel_error REAL",
+    ],
+]
+
+
+def _configure(conn):
+    # WAL lets readers run concurrently with the engine's writer;
+    # synchronous=NORMAL is durable across application crashes in WAL mode
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA cache_size=-{DB_CACHE_KIB}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}")
+    return conn
+
+
+class ConnectionPool:
+    """Thread-safe pool of SQLite connections to one database file."""
+
+    def __init__(self, db_path, size=DB_POOL_SIZE, timeout=30.0):
+        self.db_path = str(db_path)
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.db_path, timeout=self.timeout, check_same_thread=False, isolation_level=None
+        )
+        return _configure(conn)
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return self._connect()
+        return self._idle.get(timeout=self.timeout)
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+_init_lock = threading.Lock()
+_db_path = DB_PATH
+_initialized = False
+
+
+def configure(db_path=None, pool_size=DB_POOL_SIZE):
+    """Points the access layer at another database (tests, tools) and resets the pool."""
+    global _pool, _pool_pid, _db_path, _initialized
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _db_path = db_path or DB_PATH
+        _pool = ConnectionPool(_db_path, pool_size)
+        _pool_pid = os.getpid()
+        _initialized = False
+
+
+def get_pool():
+    global _pool, _pool_pid
+    with _pool_lock:
+        # Connections must not cross a fork: worker processes build their own pool
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ConnectionPool(_db_path)
+            _pool_pid = os.getpid()
+        return _pool
+
+
+@contextmanager
+def connection():
+    """Borrows a pooled connection (autocommit; use transaction() for writes)."""
+    with get_pool().connection() as conn:
+        yield conn
+
+
+@contextmanager
+def transaction():
+    """Borrows a pooled connection inside BEGIN ... COMMIT (ROLLBACK on error)."""
+    with span("sqlite.write"), DB_WRITE.time(), connection() as conn:
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+
+def get_connection():
+    """Standalone connection with the same pragmas, for callers that manage its lifetime."""
+    return _configure(sqlite3.connect(_db_path))
+
+
+def migrate(conn):
+    """Applies pending migrations in one transaction. Returns the resulting schema version."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= len(MIGRATIONS):
+        return version
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Re-read under the write lock in case another process migrated meanwhile
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for target in range(version + 1, len(MIGRATIONS) + 1):
+            for statement in MIGRATIONS[target - 1]:
+                conn.execute(statement)
+        conn.execute(f"PRAGMA user_version = {len(MIGRATIONS)}")
+    except BaseException:
+        conn.rollback()
+        raise
     conn.commit()
-    conn.close()
+    return len(MIGRATIONS)
 
-def log_execution(mode, status, metrics=None):
-    conn = get_connection()
-    cursor = conn.cursor()
-    
+
+def init_db():
+    """One-time schema migration per process; later calls are a flag check."""
+    global _initialized
+    if _initialized:
+        return
+    with _init_lock:
+        if _initialized:
+            return
+        with connection() as conn:
+            migrate(conn)
+        _initialized = True
+
+
+def log_execution(mode, status, metrics=None, run_id=None):
+    init_db()
     timestamp = datetime.utcnow().isoformat()
-    if metrics:
-        cursor.execute('''
-            INSERT INTO execution_logs (timestamp, mode, status, quantum_var_95, classical_var_95, quantum_cvar_95, classical_cvar_95)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
+    metrics = metrics or {}
+    with transaction() as conn:
+        cursor = conn.execute('''
+            INSERT INTO execution_logs (timestamp, mode, status, quantum_var_95, classical_var_95, quantum_cvar_95, classical_cvar_95, run_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
             timestamp, mode, status,
             metrics.get("quantum_var_95"), metrics.get("classical_var_95"),
-            metrics.get("quantum_cvar_95"), metrics.get("classical_cvar_95")
+            metrics.get("quantum_cvar_95"), metrics.get("classical_cvar_95"),
+            run_id
         ))
-    else:
-        cursor.execute('''
-            INSERT INTO execution_logs (timestamp, mode, status)
-            VALUES (?, ?, ?)
-        ''', (timestamp, mode, status))
-        
-    log_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
-    return log_id
+        return cursor.lastrowid
+
+
+def log_executions(rows):
+    """Batched insert of (timestamp, mode, status, q_var_95, c_var_95, q_cvar_95, c_cvar_95, run_id) rows."""
+    init_db()
+    with transaction() as conn:
+        conn.executemany('''
+            INSERT INTO execution_logs (timestamp, mode, status, quantum_var_95, classical_var_95, quantum_cvar_95, classical_cvar_95, run_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+
+
+def log_backtest(q_ex, c_ex, total_days, status, run_id=None):
+    log_backtests([(datetime.utcnow().isoformat(), q_ex, c_ex, total_days, status, run_id)])
+
+
+def log_backtests(rows):
+    """Batched insert of (timestamp, q_exceptions, c_exceptions, total_days, basel_status, run_id) rows."""
+    init_db()
+    with transaction() as conn:
+        conn.executemany('''
+            INSERT INTO backtest_results (timestamp, quantum_exceptions, classical_exceptions, total_days, basel_status, run_id)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', rows)
+
+
+def fetch_all(sql, params=()):
+    """Runs a read query on a pooled connection and returns rows as dicts."""
+    init_db()
+    with connection() as conn:
+        cursor = conn.execute(sql, params)
+        col_names = [description[0] for description in cursor.description]
+        return [dict(zip(col_names, row)) for row in cursor.fetchall()]
 
-def log_backtest(q_ex, c_ex, total_days, status):
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    timestamp = datetime.utcnow().isoformat()
-    cursor.execute('''
-        INSERT INTO backtest_results (timestamp, quantum_exceptions, classical_exceptions, total_days, basel_status)
-        VALUES (?, ?, ?, ?, ?)
-    ''', (timestamp, q_ex, c_ex, total_days, status))
-    
-    conn.commit()
-    conn.close()
 
 def get_recent_executions(limit=10):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM execution_logs ORDER BY timestamp DESC LIMIT ?', (limit,))
-    rows = cursor.fetchall()
-    
-    # get column names
-    col_names = [description[0] for description in cursor.description]
-    conn.close()
-    
-    return [dict(zip(col_names, row)) for row in rows]
+    return fetch_all('SELECT * FROM execution_logs ORDER BY timestamp DESC LIMIT ?', (limit,))
+
+
+# ---------------------------------------------------------------------------
+# Run history
+# ---------------------------------------------------------------------------
+
+def record_run(run_id, mode, status, shots=None, tickers=None, weights=None, created_at=None, rel_error=None):
+    """Inserts or updates a run row; fields passed as None keep their stored value."""
+    init_db()
+    with transaction() as conn:
+        conn.execute('''
+            INSERT INTO runs (run_id, created_at, mode, status, shots, tickers, weights, rel_error)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (run_id) DO UPDATE SET
+                status = excluded.status,
+                shots = COALESCE(excluded.shots, runs.shots),
+                tickers = COALESCE(excluded.tickers, runs.tickers),
+                weights = COALESCE(excluded.weights, runs.weights),
+                rel_error = COALESCE(excluded.rel_error, runs.rel_error)
+        ''', (
+            run_id, created_at or datetime.utcnow().isoformat(), mode, status, shots,
+            json.dumps(list(tickers)) if tickers is not None else None,
+            json.dumps(list(weights)) if weights is not None else None,
+            rel_error,
+        ))
+
+
+def log_run_metrics(run_id, rows):
+    """Batched upsert of (engine, confidence, horizon_days, var, cvar) rows for one run."""
+    init_db()
+    with transaction() as conn:
+        conn.executemany('''
+            INSERT OR REPLACE INTO run_metrics (run_id, engine, confidence, horizon_days, var, cvar)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', [(run_id, *row) for row in rows])
+
+
+def log_run_attribution(run_id, rows):
+    """Batched upsert of (engine, asset, marginal_var, component_var) rows for one run."""
+    init_db()
+    with transaction() as conn:
+        conn.executemany('''
+            INSERT OR REPLACE INTO run_attribution (run_id, engine, asset, marginal_var, component_var)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [(run_id, *row) for row in rows])
+
+
+def log_backtest_series(run_id, rows):
+    """Batched upsert of (day, loss, var_quantum, var_classical, exception_quantum, exception_classical)."""
+    init_db()
+    with transaction() as conn:
+        conn.executemany('''
+            INSERT OR REPLACE INTO backtest_series
+                (run_id, day, loss, var_quantum, var_classical, exception_quantum, exception_classical)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', [(run_id, *row) for row in rows])
+
+
+def log_limit_results(run_id, rows):
+    """
+    Batched upsert of (node_id, parent_id, depth, engine, metric, value, limit_value, utilization, status)
+    rows for one run; the limit engine submits one batch per chunk of nodes as it goes.
+    """
+    init_db()
+    with transaction() as conn:
+        conn.executemany('''
+            INSERT OR REPLACE INTO limit_results
+            (run_id, node_id, parent_id, depth, engine, metric, value, limit_value, utilization, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [(run_id, *row) for row in rows])
+
+
+def encode_cursor(*values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor, size=2):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid pagination cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid pagination cursor")
+    return values
+
+
+def _decode_run(row):
+    for key in ("tickers", "weights"):
+        if row.get(key) is not None:
+            row[key] = json.loads(row[key])
+    return row
+
+
+def _next_cursor(rows, limit):
+    if len(rows) < limit:
+        return None
+    return encode_cursor(rows[-1]["created_at"], rows[-1]["run_id"])
+
+
+def list_runs(limit=50, cursor=None):
+    """
+    Runs newest first with keyset pagination on (created_at, run_id).
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    if cursor is None:
+        rows = fetch_all('SELECT * FROM runs ORDER BY created_at DESC, run_id DESC LIMIT ?', (limit,))
+    else:
+        rows = fetch_all('''
+            SELECT * FROM runs WHERE (created_at, run_id) < (?, ?)
+            ORDER BY created_at DESC, run_id DESC LIMIT ?
+        ''', (*decode_cursor(cursor), limit))
+    return [_decode_run(r) for r in rows], _next_cursor(rows, limit)
+
+
+def get_run(run_id):
+    rows = fetch_all('SELECT * FROM runs WHERE run_id = ?', (run_id,))
+    return _decode_run(rows[0]) if rows else None
+
+
+def get_run_metrics(run_id):
+    return fetch_all('''
+        SELECT engine, confidence, horizon_days, var, cvar FROM run_metrics
+        WHERE run_id = ? ORDER BY engine, confidence, horizon_days
+    ''', (run_id,))
+
+
+def get_run_attribution(run_id):
+    return fetch_all('''
+        SELECT engine, asset, marginal_var, component_var FROM run_attribution
+        WHERE run_id = ? ORDER BY engine, asset
+    ''', (run_id,))
+
+
+def get_backtest_series(run_id, after_day=-1, limit=500):
+    """One page of a run's daily backtest series, keyset-paginated on day."""
+    rows = fetch_all('''
+        SELECT day, loss, var_quantum, var_classical, exception_quantum, exception_classical
+        FROM backtest_series WHERE run_id = ? AND day > ? ORDER BY day LIMIT ?
+    ''', (run_id, after_day, limit))
+    next_after = rows[-1]["day"] if len(rows) == limit else None
+    return rows, next_after
+
+
+def get_metric_history(engine, confidence, horizon_days, limit=250, cursor=None):
+    """
+    One metric across runs, newest first (e.g. quantum 99% 1-day VaR over time).
+    Walks the runs index backwards and probes run_metrics by primary key.
+    """
+    keyset = ""
+    params = [engine, confidence, horizon_days]
+    if cursor is not None:
+        keyset = "AND (r.created_at, r.run_id) < (?, ?)"
+        params.extend(decode_cursor(cursor))
+    rows = fetch_all(f'''
+        SELECT r.run_id, r.created_at, r.mode, m.var, m.cvar
+        FROM runs r JOIN run_metrics m ON m.run_id = r.run_id
+        WHERE m.engine = ? AND m.confidence = ? AND m.horizon_days = ? {keyset}
+        ORDER BY r.created_at DESC, r.run_id DESC LIMIT ?
+    ''', (*params, limit))
+    return rows, _next_cursor(rows, limit)
+
+
+def get_limit_results(run_id, status=None, limit=500, cursor=None):
+    """One page of a run's per-node limit results, optionally only WARNING or BREACH rows."""
+    clauses = ["run_id = ?"]
+    params = [run_id]
+    if status is not None:
+        clauses.append("status = ?")
+        params.append(status)
+    if cursor is not None:
+        clauses.append("(node_id, engine, metric) > (?, ?, ?)")
+        params.extend(decode_cursor(cursor, 3))
+    rows = fetch_all(f'''
+        SELECT node_id, parent_id, depth, engine, metric, value, limit_value, utilization, status
+        FROM limit_results WHERE {" AND ".join(clauses)}
+        ORDER BY node_id, engine, metric LIMIT ?
+    ''', (*params, limit))
+    next_cursor = encode_cursor(*(rows[-1][k] for k in ("node_id", "engine", "metric"))) if len(rows) == limit else None
+    return rows, next_cursor
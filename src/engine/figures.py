@@ -0,0 +1,207 @@
+import io
+
+import numpy as np
+
+from src.engine.config import FIGURE_DPI, FIGURES_DIR
+from src.engine.profiling import span
+from src.engine.scenario_store import atomic_write_bytes, run_dir
+
+FIGURES_SUBDIR = "figures"
+
+_BASEL_COLORS = {"GREEN": "#2ecc71", "YELLOW": "#f39c12", "RED": "#e74c3c"}
+
+
+class FigureUnavailableError(LookupError):
+    """The run holds no data for the figure, e.g. its stage has not run yet."""
+
+
+def _new_figure(figsize):
+    # Object-oriented API: no pyplot global state, so figures can be rendered from API threads
+    from matplotlib.figure import Figure
+
+    return Figure(figsize=figsize)
+
+
+def distribution_data(run):
+    if not run.has_array("portfolio_returns_q"):
+        raise FigureUnavailableError(f"Run {run.run_id} has no scenario returns")
+    m = run.metrics
+    data = {"var": {"quantum": m["q_port_VaR"], "classical": m["c_port_VaR"]},
+            "cvar": {"quantum": m["q_port_CVaR"], "classical": m["c_port_CVaR"]}}
+    for engine, suffix in (("quantum", "q"), ("classical", "c")):
+        data[engine] = run.array(f"portfolio_returns_{suffix}")
+        data[f"{engine}_weights"] = run.scenario_weights(engine)
+    return data
+
+
+def render_distribution(data):
+    fig = _new_figure((8, 5))
+    ax = fig.subplots()
+    ax.hist(data["classical"], bins=50, density=True, alpha=0.6, label="Classical", weights=data["classical_weights"])
+    ax.hist(data["quantum"], bins=50, density=True, alpha=0.6, label="Quantum", weights=data["quantum_weights"])
+    ax.axvline(-data["var"]["classical"], linestyle="--", label="Classical VaR")
+    ax.axvline(-data["var"]["quantum"], linestyle="--", label="Quantum VaR", color="red")
+    ax.axvline(-data["cvar"]["classical"], linestyle=":", label="Classical CVaR")
+    ax.axvline(-data["cvar"]["quantum"], linestyle=":", label="Quantum CVaR", color="red")
+    ax.set_xlabel("Returns")
+    ax.set_ylabel("Density")
+    ax.set_title("Quantum vs Classical Portfolio Risk Distribution")
+    ax.legend(loc="upper right")
+    fig.tight_layout()
+    return fig
+
+
+def risk_limits_data(run):
+    checks = run.manifest.get("limit_checks")
+    if checks is None:
+        raise FigureUnavailableError(f"Run {run.run_id} has no limit check")
+    return checks
+
+
+def render_risk_limits(checks):
+    labels = list(checks)
+    fig = _new_figure((9, 5))
+    ax = fig.subplots()
+    ax.bar(labels, [c["value"] for c in checks.values()],
+           color=['#1f77b4' if "CVaR" not in k else '#ff7f0e' for k in labels])
+    ax.plot(labels, [c["limit"] for c in checks.values()], linestyle="--", label="Risk Limit", color="red", linewidth=2)
+    ax.set_ylabel("Risk Value (Loss %)")
+    ax.set_title("Daily Risk Metrics vs Calibrated Limits")
+    ax.tick_params(axis="x", labelrotation=20)
+    ax.legend()
+    fig.tight_layout()
+    return fig
+
+
+def backtesting_data(run):
+    summary = run.manifest.get("backtest")
+    if summary is None or not run.has_array("bt_losses"):
+        raise FigureUnavailableError(f"Run {run.run_id} has no backtest")
+    return {**summary, "losses": run.array("bt_losses"),
+            "var_quantum": run.array("bt_var_q"), "var_classical": run.array("bt_var_c")}
+
+
+def render_backtesting(data):
+    q_status, c_status = data["basel_status"], data["classical_status"]
+    losses = np.asarray(data["losses"])
+    var_c = np.asarray(data["var_classical"])
+    total_days = len(losses)
+
+    fig = _new_figure((14, 5))
+    axes = fig.subplots(1, 2)
+    # Plot 1: Exception count bar chart
+    axes[0].bar(["Quantum", "Classical"], [data["quantum_exceptions"], data["classical_exceptions"]],
+                color=[_BASEL_COLORS.get(q_status, "#e74c3c"), _BASEL_COLORS.get(c_status, "#e74c3c")])
+    axes[0].axhline(y=4, color='green', linestyle='--', alpha=0.7, label="Green Threshold (4)")
+    axes[0].axhline(y=9, color='orange', linestyle='--', alpha=0.7, label="Yellow Threshold (9)")
+    axes[0].set_ylabel("Number of Exceptions")
+    axes[0].set_title(f"Basel Traffic Light: 99% VaR ({total_days} days)")
+    axes[0].legend(fontsize=8)
+
+    # Plot 2: Time series of losses vs VaR
+    days = np.arange(total_days)
+    axes[1].plot(days, losses, alpha=0.5, linewidth=0.8, label="Actual Loss", color='gray')
+    axes[1].plot(days, var_c, label="Classical 99% VaR", color='blue', linewidth=1.2)
+    axes[1].plot(days, data["var_quantum"], label="Quantum 99% VaR", color='red', linewidth=1.2, linestyle='--')
+    exceptions = np.flatnonzero(losses > var_c)
+    if exceptions.size:
+        axes[1].scatter(exceptions, losses[exceptions], color='red', s=20, zorder=5, label="Exceptions")
+    axes[1].set_xlabel("Trading Day")
+    axes[1].set_ylabel("Loss")
+    axes[1].set_title("Rolling VaR Exceedances")
+    axes[1].legend(fontsize=8)
+    fig.tight_layout()
+    return fig
+
+
+def stress_test_data(run):
+    stress = run.manifest.get("stress")
+    if stress is None:
+        raise FigureUnavailableError(f"Run {run.run_id} has no stress test")
+    return stress
+
+
+def render_stress_test(stress):
+    vol_levels = np.asarray(stress["vol_levels"]) * 100
+    fig = _new_figure((8, 5))
+    ax = fig.subplots()
+    ax.plot(vol_levels, np.asarray(stress["quantum_var_95"]) * 100, marker='o', label="Quantum VaR (95%)",
+            color="red", linewidth=2)
+    ax.plot(vol_levels, np.asarray(stress["classical_var_95"]) * 100, marker='s', label="Classical VaR (95%)",
+            color="blue", linewidth=2, linestyle='--')
+    ax.set_xlabel("Base Market Volatility (%)")
+    ax.set_ylabel("Portfolio VaR (%)")
+    ax.set_title("Volatility Sensitivity Analysis (Stress Testing)")
+    ax.grid(True, linestyle=":", alpha=0.6)
+    ax.legend()
+    fig.tight_layout()
+    return fig
+
+
+# name -> (loads the figure's data from a stored run, renders that data)
+FIGURES = {
+    "distribution": (distribution_data, render_distribution),
+    "risk_limits": (risk_limits_data, render_risk_limits),
+    "backtesting": (backtesting_data, render_backtesting),
+    "stress_test": (stress_test_data, render_stress_test),
+}
+
+
+def to_png(fig, dpi=FIGURE_DPI):
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=dpi)
+    return buf.getvalue()
+
+
+def available_figures(run):
+    """Names of the figures the run has data for."""
+    names = []
+    for name, (load, _) in FIGURES.items():
+        try:
+            load(run)
+        except FigureUnavailableError:
+            continue
+        names.append(name)
+    return names
+
+
+def figure_path(run_id, name, dpi, version, root=None):
+    return run_dir(run_id, root) / FIGURES_SUBDIR / f"{name}-{dpi}dpi-{version}.png"
+
+
+def render_figure(run, name, dpi=FIGURE_DPI):
+    """
+    PNG bytes of one figure for a stored run, rendered on first request and then served
+    from <run_dir>/figures/. Entries are keyed by the manifest version the data was read from,
+    so a later stage rewriting the run (e.g. a limit re-check) makes the next request re-render.
+    """
+    if name not in FIGURES:
+        raise KeyError(f"Unknown figure {name!r}; expected one of {sorted(FIGURES)}")
+    path = figure_path(run.run_id, name, dpi, run.version, run.root)
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        pass
+
+    load, render = FIGURES[name]
+    with span("figures.render"):
+        png = to_png(render(load(run)), dpi)
+    path.parent.mkdir(exist_ok=True)
+    atomic_write_bytes(path, png)
+    for stale in path.parent.glob(f"{name}-{dpi}dpi-*.png"):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+    return png
+
+
+def export_figures(run, names=None, dpi=300, target=FIGURES_DIR):
+    """Renders figures into figures/ (the images the README and reports embed); skips ones without data."""
+    for name in names or available_figures(run):
+        atomic_write_bytes(target / f"{name}.png", render_figure(run, name, dpi))
+
+
+def export_figure(name, data, dpi=300, target=FIGURES_DIR):
+    """Renders data that was never stored (a stage run on its own) straight into figures/."""
+    with span("figures.render"):
+        png = to_png(FIGURES[name][1](data), dpi)
+    atomic_write_bytes(target / f"{name}.png", png)
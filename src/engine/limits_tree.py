@@ -0,0 +1,185 @@
+import json
+import re
+
+import numpy as np
+
+from src.engine.config import TICKERS, DEFAULT_WEIGHTS, LIMITS, LIMIT_TREE_FILE, LIMIT_WARNING_RATIO, LIMIT_NODE_CHUNK
+from src.engine.batch_risk import evaluate_portfolios
+from src.engine.profiling import traced
+
+STATUSES = ("PASS", "WARNING", "BREACH", "NO_LIMIT")
+
+_LIMIT_KEY = re.compile(r"^(VaR|CVaR)_(\d+(?:\.\d+)?)$")
+
+
+def parse_limit_key(key):
+    """"VaR_95" -> ("VaR", 0.95), "CVaR_99.5" -> ("CVaR", 0.995)."""
+    match = _LIMIT_KEY.match(key)
+    if match is None:
+        raise ValueError(f"Invalid limit {key!r}; expected VaR_<level> or CVaR_<level>")
+    level = float(match.group(2)) / 100
+    if not 0.5 < level < 1.0:
+        raise ValueError(f"Confidence level of {key!r} must lie between 50 and 100")
+    return match.group(1), level
+
+
+class LimitTree:
+    """
+    A firm -> desk -> book hierarchy of positions and VaR/CVaR limits.
+    Each node holds its own positions (ticker -> weight); a node's exposure is the sum over its subtree,
+    computed once as a sparse (subtree membership) x (own positions) product. Because portfolio P&L is
+    linear in the weights, the P&L of a node equals the sum of its children's, so every node is
+    evaluated directly from its exposure vector over the shared scenarios.
+    """
+
+    def __init__(self, nodes, tickers, warning_ratio=LIMIT_WARNING_RATIO):
+        from scipy import sparse
+
+        self.tickers = list(tickers)
+        column = {t: j for j, t in enumerate(self.tickers)}
+
+        by_id = {}
+        for node in nodes:
+            if node["id"] in by_id:
+                raise ValueError(f"Duplicate limit node {node['id']!r}")
+            by_id[node["id"]] = node
+        roots = [n["id"] for n in nodes if n.get("parent") is None]
+        if len(roots) != 1:
+            raise ValueError(f"A limit tree needs exactly one root, found {len(roots)}")
+        children = {node_id: [] for node_id in by_id}
+        for node in nodes:
+            parent = node.get("parent")
+            if parent is not None:
+                if parent not in by_id:
+                    raise ValueError(f"Node {node['id']!r} has unknown parent {parent!r}")
+                children[parent].append(node["id"])
+
+        # Breadth-first from the root: parents precede children, and unreachable nodes reveal a cycle
+        order, depth = [roots[0]], {roots[0]: 0}
+        for node_id in order:
+            for child in children[node_id]:
+                depth[child] = depth[node_id] + 1
+                order.append(child)
+        if len(order) != len(nodes):
+            raise ValueError("Limit tree contains a cycle")
+
+        self.ids = order
+        self.index = {node_id: i for i, node_id in enumerate(order)}
+        self.parents = [by_id[node_id].get("parent") for node_id in order]
+        self.depths = np.array([depth[node_id] for node_id in order])
+
+        rows, cols, vals = [], [], []
+        for i, node_id in enumerate(order):
+            for ticker, weight in by_id[node_id].get("positions", {}).items():
+                if ticker not in column:
+                    raise ValueError(f"Node {node_id!r} holds {ticker!r}, which is not in the scenario universe")
+                rows.append(i)
+                cols.append(column[ticker])
+                vals.append(float(weight))
+        own = sparse.csr_matrix((vals, (rows, cols)), shape=(len(order), len(self.tickers)))
+
+        # membership[a, n] = 1 when a is n or one of its ancestors
+        rows, cols = [], []
+        for i in range(len(order)):
+            a = i
+            while a is not None:
+                rows.append(a)
+                cols.append(i)
+                parent = self.parents[a]
+                a = None if parent is None else self.index[parent]
+        membership = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(order), len(order)))
+        self.exposure = (membership @ own).toarray()  # (nodes, assets)
+
+        self.metrics = sorted(
+            {key for node in nodes for key in node.get("limits", {})},
+            key=lambda key: (parse_limit_key(key)[1], parse_limit_key(key)[0] == "CVaR"),
+        )
+        self.limits = np.full((len(order), len(self.metrics)), np.nan)
+        for i, node_id in enumerate(order):
+            for key, value in by_id[node_id].get("limits", {}).items():
+                self.limits[i, self.metrics.index(key)] = float(value)
+        self.warning_ratio = np.array([float(by_id[n].get("warning_ratio", warning_ratio)) for n in order])
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def root(self):
+        return self.ids[0]
+
+    @classmethod
+    def from_spec(cls, spec, tickers):
+        return cls(spec["nodes"], tickers, spec.get("warning_ratio", LIMIT_WARNING_RATIO))
+
+    @traced("risk.limit_tree")
+    def evaluate(self, asset_returns, scenario_weights=None, engine="quantum", on_chunk=None,
+                 chunk=LIMIT_NODE_CHUNK):
+        """
+        VaR/CVaR, utilization and status for every node and metric.
+        Nodes are evaluated in chunks; on_chunk(rows) receives each chunk's
+        (node_id, parent_id, depth, engine, metric, value, limit, utilization, status) rows as soon as it is done.
+        Returns arrays of shape (nodes, metrics): values, utilization and status.
+        """
+        parsed = [parse_limit_key(key) for key in self.metrics]
+        levels = sorted({level for _, level in parsed})
+        level_col = {level: j for j, level in enumerate(levels)}
+
+        values = np.empty((len(self), len(self.metrics)))
+        for start in range(0, len(self), chunk):
+            stop = min(start + chunk, len(self))
+            var, cvar = evaluate_portfolios(asset_returns, self.exposure[start:stop], levels, scenario_weights)
+            for m, (kind, level) in enumerate(parsed):
+                values[start:stop, m] = (var if kind == "VaR" else cvar)[:, level_col[level]]
+            if on_chunk is not None:
+                on_chunk(self._rows(engine, start, stop, values))
+
+        return values, *self._classify(values)
+
+    def _classify(self, values, start=0, stop=None):
+        limits = self.limits[start:stop]
+        ratio = self.warning_ratio[start:stop, None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            utilization = values[start:stop] / limits
+        status = np.select(
+            [np.isnan(limits), values[start:stop] > limits, values[start:stop] > ratio * limits],
+            ["NO_LIMIT", "BREACH", "WARNING"],
+            default="PASS",
+        )
+        return utilization, status
+
+    def _rows(self, engine, start, stop, values):
+        utilization, status = self._classify(values, start, stop)
+        rows = []
+        for i in range(start, stop):
+            for m, metric in enumerate(self.metrics):
+                limit = self.limits[i, m]
+                no_limit = np.isnan(limit)
+                rows.append((
+                    self.ids[i], self.parents[i], int(self.depths[i]), engine, metric,
+                    float(values[i, m]),
+                    None if no_limit else float(limit),
+                    None if no_limit else float(utilization[i - start, m]),
+                    str(status[i - start, m]),
+                ))
+        return rows
+
+
+def default_spec(tickers=TICKERS, weights=DEFAULT_WEIGHTS):
+    """The firm holds the default portfolio through one desk and one book, under the global LIMITS."""
+    return {
+        "nodes": [
+            {"id": "FIRM", "parent": None, "limits": dict(LIMITS)},
+            {"id": "DESK-1", "parent": "FIRM"},
+            {"id": "BOOK-1", "parent": "DESK-1", "positions": dict(zip(tickers, weights))},
+        ]
+    }
+
+
+def load_limit_tree(tickers, weights, path=LIMIT_TREE_FILE):
+    """The configured tree from LIMIT_TREE_FILE, or the default single-book tree when there is none."""
+    try:
+        with open(path) as f:
+            spec = json.load(f)
+    except FileNotFoundError:
+        spec = default_spec(tickers, weights)
+    return LimitTree.from_spec(spec, tickers)
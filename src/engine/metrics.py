@@ -0,0 +1,238 @@
+import bisect
+import math
+import threading
+import time
+from functools import wraps
+
+from src.engine.config import (
+    STAGE_DURATION_BUCKETS, REQUEST_LATENCY_BUCKETS, DB_WRITE_BUCKETS, RUN_DURATION_BUCKETS
+)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + list(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if len(labels) != len(self.label_names):
+            raise ValueError(f"{self.name} takes labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.label_names)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.label_names, key)} {_number(v)}" for key, v in items]
+
+    def drain(self):
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def merge(self, values):
+        with self._lock:
+            for key, v in values.items():
+                self._values[key] = self._values.get(key, 0) + v
+
+
+class Gauge(Counter):
+    """Last value per label set; merging a worker's gauges keeps the newest."""
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def merge(self, values):
+        with self._lock:
+            self._values.update(values)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, buckets, labels=()):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # Per-bucket (not cumulative) counts, the +Inf bucket last, then the sum
+                entry = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            entry[index] += 1
+            entry[-1] += value
+
+    def time(self, **labels):
+        return _Timer(self, labels)
+
+    def render(self):
+        with self._lock:
+            items = sorted((key, list(entry)) for key, entry in self._values.items())
+        lines = []
+        for key, entry in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), entry[:-1]):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, [le])} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_number(entry[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+    def drain(self):
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def merge(self, values):
+        with self._lock:
+            for key, entry in values.items():
+                mine = self._values.get(key)
+                if mine is None:
+                    self._values[key] = list(entry)
+                else:
+                    for i, v in enumerate(entry):
+                        mine[i] += v
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+class Registry:
+    """
+    Process-local metrics in the Prometheus text exposition format.
+    Engine workers run in other processes: they drain() their values after each run and the API
+    process merge()s them, so /metrics covers the whole service without an external collector.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+
+    def _add(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self._add(Counter(name, help, labels))
+
+    def gauge(self, name, help, labels=()):
+        return self._add(Gauge(name, help, labels))
+
+    def histogram(self, name, help, buckets, labels=()):
+        return self._add(Histogram(name, help, buckets, labels))
+
+    def collector(self, fn):
+        """Registers fn() -> [(name, kind, help, [(labels dict, value), ...])], read at render time."""
+        self._collectors.append(fn)
+        return fn
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            samples = metric.render()
+            if samples:
+                lines += metric.header() + samples
+        for collect in self._collectors:
+            for name, kind, help, samples in collect():
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+                for labels, value in samples:
+                    lines.append(f"{name}{_labels(list(labels), list(labels.values()))} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def drain(self):
+        """Values recorded since the last drain, reset to zero (plain dicts, picklable)."""
+        return {name: metric.drain() for name, metric in self._metrics.items()}
+
+    def merge(self, delta):
+        for name, values in (delta or {}).items():
+            metric = self._metrics.get(name)
+            if metric is not None:
+                metric.merge(values)
+
+
+REGISTRY = Registry()
+
+STAGE_DURATION = REGISTRY.histogram(
+    "risk_stage_duration_seconds", "Pipeline stage duration.", STAGE_DURATION_BUCKETS, ("stage", "mode", "status"))
+RUN_DURATION = REGISTRY.histogram(
+    "risk_run_duration_seconds", "Whole pipeline run duration.", RUN_DURATION_BUCKETS, ("mode",))
+RUNS = REGISTRY.counter("risk_runs_total", "Pipeline runs by mode and final status.", ("mode", "status"))
+SCENARIOS = REGISTRY.counter(
+    "risk_scenarios_total", "Scenarios generated per engine.", ("engine",))
+SCENARIO_SECONDS = REGISTRY.counter(
+    "risk_scenario_generation_seconds_total", "Time spent generating scenarios per engine.", ("engine",))
+SCENARIO_RATE = REGISTRY.gauge(
+    "risk_scenarios_per_second", "Throughput of the latest scenario generation per engine.", ("engine",))
+DB_WRITE = REGISTRY.histogram(
+    "risk_db_write_seconds", "SQLite write transaction latency.", DB_WRITE_BUCKETS)
+REQUEST_LATENCY = REGISTRY.histogram(
+    "risk_http_request_duration_seconds", "API request latency until the response headers are sent.",
+    REQUEST_LATENCY_BUCKETS, ("method", "route", "status"))
+
+
+def scenario_throughput(engine):
+    """Decorator for a scenario generator method: counts self.shots scenarios and records the rate."""
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            started = time.perf_counter()
+            result = fn(self, *args, **kwargs)
+            seconds = time.perf_counter() - started
+            SCENARIOS.inc(self.shots, engine=engine)
+            SCENARIO_SECONDS.inc(seconds, engine=engine)
+            if seconds > 0:
+                SCENARIO_RATE.set(self.shots / seconds, engine=engine)
+            return result
+        return wrapper
+    return decorate
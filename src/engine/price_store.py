@@ -0,0 +1,79 @@
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from src.engine.config import PRICE_STORE_DIR
+from src.engine.scenario_store import atomic_write_text
+
+MANIFEST_NAME = "manifest.json"
+PRICES_NAME = "prices.npy"
+DATES_NAME = "dates.npy"
+
+
+class MissingPricesError(LookupError):
+    pass
+
+
+def _root(root):
+    return PRICE_STORE_DIR if root is None else Path(root)
+
+
+def _save(path, array):
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, np.ascontiguousarray(array))
+    os.replace(tmp, path)
+
+
+def write_prices(tickers, dates, prices, root=None, **meta):
+    """
+    Replaces the local price store with a (days, assets) matrix of daily closes.
+    The arrays are written first and the manifest last, as in the scenario store.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    if prices.shape != (len(dates), len(tickers)):
+        raise ValueError(f"prices must be (days, assets) = ({len(dates)}, {len(tickers)}), got {prices.shape}")
+    if len(set(tickers)) != len(tickers):
+        raise ValueError("tickers must be unique")
+
+    directory = _root(root)
+    directory.mkdir(parents=True, exist_ok=True)
+    _save(directory / PRICES_NAME, prices)
+    _save(directory / DATES_NAME, dates)
+    manifest = {
+        "tickers": list(tickers),
+        "days": len(dates),
+        "start": str(dates[0]),
+        "end": str(dates[-1]),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        **meta,
+    }
+    atomic_write_text(directory / MANIFEST_NAME, json.dumps(manifest, indent=2))
+    return manifest
+
+
+def read_manifest(root=None):
+    path = _root(root) / MANIFEST_NAME
+    if not path.exists():
+        raise MissingPricesError(f"No local price store at {path.parent}")
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def read_returns(tickers, days, root=None):
+    """
+    The last `days` daily simple returns of `tickers`, columns in the order given,
+    shaped like get_historical_data's output. Only the requested window is read from disk.
+    """
+    manifest = read_manifest(root)
+    index = {ticker: i for i, ticker in enumerate(manifest["tickers"])}
+    missing = [ticker for ticker in tickers if ticker not in index]
+    if missing:
+        raise MissingPricesError(f"No local prices for {missing}")
+    prices = np.load(_root(root) / PRICES_NAME, mmap_mode="r")
+    window = np.asarray(prices[-(days + 1):, [index[ticker] for ticker in tickers]])
+    return window[1:] / window[:-1] - 1.0
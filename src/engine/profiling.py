@@ -0,0 +1,211 @@
+import cProfile
+import functools
+import io
+import json
+import logging
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+from src.engine.config import PROFILE, PROFILE_TOP
+
+logger = logging.getLogger(__name__)
+
+PROFILE_NAME = "profile.json"
+PSTATS_NAME = "profile.pstats"
+TRACEMALLOC_NAME = "tracemalloc.snapshot"
+OPTIONS = ("spans", "cprofile", "tracemalloc")
+
+
+def parse_options(value):
+    """'spans,cprofile', 'all', 'off', True/False or a collection -> frozenset of OPTIONS; unknown names raise."""
+    if value is None or value is False:
+        return frozenset()
+    if value is True:
+        return frozenset({"spans"})
+    if isinstance(value, str):
+        value = [part.strip().lower() for part in value.split(",") if part.strip()]
+    options = set(value) - {"off", "none", "0", "false"}
+    if options & {"all", "1", "true"}:
+        options = (options - {"all", "1", "true"}) | ({"spans"} if options & {"1", "true"} else set(OPTIONS))
+    unknown = options - set(OPTIONS)
+    if unknown:
+        raise ValueError(f"Unknown profile options {sorted(unknown)}; expected a subset of {list(OPTIONS)} or 'all'")
+    return frozenset(options)
+
+
+class RunProfile:
+    """
+    Timing spans for one pipeline run, aggregated per (stage, span name) with count, total and max.
+    Spans may be recorded from any thread of the process (the audit writer's SQLite writes included);
+    cProfile only follows the thread that started it, i.e. the pipeline stages.
+    """
+
+    def __init__(self, run_id, options, root=None):
+        self.run_id = run_id
+        self.options = options
+        self.root = root
+        self.stage = None
+        self._spans = {}
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._cprofile = None
+
+    def record(self, name, seconds):
+        key = (self.stage or "-", name)
+        with self._lock:
+            entry = self._spans.get(key)
+            if entry is None:
+                self._spans[key] = [1, seconds, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+                entry[2] = max(entry[2], seconds)
+
+    def start(self):
+        if "tracemalloc" in self.options and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if "cprofile" in self.options:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def finish(self):
+        """Stops the collectors and writes profile.json (plus the raw cProfile / tracemalloc data) to the run."""
+        # Imported here: the scenario store imports kernels that are themselves instrumented
+        from src.engine.scenario_store import atomic_write_text, run_dir
+
+        directory = run_dir(self.run_id, self.root)
+        report = {
+            "run_id": self.run_id,
+            "options": sorted(self.options),
+            "wall_sec": round(time.perf_counter() - self._started, 4),
+            "spans": self.spans(),
+        }
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(directory / PSTATS_NAME)
+            report["cprofile"] = top_functions(self._cprofile)
+        if "tracemalloc" in self.options and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            snapshot.dump(str(directory / TRACEMALLOC_NAME))
+            report["tracemalloc"] = {
+                "current_bytes": current,
+                "peak_bytes": peak,
+                "top": [
+                    {"location": str(stat.traceback[0]), "size_bytes": stat.size, "count": stat.count}
+                    for stat in snapshot.statistics("lineno")[:PROFILE_TOP]
+                ],
+            }
+        atomic_write_text(directory / PROFILE_NAME, json.dumps(report, indent=2))
+        return report
+
+    def spans(self):
+        with self._lock:
+            items = sorted(self._spans.items(), key=lambda item: -item[1][1])
+        return [
+            {"stage": stage, "name": name, "count": count, "total_sec": round(total, 6),
+             "mean_ms": round(total / count * 1000, 4), "max_ms": round(peak * 1000, 4)}
+            for (stage, name), (count, total, peak) in items
+        ]
+
+
+def top_functions(profiler, limit=PROFILE_TOP):
+    """The functions with the highest cumulative time in a cProfile run."""
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = []
+    for (filename, line, func), (_, calls, own, cumulative, _) in stats.stats.items():
+        rows.append({"function": f"{filename}:{line}({func})", "calls": calls,
+                     "own_sec": round(own, 6), "cumulative_sec": round(cumulative, 6)})
+    rows.sort(key=lambda row: -row["cumulative_sec"])
+    return rows[:limit]
+
+
+# One profiled run per process: engine workers execute one pipeline at a time, and spans deep in
+# the engine (risk kernels, SQLite writes) have no run id to look a profile up by
+_active = None
+_active_lock = threading.Lock()
+
+
+def start_profile(run_id, options=None, root=None):
+    """
+    Starts profiling a pipeline run with the given options (PROFILE when None). Returns the RunProfile,
+    or None when profiling is off or another run in this process already holds the profiler.
+    """
+    global _active
+    options = parse_options(PROFILE if options is None else options)
+    if not options:
+        return None
+    with _active_lock:
+        if _active is not None:
+            logger.warning("Run %s is already being profiled in this process; not profiling %s",
+                           _active.run_id, run_id)
+            return None
+        _active = profile = RunProfile(run_id, options, root)
+    profile.start()
+    return profile
+
+
+def stop_profile(profile):
+    """Writes the run's profile report and releases the profiler. Returns the report (None on failure)."""
+    global _active
+    try:
+        return profile.finish()
+    except Exception:
+        logger.exception("Could not write the profile of run %s", profile.run_id)
+        return None
+    finally:
+        with _active_lock:
+            if _active is profile:
+                _active = None
+
+
+class _Span:
+    __slots__ = ("profile", "name", "started")
+
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profile.record(self.name, time.perf_counter() - self.started)
+        return False
+
+
+_NO_SPAN = nullcontext()
+
+
+def span(name):
+    """Times the block as `name` in the active run profile; a shared no-op when nothing is profiled."""
+    profile = _active
+    if profile is None:
+        return _NO_SPAN
+    return _Span(profile, name)
+
+
+def traced(name):
+    """Decorator form of span()."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def read_profile(run_id, root=None):
+    """The stored profile.json of a run, or None if the run was not profiled."""
+    from src.engine.scenario_store import run_dir
+
+    try:
+        return json.loads((run_dir(run_id, root) / PROFILE_NAME).read_text())
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,133 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from src.engine.config import PROGRESS_MIN_INTERVAL
+from src.engine.scenario_store import run_dir
+
+EVENTS_NAME = "events.jsonl"
+TERMINAL_EVENTS = ("run_finished", "run_failed")
+
+
+class ProgressReporter:
+    """
+    Appends pipeline events for one run to <run_dir>/events.jsonl, one JSON object per line.
+    The file is the channel between the engine worker process and the API, which tails it
+    for /runs/{id}/events; each line is written with a single append so readers never see
+    a partial event.
+    """
+
+    def __init__(self, run_id, root=None):
+        self.run_id = run_id
+        self.path = run_dir(run_id, root) / EVENTS_NAME
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._stage_started = {}
+        self._last_progress = {}
+
+    def emit(self, event, **data):
+        with self._lock:
+            self._seq += 1
+            record = {
+                "seq": self._seq,
+                "event": event,
+                "ts": datetime.now(timezone.utc).isoformat(),
+                **data,
+            }
+            line = (json.dumps(record) + "\n").encode()
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+        return record
+
+    def stage_started(self, stage, index, total, eta_sec=None):
+        self._stage_started[stage] = time.perf_counter()
+        self.emit("stage_started", stage=stage, index=index, total=total, eta_sec=eta_sec)
+
+    def stage_finished(self, stage, status="SUCCESS"):
+        started = self._stage_started.pop(stage, None)
+        duration = None if started is None else round(time.perf_counter() - started, 3)
+        self.emit("stage_finished", stage=stage, status=status, duration_sec=duration)
+        return duration
+
+    def progress(self, stage, done, total, unit="steps", force=False):
+        """Rate-limited progress update with throughput and remaining time for the current stage."""
+        now = time.perf_counter()
+        if not force and done < total and now - self._last_progress.get(stage, 0.0) < PROGRESS_MIN_INTERVAL:
+            return
+        self._last_progress[stage] = now
+        elapsed = now - self._stage_started.get(stage, now)
+        rate = done / elapsed if elapsed > 0 else None
+        eta = (total - done) / rate if rate else None
+        self.emit(
+            "progress", stage=stage, done=done, total=total, unit=unit,
+            rate_per_sec=None if rate is None else round(rate, 1),
+            eta_sec=None if eta is None else round(eta, 2),
+        )
+
+    def throughput(self, stage, label, count, seconds, unit="shots"):
+        """One-off throughput measurement, e.g. scenarios sampled per second by an engine."""
+        self.emit(
+            "throughput", stage=stage, label=label, count=count, unit=unit,
+            seconds=round(seconds, 4), per_sec=round(count / seconds, 1) if seconds > 0 else None,
+        )
+
+
+class _NullReporter:
+    """Stands in when a stage runs outside the pipeline (no run id): every call is a no-op."""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+_NULL = _NullReporter()
+_reporters = {}
+_reporters_lock = threading.Lock()
+
+
+def get_reporter(run_id):
+    """Per-process reporter for a run, shared by the runner and its stages."""
+    if run_id is None:
+        return _NULL
+    with _reporters_lock:
+        reporter = _reporters.get(run_id)
+        if reporter is None:
+            reporter = _reporters[run_id] = ProgressReporter(run_id)
+        return reporter
+
+
+def release_reporter(run_id):
+    with _reporters_lock:
+        _reporters.pop(run_id, None)
+
+
+def read_events(run_id, offset=0, root=None):
+    """Returns (events, new_offset) for complete lines appended since byte offset."""
+    path = run_dir(run_id, root) / EVENTS_NAME
+    try:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+    except FileNotFoundError:
+        return [], offset
+    end = data.rfind(b"\n") + 1  # ignore a trailing partial line until it is complete
+    events = [json.loads(line) for line in data[:end].splitlines() if line.strip()]
+    return events, offset + end
+
+
+def run_started_at(run_id, root=None):
+    """Timestamp of the run_started event (the first line a worker writes), or None before it starts."""
+    try:
+        with open(run_dir(run_id, root) / EVENTS_NAME, "rb") as f:
+            line = f.readline()
+    except FileNotFoundError:
+        return None
+    if not line.endswith(b"\n"):
+        return None
+    event = json.loads(line)
+    return event["ts"] if event["event"] == "run_started" else None
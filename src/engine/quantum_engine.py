@@ -1,34 +1,62 @@
 import numpy as np
-import pennylane as qml
-from scipy.stats import norm, t
 import time
 
 from src.engine.config import (
-    QUBITS_PER_ASSET, USE_NOISE, NOISE_PROBABILITY, 
-    DISTRIBUTION, STUDENT_T_DF, CALIBRATION_EPOCHS, LEARNING_RATE
+    QUBITS_PER_ASSET, USE_NOISE, NOISE_PROBABILITY, NOISE_MODEL, SAMPLER, IS_SHIFT,
+    DISTRIBUTION, STUDENT_T_DF, CALIBRATION_EPOCHS, COMPUTE_DTYPE
 )
+from src.engine.compact import code_dtype, shocks_to_returns
+from src.engine.profiling import span, traced
+from src.engine.metrics import scenario_throughput
+
+def depolarizing_flip_probability(p):
+    """
+    Probability that a depolarizing channel flips a computational-basis measurement.
+    Of the Kraus operators sqrt(1-p) I, sqrt(p/3) X, sqrt(p/3) Y, sqrt(p/3) Z, only X and Y flip the bit.
+    """
+    return 2.0 * p / 3.0
 
 class QuantumRiskEngine:
-    def __init__(self, num_assets=3, qubits_per_asset=QUBITS_PER_ASSET, shots=10000):
+    def __init__(self, num_assets=3, qubits_per_asset=QUBITS_PER_ASSET, shots=10000,
+                 dtype=COMPUTE_DTYPE, seed=None, use_noise=USE_NOISE,
+                 noise_probability=NOISE_PROBABILITY, noise_model=NOISE_MODEL, sampler=SAMPLER):
         self.num_assets = num_assets
         self.qubits_per_asset = qubits_per_asset
         self.total_qubits = num_assets * qubits_per_asset
         self.shots = shots
+        self.dtype = np.dtype(dtype)
+        self.rng = np.random.default_rng(seed)
         
-        # Set up device
-        if USE_NOISE:
-            self.dev = qml.device("default.mixed", wires=self.total_qubits, shots=shots)
-        else:
-            self.dev = qml.device("default.qubit", wires=self.total_qubits, shots=shots)
+        if noise_model not in ("analytic", "density_matrix"):
+            raise ValueError(f"Unknown noise model: {noise_model}")
+        self.use_noise = use_noise
+        self.noise_probability = noise_probability
+        self.noise_model = noise_model
+        
+        if sampler not in ("structured", "statevector"):
+            raise ValueError(f"Unknown sampler: {sampler}")
+        # In-circuit noise needs the simulator
+        if self.use_noise and self.noise_model == "density_matrix":
+            sampler = "statevector"
+        self.sampler = sampler
             
         # Initialize PQC parameters randomly
-        self.theta = np.random.uniform(0, 2*np.pi, size=self.total_qubits)
+        self.theta = self.rng.uniform(0, 2*np.pi, size=self.total_qubits)
         
-        # Create QNode
-        self.qnode = qml.QNode(self.circuit, self.dev)
+        # Set up device and QNode (only the simulator path needs them)
+        self.dev = None
+        self.qnode = None
+        if self.sampler == "statevector":
+            import pennylane as qml
+            if self.use_noise and self.noise_model == "density_matrix":
+                self.dev = qml.device("default.mixed", wires=self.total_qubits, shots=shots)
+            else:
+                self.dev = qml.device("default.qubit", wires=self.total_qubits, shots=shots)
+            self.qnode = qml.QNode(self.circuit, self.dev)
         
     def circuit(self, theta):
         """Parameterized Quantum Circuit with Entanglement (Ansatz)"""
+        import pennylane as qml
         # 1. Superposition
         for i in range(self.total_qubits):
             qml.Hadamard(wires=i)
@@ -44,10 +72,10 @@ class QuantumRiskEngine:
             wire_2 = (i + 1) * self.qubits_per_asset
             qml.CNOT(wires=[wire_1, wire_2])
             
-        # 4. Optional Noise
-        if USE_NOISE:
+        # 4. Optional Noise (the analytic model applies it to the samples instead, see apply_noise)
+        if self.use_noise and self.noise_model == "density_matrix":
             for i in range(self.total_qubits):
-                qml.DepolarizingChannel(NOISE_PROBABILITY, wires=i)
+                qml.DepolarizingChannel(self.noise_probability, wires=i)
                 
         return qml.sample()
 
@@ -59,85 +87,190 @@ class QuantumRiskEngine:
         Due to simulator time constraints, we'll demonstrate a short optimization loop.
         """
         print("Calibrating Parameterized Quantum Circuit (PQC)...")
-        opt = qml.AdamOptimizer(stepsize=LEARNING_RATE)
-        
         # For a true calibration we'd compute the loss function based on the sampled covariance.
         # This is a simplified educational placeholder for the training loop.
         for epoch in range(CALIBRATION_EPOCHS):
             # In a real scenario, this would update self.theta to match the target_cov
-            # self.theta = opt.step(cost_fn, self.theta)
-            self.theta += np.random.normal(0, 0.05, size=self.total_qubits)
+            # self.theta = qml.AdamOptimizer(stepsize=LEARNING_RATE).step(cost_fn, self.theta)
+            self.theta += self.rng.normal(0, 0.05, size=self.total_qubits)
         
         print("PQC Calibration complete.")
         
-    def generate_independent_shocks(self):
-        """Runs the quantum circuit and maps bitstrings to independent shocks"""
-        samples = self.qnode(self.theta)
+    def apply_noise(self, samples):
+        """
+        Analytic NISQ noise: a per-qubit depolarizing channel after the circuit is, at
+        measurement, a classical bit flip with probability 2p/3 on each wire independently.
+        Applied as one vectorized XOR over the (shots, total_qubits) sample matrix.
+        """
+        if not self.use_noise or self.noise_model != "analytic":
+            return samples
+        flips = self.rng.random(samples.shape) < depolarizing_flip_probability(self.noise_probability)
+        return samples ^ flips.astype(samples.dtype)
+
+    @scenario_throughput("quantum")
+    def sample_codes(self):
+        """
+        Samples one integer code per asset register, shape (shots, num_assets),
+        in the smallest unsigned dtype that fits.
+        """
+        if self.sampler == "structured":
+            codes, _ = self._sample_codes_structured()
+            return codes
         
-        # We have 'shots' number of arrays of length 'total_qubits'
-        # We need to split them into 'num_assets' chunks
-        shocks = np.zeros((self.shots, self.num_assets))
+        with span("quantum.qnode"):
+            samples = np.asarray(self.qnode(self.theta), dtype=np.uint8)
+        samples = self.apply_noise(samples)
         
-        # To avoid 10,000 python loops, we vectorize the mapping
-        # Each chunk is converted to an integer
+        # Each chunk of 'qubits_per_asset' wires is converted to an integer
+        # Example: [1, 0, 1] -> 1*(2^0) + 0*(2^1) + 1*(2^2)
+        dtype = code_dtype(self.qubits_per_asset)
+        powers = (2 ** np.arange(self.qubits_per_asset)).astype(dtype)
+        bits = samples.reshape(self.shots, self.num_assets, self.qubits_per_asset)
+        return (bits * powers).sum(axis=2, dtype=dtype)
+
+    def qubit_one_probabilities(self):
+        """P(1) for every wire before entanglement: RY(theta) H|0> gives (1 + sin(theta)) / 2."""
+        return (1.0 + np.sin(self.theta)) / 2.0
+
+    @traced("quantum.sample_structured")
+    def _sample_codes_structured(self, bit_tilt=None):
+        """
+        Exact sampler for the ansatz without a state vector.
+        Before the CNOT chain the state is a product of single-qubit states, and each CNOT
+        permutes computational basis states, so measuring after the chain equals sampling
+        every wire independently and XOR-ing the control into the target. Along the chain
+        this is a running parity of the registers' first bits, carried register by register:
+        O(shots * total_qubits) time and O(shots * qubits_per_asset) working memory.
+
+        `bit_tilt` (num_assets, qubits_per_asset) shifts the log-odds of each wire for
+        importance sampling. Returns (codes, log likelihood ratio per scenario).
+        """
+        dtype = code_dtype(self.qubits_per_asset)
+        powers = (2 ** np.arange(self.qubits_per_asset)).astype(dtype)
+        p_one = self.qubit_one_probabilities().reshape(self.num_assets, self.qubits_per_asset)
+        
+        codes = np.empty((self.shots, self.num_assets), dtype=dtype)
+        log_lr = np.zeros(self.shots)
+        carry = np.zeros(self.shots, dtype=np.uint8)
         for i in range(self.num_assets):
-            start_wire = i * self.qubits_per_asset
-            end_wire = (i + 1) * self.qubits_per_asset
-            
-            asset_bits = samples[:, start_wire:end_wire]
-            
-            # Convert binary array to integer
-            # Example: [1, 0, 1] -> 1*(2^0) + 0*(2^1) + 1*(2^2)
-            powers = 2 ** np.arange(self.qubits_per_asset)
-            z_int = np.sum(asset_bits * powers, axis=1)
-            
-            # Map to uniform (0, 1)
-            u = (z_int + 0.5) / (2 ** self.qubits_per_asset)
-            
-            # Map to Normal or Student-t
-            if DISTRIBUTION == "Student-t":
-                shocks[:, i] = t.ppf(u, df=STUDENT_T_DF)
-            else:
-                shocks[:, i] = norm.ppf(u)
-                
-        return shocks
+            q_one = p_one[i]
+            if bit_tilt is not None:
+                boost = np.exp(bit_tilt[i])
+                q_one = p_one[i] * boost / (p_one[i] * boost + 1.0 - p_one[i])
+            drawn = self.rng.random((self.shots, self.qubits_per_asset)) < q_one
+            if bit_tilt is not None:
+                # LR on the raw (pre-CNOT) bits; the CNOT permutation and noise do not change it
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    lr_one = np.log(p_one[i]) - np.log(q_one)
+                    lr_zero = np.log1p(-p_one[i]) - np.log1p(-q_one)
+                log_lr += np.where(drawn, lr_one, lr_zero).sum(axis=1)
+            bits = drawn.view(np.uint8)
+            # CNOT(first wire of register i-1 -> first wire of register i)
+            bits[:, 0] ^= carry
+            carry = bits[:, 0].copy()
+            # Noise acts after the whole circuit, so it must not propagate along the chain
+            bits = self.apply_noise(bits)
+            codes[:, i] = (bits * powers).sum(axis=1, dtype=dtype)
+        return codes, log_lr
+
+    def importance_tilt(self, portfolio_weights, sigma, correlation_matrix, shift=IS_SHIFT):
+        """
+        Mean shift of the independent shocks towards portfolio losses.
+        To first order the portfolio return moves along L^T (w * sigma) in shock space,
+        so shocks are shifted `shift` standard deviations against that direction.
+        """
+        with span("cholesky"):
+            L = np.linalg.cholesky(correlation_matrix)
+        direction = L.T @ (np.asarray(portfolio_weights) * np.asarray(sigma))
+        return -shift * direction / np.linalg.norm(direction)
+
+    @scenario_throughput("quantum")
+    def sample_codes_is(self, tilt):
+        """
+        Tail-biased code sampling. Each register's code value is exponentially tilted
+        (log-odds of bit j shifted by tilt_i * 2^j / 2^(q-1)), so a negative tilt pushes
+        the register towards low codes, i.e. negative shocks. Requires the structured sampler.
+        Returns (codes, likelihood-ratio weights).
+        """
+        if self.sampler != "structured":
+            raise ValueError("Importance sampling requires the structured sampler")
+        scale = 2.0 ** np.arange(self.qubits_per_asset) / 2.0 ** (self.qubits_per_asset - 1)
+        codes, log_lr = self._sample_codes_structured(bit_tilt=np.outer(tilt, scale))
+        return codes, np.exp(log_lr)
+
+    def shock_lookup_table(self):
+        """Shock level for every register code: code k maps to ppf((k + 0.5) / 2^q)."""
+        u = (np.arange(2 ** self.qubits_per_asset) + 0.5) / (2 ** self.qubits_per_asset)
+        
+        # Map to Normal or Student-t
+        from scipy.stats import norm, t
+        if DISTRIBUTION == "Student-t":
+            levels = t.ppf(u, df=STUDENT_T_DF)
+        else:
+            levels = norm.ppf(u)
+        return levels.astype(self.dtype)
 
-    def generate_correlated_returns(self, mu, sigma, correlation_matrix, T=1.0):
+    def generate_independent_shocks(self, codes=None):
+        """Maps register codes (sampled if not given) to independent shocks via the lookup table"""
+        if codes is None:
+            codes = self.sample_codes()
+        with span("quantum.ppf_map"):
+            return self.shock_lookup_table()[codes]
+
+    def generate_correlated_returns(self, mu, sigma, correlation_matrix, T=1.0, codes=None):
         """Generates correlated asset returns using Cholesky Decomposition"""
         
         # 1. Calibrate (Mock)
         # 2. Get independent quantum shocks
-        Z_indep = self.generate_independent_shocks()
+        Z_indep = self.generate_independent_shocks(codes)
         
-        # 3. Apply Cholesky Decomposition
-        L = np.linalg.cholesky(correlation_matrix)
-        Z_corr = Z_indep @ L.T
-        
-        # 4. Compute Returns
-        returns = np.zeros_like(Z_corr)
-        for i in range(self.num_assets):
-            # GBM return
-            # R = exp((mu - 0.5*sigma^2)*T + sigma*sqrt(T)*Z) - 1
-            prices = np.exp((mu[i] - 0.5 * sigma[i]**2) * T + sigma[i] * np.sqrt(T) * Z_corr[:, i])
-            returns[:, i] = prices - 1.0
-            
-        return returns
+        # 3. Apply Cholesky Decomposition and 4. compute GBM returns
+        # R = exp((mu - 0.5*sigma^2)*T + sigma*sqrt(T)*Z) - 1
+        with span("cholesky"):
+            L = np.linalg.cholesky(correlation_matrix)
+        return shocks_to_returns(Z_indep, L, mu, sigma, T)
         
+    def generate_correlated_returns_is(self, mu, sigma, correlation_matrix, tilt, T=1.0):
+        """Importance-sampled quantum returns. Returns (returns, likelihood-ratio weights, codes)"""
+        codes, lr = self.sample_codes_is(tilt)
+        returns = self.generate_correlated_returns(mu, sigma, correlation_matrix, T, codes=codes)
+        return returns, lr, codes
+
+    @scenario_throughput("classical")
+    def generate_classical_returns_is(self, mu, sigma, correlation_matrix, tilt, T=1.0):
+        """
+        Importance-sampled classical returns: shocks come from the nominal distribution
+        shifted by `tilt`, and each scenario carries the likelihood ratio f(z) / f(z - tilt).
+        Returns (returns, likelihood-ratio weights).
+        """
+        size = (self.shots, self.num_assets)
+        tilt = np.asarray(tilt, dtype=np.float64)
+        if DISTRIBUTION == "Student-t":
+            from scipy.stats import t
+            Z = self.rng.standard_t(df=STUDENT_T_DF, size=size) + tilt
+            log_lr = (t.logpdf(Z, df=STUDENT_T_DF) - t.logpdf(Z - tilt, df=STUDENT_T_DF)).sum(axis=1)
+            Z = Z.astype(self.dtype, copy=False)
+        else:
+            Z = self.rng.standard_normal(size=size, dtype=self.dtype)
+            Z += tilt.astype(self.dtype)
+            # log N(z) - log N(z - m) = -z.m + |m|^2 / 2
+            log_lr = -(Z @ tilt) + 0.5 * tilt @ tilt
+
+        with span("cholesky"):
+            L = np.linalg.cholesky(correlation_matrix)
+        return shocks_to_returns(Z, L, mu, sigma, T), np.exp(log_lr)
+
+    @scenario_throughput("classical")
     def generate_classical_returns(self, mu, sigma, correlation_matrix, T=1.0):
         """Generates classical correlated returns for comparison"""
         # Classical independent shocks
+        size = (self.shots, self.num_assets)
         if DISTRIBUTION == "Student-t":
             # using student-t shocks
-            Z_indep = np.random.standard_t(df=STUDENT_T_DF, size=(self.shots, self.num_assets))
+            Z_indep = self.rng.standard_t(df=STUDENT_T_DF, size=size).astype(self.dtype, copy=False)
         else:
-            Z_indep = np.random.normal(0, 1, size=(self.shots, self.num_assets))
-            
-        L = np.linalg.cholesky(correlation_matrix)
-        Z_corr = Z_indep @ L.T
-        
-        returns = np.zeros_like(Z_corr)
-        for i in range(self.num_assets):
-            prices = np.exp((mu[i] - 0.5 * sigma[i]**2) * T + sigma[i] * np.sqrt(T) * Z_corr[:, i])
-            returns[:, i] = prices - 1.0
+            Z_indep = self.rng.standard_normal(size=size, dtype=self.dtype)
             
-        return returns
+        with span("cholesky"):
+            L = np.linalg.cholesky(correlation_matrix)
+        return shocks_to_returns(Z_indep, L, mu, sigma, T)
@@ -1,5 +1,8 @@
 import numpy as np
 
+from src.engine.profiling import traced
+
+@traced("risk.var_cvar")
 def calculate_var_cvar(returns, confidence_level=0.95):
     """Calculates Value at Risk and Conditional Value at Risk"""
     var = -np.percentile(returns, (1 - confidence_level) * 100)
@@ -16,6 +19,7 @@ def calculate_l_var(var, weights, prices, spreads):
     liquidation_cost_pct = liquidation_cost / np.sum(weights * prices)
     return var + liquidation_cost_pct
 
+@traced("risk.marginal_var")
 def calculate_marginal_var(asset_returns, portfolio_returns, confidence_level=0.95):
     """
     Calculates Marginal VaR (MVaR) for each asset.
@@ -25,7 +29,14 @@ def calculate_marginal_var(asset_returns, portfolio_returns, confidence_level=0.
     are close to the VaR threshold (within a small epsilon window).
     """
     threshold = np.percentile(portfolio_returns, (1 - confidence_level) * 100)
-    
+    window = _var_window(portfolio_returns, threshold)
+        
+    # MVaR is the negative expected return of the asset in this window
+    mvar = -np.mean(asset_returns[window], axis=0)
+    return mvar
+
+def _var_window(portfolio_returns, threshold):
+    """Scenarios whose portfolio return lies close to the VaR threshold (mask or index array)"""
     # Epsilon window around the threshold (using absolute value of threshold)
     epsilon = 0.05 * np.abs(threshold)
     if epsilon < 1e-4:
@@ -42,14 +53,59 @@ def calculate_marginal_var(asset_returns, portfolio_returns, confidence_level=0.
         
     if not np.any(condition):
         # Fallback to nearest neighbors if still empty
-        nearest_idx = np.argsort(np.abs(portfolio_returns - threshold))[:10]
-        tail_asset_returns = asset_returns[nearest_idx]
-    else:
-        tail_asset_returns = asset_returns[condition]
-        
-    # MVaR is the negative expected return of the asset in this window
-    mvar = -np.mean(tail_asset_returns, axis=0)
-    return mvar
+        return np.argsort(np.abs(portfolio_returns - threshold))[:10]
+    return condition
+
+def weighted_quantile(values, scenario_weights, q):
+    """
+    Lower-tail quantile of an importance-sampled sample.
+    Likelihood ratios have expectation one, so F(x) is estimated as (1/N) sum w_i 1{x_i <= x};
+    normalising by N rather than sum(w) keeps the large weights of non-tail scenarios
+    out of the tail estimate.
+    """
+    order = np.argsort(values)
+    cum = np.cumsum(scenario_weights[order])
+    idx = np.searchsorted(cum, q * len(values))
+    return values[order[min(idx, len(values) - 1)]]
+
+@traced("risk.weighted_var_cvar")
+def calculate_weighted_var_cvar(returns, scenario_weights, confidence_level=0.95):
+    """
+    VaR and CVaR from importance-sampled scenarios.
+    scenario_weights are the per-scenario likelihood ratios; with uniform weights this
+    reduces to calculate_var_cvar.
+    """
+    var = -weighted_quantile(returns, scenario_weights, 1 - confidence_level)
+    tail = returns <= -var
+    cvar = -np.sum(scenario_weights[tail] * returns[tail]) / np.sum(scenario_weights[tail])
+    return var, cvar
+
+@traced("risk.weighted_marginal_var")
+def calculate_weighted_marginal_var(asset_returns, portfolio_returns, scenario_weights, confidence_level=0.95):
+    """Marginal VaR from importance-sampled scenarios: likelihood-weighted mean in the VaR window"""
+    threshold = weighted_quantile(portfolio_returns, scenario_weights, 1 - confidence_level)
+    window = _var_window(portfolio_returns, threshold)
+    w = scenario_weights[window]
+    return -(w @ asset_returns[window]) / np.sum(w)
+
+def effective_sample_size(scenario_weights):
+    """Kish effective sample size of a weighted sample, (sum w)^2 / sum w^2"""
+    return float(np.sum(scenario_weights) ** 2 / np.sum(scenario_weights ** 2))
+
+def batch_means_errors(returns, confidence_level=0.95, scenario_weights=None, batches=20):
+    """
+    Standard errors of the VaR and CVaR estimates by batch means.
+    The i.i.d. scenarios are split into `batches` equal sections, VaR/CVaR are estimated on each,
+    and the standard error of the full-sample estimate is std(section estimates) / sqrt(batches).
+    """
+    sections = np.array_split(np.arange(len(returns)), batches)
+    estimates = np.array([
+        calculate_var_cvar(returns[idx], confidence_level) if scenario_weights is None
+        else calculate_weighted_var_cvar(returns[idx], scenario_weights[idx], confidence_level)
+        for idx in sections
+    ])
+    var_se, cvar_se = estimates.std(axis=0, ddof=1) / np.sqrt(batches)
+    return float(var_se), float(cvar_se)
 
 def calculate_component_var(mvar, weights):
     """
@@ -0,0 +1,231 @@
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from datetime import datetime, timezone
+
+import numpy as np
+
+from src.engine.compact import rebuild_returns
+from src.engine.config import RUNS_DIR, RUN_RETENTION, RUN_RETENTION_BYTES, STALE_RUN_SECONDS
+
+MANIFEST_NAME = "manifest.json"
+LATEST_POINTER = "LATEST"
+
+_RUN_ID_PATTERN = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+class RunNotFoundError(LookupError):
+    pass
+
+
+def new_run_id():
+    """Sortable run identifier: UTC timestamp plus a random suffix."""
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    return f"{stamp}-{uuid.uuid4().hex[:8]}"
+
+
+def _root(root):
+    return RUNS_DIR if root is None else root
+
+
+def run_dir(run_id, root=None):
+    if not run_id or not _RUN_ID_PATTERN.match(run_id) or run_id.startswith("."):
+        raise ValueError(f"Invalid run id: {run_id!r}")
+    return _root(root) / run_id
+
+
+def atomic_write_text(path, text):
+    atomic_write_bytes(path, text.encode())
+
+
+def atomic_write_bytes(path, data):
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:6]}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def write_array(run_id, name, array, root=None):
+    """Writes one array as <run_dir>/<name>.npy and returns its manifest entry."""
+    path = run_dir(run_id, root)
+    path.mkdir(parents=True, exist_ok=True)
+    array = np.ascontiguousarray(array)
+    target = path / f"{name}.npy"
+    tmp = path / f".{name}.npy.tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp, target)
+    return {"file": target.name, "shape": list(array.shape), "dtype": str(array.dtype)}
+
+
+def write_run(run_id, arrays, metrics, root=None, **meta):
+    """
+    Persists a complete run: every array as its own .npy file, then the manifest.
+    The manifest is written last, so a run directory without one is unfinished.
+    """
+    entries = {name: write_array(run_id, name, arr, root) for name, arr in arrays.items()}
+
+    manifest = {
+        "run_id": run_id,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        **meta,
+        "arrays": entries,
+        "metrics": metrics,
+    }
+    atomic_write_text(run_dir(run_id, root) / MANIFEST_NAME, json.dumps(manifest, indent=2))
+    atomic_write_text(_root(root) / LATEST_POINTER, run_id)
+
+    prune_runs(root=root)
+    return manifest
+
+
+def add_arrays(run_id, arrays, root=None):
+    """Adds arrays to a finished run (e.g. from a later pipeline stage) and registers them in its manifest."""
+    entries = {name: write_array(run_id, name, arr, root) for name, arr in arrays.items()}
+    manifest = read_manifest(run_id, root)
+    return update_manifest(run_id, root, arrays={**manifest.get("arrays", {}), **entries})
+
+
+def read_manifest(run_id, root=None):
+    return _read_manifest_version(run_id, root)[0]
+
+
+def _read_manifest_version(run_id, root=None):
+    """The manifest and its mtime_ns (the run's version), taken from the same open file."""
+    path = run_dir(run_id, root) / MANIFEST_NAME
+    try:
+        with open(path, "r") as f:
+            return json.load(f), os.fstat(f.fileno()).st_mtime_ns
+    except FileNotFoundError:
+        raise RunNotFoundError(f"Run {run_id} not found")
+
+
+def update_manifest(run_id, root=None, **fields):
+    """Merges top-level fields into an existing manifest (atomic rewrite)."""
+    manifest = read_manifest(run_id, root)
+    manifest.update(fields)
+    atomic_write_text(run_dir(run_id, root) / MANIFEST_NAME, json.dumps(manifest, indent=2))
+    return manifest
+
+
+def list_runs(root=None):
+    """Completed run ids, oldest first."""
+    base = _root(root)
+    if not base.exists():
+        return []
+    return sorted(
+        p.name for p in base.iterdir()
+        if p.is_dir() and not p.name.startswith(".") and (p / MANIFEST_NAME).exists()
+    )
+
+
+def latest_run_id(root=None):
+    pointer = _root(root) / LATEST_POINTER
+    if pointer.exists():
+        run_id = pointer.read_text().strip()
+        if run_id and (run_dir(run_id, root) / MANIFEST_NAME).exists():
+            return run_id
+    runs = list_runs(root)
+    return runs[-1] if runs else None
+
+
+def load_array(run_id, name, root=None, mmap=True):
+    """Opens a stored array; memory-mapped read-only by default so callers slice lazily."""
+    path = run_dir(run_id, root) / f"{name}.npy"
+    if not path.exists():
+        raise RunNotFoundError(f"Array {name!r} not found for run {run_id}")
+    return np.load(path, mmap_mode="r" if mmap else None)
+
+
+class StoredRun:
+    """Read-only view over one run directory. Arrays are opened on first access."""
+
+    def __init__(self, run_id, root=None):
+        self.run_id = run_id
+        self.root = root
+        # version changes whenever the manifest is rewritten, e.g. when a later stage attaches results
+        self.manifest, self.version = _read_manifest_version(run_id, root)
+        self._arrays = {}
+
+    @property
+    def metrics(self):
+        return self.manifest.get("metrics", {})
+
+    @property
+    def path(self):
+        return run_dir(self.run_id, self.root)
+
+    def has_array(self, name):
+        return name in self.manifest.get("arrays", {})
+
+    def array(self, name):
+        if name not in self._arrays:
+            self._arrays[name] = load_array(self.run_id, name, self.root)
+        return self._arrays[name]
+
+    def asset_returns(self, engine):
+        """Scenario asset returns (shots, n_assets); quantum ones are rebuilt from the packed codes."""
+        if engine == "classical":
+            return self.array("c_asset_returns")
+        cal = self.manifest["calibration"]
+        return rebuild_returns(
+            self.array("q_codes"), self.array("q_shock_lut"), cal["chol"], cal["mu"], cal["sigma"],
+            self.manifest["qubits_per_asset"], cal["T"],
+        )
+
+    def scenario_weights(self, engine):
+        """Likelihood-ratio weights of an engine's scenarios, or None unless importance-sampled."""
+        name = "q_lr_weights" if engine == "quantum" else "c_lr_weights"
+        return self.array(name) if self.has_array(name) else None
+
+
+def open_run(run_id=None, root=None):
+    """Opens the given run, or the latest completed one when run_id is None."""
+    if run_id is None:
+        run_id = latest_run_id(root)
+        if run_id is None:
+            raise RunNotFoundError("No completed runs in the scenario store")
+    return StoredRun(run_id, root)
+
+
+def _dir_size(path):
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def prune_runs(keep=RUN_RETENTION, max_bytes=RUN_RETENTION_BYTES, root=None):
+    """
+    Retention policy: keep at most `keep` completed runs and at most `max_bytes`
+    on disk, dropping the oldest first. The latest run is never removed.
+    Unfinished run directories are removed once they are older than STALE_RUN_SECONDS.
+    """
+    base = _root(root)
+    if not base.exists():
+        return []
+
+    removed = []
+    now = time.time()
+    for p in base.iterdir():
+        if p.is_dir() and not (p / MANIFEST_NAME).exists() and now - p.stat().st_mtime > STALE_RUN_SECONDS:
+            shutil.rmtree(p, ignore_errors=True)
+            removed.append(p.name)
+
+    runs = list_runs(root)
+    latest = latest_run_id(root)
+    sizes = {r: _dir_size(base / r) for r in runs}
+    total = sum(sizes.values())
+    remaining = len(runs)
+
+    for run_id in runs:
+        if remaining <= keep and total <= max_bytes:
+            break
+        if run_id == latest:
+            continue
+        shutil.rmtree(base / run_id, ignore_errors=True)
+        removed.append(run_id)
+        remaining -= 1
+        total -= sizes[run_id]
+
+    return removed
@@ -0,0 +1,128 @@
+import argparse
+import time
+
+import numpy as np
+
+from src.engine.config import (
+    TICKERS, HISTORY_DAYS, TRADING_DAYS, SYNTH_FACTORS, SYNTH_DF, SYNTH_GARCH_ALPHA, SYNTH_GARCH_BETA,
+    SYNTH_REGIME_STAY, SYNTH_REGIME_DRIFT, SYNTH_STRESS_VOL, SYNTH_STRESS_FACTOR
+)
+from src.engine.price_store import write_prices
+
+SYNTH_START = "2015-01-02"
+
+
+def synthetic_tickers(num_assets):
+    """The configured TICKERS first (so the default pipeline can run on the store), then SYN00001, ..."""
+    named = list(TICKERS[:num_assets])
+    return named + [f"SYN{i:05d}" for i in range(1, num_assets - len(named) + 1)]
+
+
+def student_t(rng, df, size):
+    """Student-t draws rescaled to unit variance."""
+    return rng.standard_t(df, size=size) * np.sqrt((df - 2.0) / df)
+
+
+def garch(z, alpha=SYNTH_GARCH_ALPHA, beta=SYNTH_GARCH_BETA):
+    """
+    GARCH(1,1) filter with unit long-run variance, one column per series:
+    eps_t = sqrt(h_t) z_t, h_t = (1 - alpha - beta) + alpha eps_{t-1}^2 + beta h_{t-1}.
+    The recursion is sequential in time, so it loops over days and is vectorized across series.
+    """
+    eps = np.empty_like(z)
+    h = np.ones(z.shape[1])
+    omega = 1.0 - alpha - beta
+    for t in range(len(z)):
+        eps[t] = np.sqrt(h) * z[t]
+        h = omega + alpha * eps[t] ** 2 + beta * h
+    return eps
+
+
+def regime_path(days, rng, stay=SYNTH_REGIME_STAY):
+    """
+    Calm (0) / stressed (1) state per day of a two-state Markov chain.
+    Sojourn times of a Markov chain are geometric, so the path is built from alternating run lengths.
+    """
+    p_calm, p_stress = stay
+    stressed_share = (1 - p_calm) / ((1 - p_calm) + (1 - p_stress))
+    first = int(rng.random() < stressed_share)
+    stay_first, stay_second = (p_stress, p_calm) if first else (p_calm, p_stress)
+    pairs = int(days / (1 / (1 - p_calm) + 1 / (1 - p_stress))) * 2 + 8
+    runs = []
+    total = 0
+    while total < days:
+        chunk = np.empty(2 * pairs, dtype=np.int64)
+        chunk[0::2] = rng.geometric(1 - stay_first, pairs)
+        chunk[1::2] = rng.geometric(1 - stay_second, pairs)
+        runs.append(chunk)
+        total += int(chunk.sum())
+    runs = np.concatenate(runs)
+    states = np.resize(np.array([first, 1 - first], dtype=np.int8), len(runs))
+    return np.repeat(states, runs)[:days]
+
+
+def synthetic_returns(num_assets, days, seed=None, num_factors=SYNTH_FACTORS, df=SYNTH_DF):
+    """
+    Seeded (days, num_assets) daily simple returns and the (days,) regime path.
+    Each asset loads on `num_factors` common factors (a market factor plus sector-like ones) and an
+    idiosyncratic term. Every shock is Student-t and GARCH(1,1)-filtered. Stressed days raise
+    volatility, raise the factor share (so correlations rise) and switch to a negative drift.
+    """
+    rng = np.random.default_rng(seed)
+    vol = rng.uniform(0.12, 0.45, num_assets) / np.sqrt(TRADING_DAYS)
+    r2 = rng.uniform(0.2, 0.7, num_assets)  # variance share of the factors in calm markets
+    loadings = rng.normal(0.0, 1.0, (num_assets, num_factors))
+    loadings[:, 0] = np.abs(loadings[:, 0]) + 1.0
+    loadings *= np.sqrt(r2 / np.sum(loadings ** 2, axis=1))[:, None]
+
+    shocks = garch(student_t(rng, df, (days, num_factors + num_assets)))
+    states = regime_path(days, rng)
+    stressed = states.astype(bool)[:, None]
+
+    factors = shocks[:, :num_factors] * np.where(stressed, SYNTH_STRESS_FACTOR, 1.0)
+    x = factors @ loadings.T + shocks[:, num_factors:] * np.sqrt(1.0 - r2)
+    daily_vol = vol * np.where(stressed, SYNTH_STRESS_VOL, 1.0)
+    drift = np.asarray(SYNTH_REGIME_DRIFT)[states][:, None] / TRADING_DAYS
+    return np.expm1(drift - 0.5 * daily_vol ** 2 + daily_vol * x), states
+
+
+def synthetic_history(tickers=TICKERS, days=HISTORY_DAYS, seed=0):
+    """Seeded drop-in for get_historical_data: a fresh synthetic universe shaped (days, len(tickers))."""
+    returns, _ = synthetic_returns(len(tickers), days, seed)
+    return returns
+
+
+def write_synthetic_market(num_assets, days, seed=None, root=None, start=SYNTH_START, **params):
+    """Generates a synthetic market and writes it to the local price store (days + 1 closes per asset)."""
+    returns, states = synthetic_returns(num_assets, days, seed, **params)
+    prices = np.empty((days + 1, num_assets))
+    prices[0] = 100.0
+    np.cumprod(1.0 + returns, axis=0, out=prices[1:])
+    prices[1:] *= 100.0
+    dates = np.busday_offset(np.datetime64(start, "D"), np.arange(days + 1), roll="forward")
+    return write_prices(
+        synthetic_tickers(num_assets), dates, prices, root,
+        source="synthetic", seed=seed, stressed_days=int(states.sum()), params=params,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a seeded synthetic market to the local price store")
+    parser.add_argument("--assets", type=int, default=len(TICKERS))
+    parser.add_argument("--days", type=int, default=2520)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--factors", type=int, default=SYNTH_FACTORS)
+    parser.add_argument("--start", default=SYNTH_START)
+    parser.add_argument("--root", help="Price store directory (default: PRICE_STORE_DIR)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    manifest = write_synthetic_market(args.assets, args.days, args.seed, args.root, args.start,
+                                      num_factors=args.factors)
+    print(f"Wrote {args.assets} assets x {manifest['days']} days ({manifest['start']} to {manifest['end']}, "
+          f"{manifest['stressed_days']} stressed) in {time.perf_counter() - started:.2f} s")
+    print("Run the engine on it with RISK_PRICE_SOURCE=local")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,60 +1,83 @@
-import os
-import numpy as np
-import matplotlib.pyplot as plt
 import json
+import time
+
+import numpy as np
 
-from src.engine.config import LIMITS, LIMITS_FILE
-from src.engine.database import init_db
+from src.engine.config import LIMITS_FILE
+from src.engine.database import init_db, log_limit_results
+from src.engine.limits_tree import STATUSES, load_limit_tree, parse_limit_key
+from src.engine.progress import get_reporter
+from src.engine.audit import get_audit_writer
+from src.engine.scenario_store import open_run, update_manifest, atomic_write_text
+from src.engine.figures import export_figures
 
-def check_breach(metric, limit):
-    if metric > limit:
-        return "BREACH"
-    elif metric > 0.9 * limit:
-        return "WARNING"
-    else:
-        return "PASS"
+ENGINES = {"quantum": "Quantum", "classical": "Classical"}
+TOP_BREACHES = 10
 
-def run_risk_limits():
+def run_risk_limits(run_id=None, tree=None):
+    """
+    Checks every node of the limit tree against its VaR/CVaR limits for both engines' scenarios.
+    Results are handed to the audit writer chunk by chunk, so they are persisted while later nodes are still evaluated.
+    The root node's statuses keep the flat summary written to LIMITS_FILE.
+    """
     init_db()
-    data = np.load(os.path.join("data", "risk_state.npz"))
-    
-    q_port_VaR = float(data["q_port_VaR"])
-    q_port_CVaR = float(data["q_port_CVaR"])
-    c_port_VaR = float(data["c_port_VaR"])
-    c_port_CVaR = float(data["c_port_CVaR"])
-    
-    results = {
-        "Quantum VaR": (q_port_VaR, check_breach(q_port_VaR, LIMITS["VaR_95"])),
-        "Quantum CVaR": (q_port_CVaR, check_breach(q_port_CVaR, LIMITS["CVaR_95"])),
-        "Classical VaR": (c_port_VaR, check_breach(c_port_VaR, LIMITS["VaR_95"])),
-        "Classical CVaR": (c_port_CVaR, check_breach(c_port_CVaR, LIMITS["CVaR_95"]))
+    run = open_run(run_id)
+    tree = tree or load_limit_tree(run.manifest["tickers"], run.manifest["weights"])
+    audit = get_audit_writer()
+    progress = get_reporter(run_id)
+
+    start_t = time.perf_counter()
+    evaluated = {}
+    for engine in ENGINES:
+        evaluated[engine] = tree.evaluate(
+            run.asset_returns(engine), run.scenario_weights(engine), engine,
+            on_chunk=lambda rows: audit.submit_rows(log_limit_results, rows, run.run_id),
+        )
+    duration = time.perf_counter() - start_t
+    progress.throughput("risk_limits", "limit_nodes", len(tree) * len(ENGINES), duration, unit="nodes")
+
+    results = {}
+    for engine, label in ENGINES.items():
+        values, _, status = evaluated[engine]
+        for m, metric in enumerate(tree.metrics):
+            if not np.isnan(tree.limits[0, m]):
+                kind, level = parse_limit_key(metric)
+                name = f"{label} {kind}" if level == 0.95 else f"{label} {metric}"
+                results[name] = (float(values[0, m]), str(status[0, m]), float(tree.limits[0, m]))
+
+    breaches = []
+    for engine, (values, utilization, status) in evaluated.items():
+        for i, m in zip(*np.nonzero(status == "BREACH")):
+            breaches.append({"node_id": tree.ids[i], "engine": engine, "metric": tree.metrics[m],
+                             "value": float(values[i, m]), "utilization": float(utilization[i, m])})
+    breaches.sort(key=lambda b: -b["utilization"])
+    tree_summary = {
+        "nodes": len(tree),
+        "metrics": tree.metrics,
+        "status_counts": {
+            engine: {s: int(np.count_nonzero(status == s)) for s in STATUSES}
+            for engine, (_, _, status) in evaluated.items()
+        },
+        "top_breaches": breaches[:TOP_BREACHES],
+        "duration_ms": round(duration * 1000, 2),
     }
-    
+
     print("\n===== DAILY RISK LIMIT CHECK =====")
-    for k, (val, status) in results.items():
+    for k, (val, status, _) in results.items():
         print(f"{k:18s}: {val:.4f} | Status: {status}")
         
-    labels = list(results.keys())
-    values = [v[0] for v in results.values()]
-    limits = [LIMITS["VaR_95"], LIMITS["CVaR_95"], LIMITS["VaR_95"], LIMITS["CVaR_95"]]
-    
-    plt.figure(figsize=(9,5))
-    plt.bar(labels, values, color=['#1f77b4', '#ff7f0e', '#1f77b4', '#ff7f0e'])
-    plt.plot(labels, limits, linestyle="--", label="Risk Limit", color="red", linewidth=2)
-    plt.ylabel("Risk Value (Loss %)")
-    plt.title("Daily Risk Metrics vs Calibrated Limits")
-    plt.xticks(rotation=20)
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig("figures/risk_limits.png", dpi=300)
-    plt.close()
-    
-    limits_summary = {k: status for k, (_, status) in results.items()}
-    with open(LIMITS_FILE, "w") as f:
-        json.dump(limits_summary, f, indent=2)
+    limits_summary = {k: status for k, (_, status, _) in results.items()}
+    # Atomic replace: concurrent runs and readers never see a half-written file
+    atomic_write_text(LIMITS_FILE, json.dumps(limits_summary, indent=2))
+    update_manifest(
+        run.run_id, limits=limits_summary, limit_tree=tree_summary,
+        limit_checks={k: {"value": val, "limit": limit, "status": status} for k, (val, status, limit) in results.items()},
+    )
         
+    print(f"Checked {len(tree)} limit nodes in {tree_summary['duration_ms']:.1f} ms")
     print("Risk limits check completed.")
     return limits_summary
 
 if __name__ == "__main__":
-    run_risk_limits()
\ No newline at end of file
+    run_risk_limits()
+    export_figures(open_run(), ["risk_limits"])
\ No newline at end of file
@@ -1,18 +1,148 @@
+import logging
 import os
+import time
+from datetime import datetime
 import numpy as np
-import matplotlib.pyplot as plt
 
-from src.engine.config import TICKERS, DEFAULT_WEIGHTS, INITIAL_PORTFOLIO_VALUE, FAST_SHOTS, DEFAULT_SHOTS, QUBITS_PER_ASSET
+from src.engine.config import (
+    TICKERS, DEFAULT_WEIGHTS, INITIAL_PORTFOLIO_VALUE, FAST_SHOTS, DEFAULT_SHOTS, QUBITS_PER_ASSET,
+    CONFIDENCE_LEVELS, HORIZONS, TRADING_DAYS, IMPORTANCE_SAMPLING, IS_SHIFT,
+    ADAPTIVE_INITIAL_SHOTS, ADAPTIVE_MAX_SHOTS, ADAPTIVE_TARGET_REL_ERROR, ADAPTIVE_TIME_BUDGET_SEC,
+    ADAPTIVE_BATCHES, ADAPTIVE_MAX_GROWTH
+)
 from src.engine.quantum_engine import QuantumRiskEngine
-from src.engine.risk_metrics import calculate_var_cvar, calculate_marginal_var, calculate_component_var
+from src.engine.risk_metrics import (
+    calculate_var_cvar, calculate_marginal_var, calculate_component_var,
+    calculate_weighted_var_cvar, calculate_weighted_marginal_var, effective_sample_size, batch_means_errors
+)
 from src.engine.backtester import get_historical_data
-from src.engine.database import init_db, log_execution
+from src.engine.database import init_db, log_executions, record_run, log_run_metrics, log_run_attribution
+from src.engine.audit import get_audit_writer
+from src.engine.scenario_store import new_run_id, write_run, open_run
+from src.engine.figures import export_figures
+from src.engine.compact import pack_codes, rescale_horizon
+from src.engine.progress import get_reporter
 
-def run_scenario_risk(mode="FULL"):
+logger = logging.getLogger(__name__)
+
+def _var_cvar(returns, lr_weights, confidence_level):
+    if lr_weights is None:
+        return calculate_var_cvar(returns, confidence_level)
+    return calculate_weighted_var_cvar(returns, lr_weights, confidence_level)
+
+def _marginal_var(asset_returns, portfolio_returns, lr_weights, confidence_level=0.95):
+    if lr_weights is None:
+        return calculate_marginal_var(asset_returns, portfolio_returns, confidence_level)
+    return calculate_weighted_marginal_var(asset_returns, portfolio_returns, lr_weights, confidence_level)
+
+def _simulate(q_engine, shots, mu, sigma, corr, tilt=None):
+    """
+    One round of `shots` quantum and classical scenarios (tilted towards losses when tilt is given).
+    Returns the scenario arrays and the seconds spent per engine.
+    """
+    q_engine.shots = shots
+    q_lr = c_lr = None
+    t0 = time.perf_counter()
+    if tilt is not None:
+        q_returns, q_lr, q_codes = q_engine.generate_correlated_returns_is(mu, sigma, corr, tilt)
+        t1 = time.perf_counter()
+        c_returns, c_lr = q_engine.generate_classical_returns_is(mu, sigma, corr, tilt)
+    else:
+        q_codes = q_engine.sample_codes()
+        q_returns = q_engine.generate_correlated_returns(mu, sigma, corr, codes=q_codes)
+        t1 = time.perf_counter()
+        c_returns = q_engine.generate_classical_returns(mu, sigma, corr)
+    t2 = time.perf_counter()
+    scenarios = {"q_codes": q_codes, "q_returns": q_returns, "q_lr": q_lr, "c_returns": c_returns, "c_lr": c_lr}
+    return scenarios, t1 - t0, t2 - t1
+
+def _standard_errors(scenarios, port_weights):
+    """
+    Batch-means standard errors of VaR/CVaR per engine and confidence level, and the worst relative error.
+    Errors are relative to the estimate, but never to less than the portfolio return volatility:
+    a VaR close to zero (a calibration with positive drift) would otherwise never meet the target.
+    """
+    errors = {}
+    worst = 0.0
+    for engine, prefix in (("quantum", "q"), ("classical", "c")):
+        port = np.dot(scenarios[f"{prefix}_returns"], port_weights)
+        lr = scenarios[f"{prefix}_lr"]
+        scale = float(np.std(port))
+        errors[engine] = {}
+        for cl in CONFIDENCE_LEVELS:
+            var, cvar = _var_cvar(port, lr, cl)
+            var_se, cvar_se = batch_means_errors(port, cl, lr, ADAPTIVE_BATCHES)
+            errors[engine][str(cl)] = {"VaR_se": var_se, "CVaR_se": cvar_se}
+            for estimate, se in ((var, var_se), (cvar, cvar_se)):
+                worst = max(worst, se / max(abs(float(estimate)), scale, 1e-12))
+    return errors, worst
+
+def _simulate_adaptive(q_engine, mu, sigma, corr, port_weights, tilt=None, progress=None):
+    """
+    Generates scenarios in growing rounds until the worst relative standard error of the VaR/CVaR
+    estimates reaches ADAPTIVE_TARGET_REL_ERROR, or the time budget or shot cap runs out.
+    Standard errors shrink like 1/sqrt(shots), so each round aims straight for the shots the target
+    needs (with 10% headroom), capped by ADAPTIVE_MAX_GROWTH and by what the remaining time affords.
+    """
+    if q_engine.sampler != "structured":
+        raise ValueError("Adaptive shots require the structured sampler")
+    started = time.perf_counter()
+    rounds, parts = [], []
+    seconds = {"quantum": 0.0, "classical": 0.0}
+    total, shots = 0, ADAPTIVE_INITIAL_SHOTS
+    while True:
+        part, q_sec, c_sec = _simulate(q_engine, shots, mu, sigma, corr, tilt)
+        parts.append(part)
+        total += shots
+        seconds["quantum"] += q_sec
+        seconds["classical"] += c_sec
+        scenarios = {
+            key: None if parts[0][key] is None else np.concatenate([p[key] for p in parts])
+            for key in parts[0]
+        }
+        errors, rel_error = _standard_errors(scenarios, port_weights)
+        elapsed = time.perf_counter() - started
+        rounds.append({"shots": total, "rel_error": round(rel_error, 6), "elapsed_sec": round(elapsed, 4)})
+        if progress is not None:
+            progress.emit("adaptive_round", stage="scenario_portfolio_risk", shots=total,
+                          rel_error=round(rel_error, 6), target=ADAPTIVE_TARGET_REL_ERROR)
+
+        if rel_error <= ADAPTIVE_TARGET_REL_ERROR:
+            stopped_by = "target"
+        elif total >= ADAPTIVE_MAX_SHOTS:
+            stopped_by = "max_shots"
+        else:
+            needed = total * (rel_error / ADAPTIVE_TARGET_REL_ERROR) ** 2 * 1.1
+            goal = min(needed, total * ADAPTIVE_MAX_GROWTH, ADAPTIVE_MAX_SHOTS)
+            affordable = (ADAPTIVE_TIME_BUDGET_SEC - elapsed) * total / elapsed
+            # Rounds smaller than the first are only worth it to land exactly on the shot cap
+            if affordable < min(goal - total, ADAPTIVE_INITIAL_SHOTS):
+                stopped_by = "time_budget"
+            else:
+                shots = max(int(min(goal - total, affordable)), 1)
+                stopped_by = None
+        if stopped_by is not None:
+            break
+
+    q_engine.shots = total
+    parts.clear()
+    adaptive = {
+        "target_rel_error": ADAPTIVE_TARGET_REL_ERROR,
+        "achieved_rel_error": rel_error,
+        "stopped_by": stopped_by,
+        "standard_errors": errors,
+        "rounds": rounds,
+        "elapsed_sec": round(elapsed, 4),
+    }
+    return scenarios, seconds, adaptive
+
+def run_scenario_risk(mode="FULL", run_id=None, importance_sampling=IMPORTANCE_SAMPLING):
     init_db()
+    run_id = run_id or new_run_id()
     print(f"Running Scenario Portfolio Risk in {mode} mode...")
     
-    shots = FAST_SHOTS if mode == "FAST" else DEFAULT_SHOTS
+    # ADAPTIVE starts at ADAPTIVE_INITIAL_SHOTS and reports the shots it ended up using
+    shots = {"FAST": FAST_SHOTS, "ADAPTIVE": ADAPTIVE_INITIAL_SHOTS}.get(mode, DEFAULT_SHOTS)
     
     # 1. Fetch historical data to calibrate correlation and volatility
     returns_history = get_historical_data()
@@ -31,17 +161,46 @@ def run_scenario_risk(mode="FULL"):
     # 2. Quantum Engine Setup & Calibration
     q_engine = QuantumRiskEngine(num_assets=len(TICKERS), qubits_per_asset=QUBITS_PER_ASSET, shots=shots)
     q_engine.calibrate(corr)
+    if importance_sampling and q_engine.sampler != "structured":
+        # Tilted sampling needs per-bit probabilities; fall back before any scenarios are drawn
+        logger.warning("Importance sampling requires the structured sampler (SAMPLER=%r); sampling without it",
+                       q_engine.sampler)
+        importance_sampling = False
     
     # 3. Simulate Scenarios (pass correlation matrix, NOT covariance)
-    q_returns = q_engine.generate_correlated_returns(mu, sigma, corr)
-    c_returns = q_engine.generate_classical_returns(mu, sigma, corr)
+    # Quantum draws are kept as register codes; returns are a deterministic function of them
+    # With importance sampling, scenarios are tilted towards losses and carry likelihood ratios
+    progress = get_reporter(run_id)
+    tilt = q_engine.importance_tilt(weights, sigma, corr, IS_SHIFT) if importance_sampling else None
+    # Keep the portfolio vectors in the engine's compute dtype (no silent float64 upcast)
+    port_weights = weights.astype(q_engine.dtype)
+    adaptive = None
+    if mode == "ADAPTIVE":
+        scenarios, seconds, adaptive = _simulate_adaptive(q_engine, mu, sigma, corr, port_weights, tilt, progress)
+        shots = q_engine.shots
+    else:
+        scenarios, q_sec, c_sec = _simulate(q_engine, shots, mu, sigma, corr, tilt)
+        seconds = {"quantum": q_sec, "classical": c_sec}
+    q_codes, q_returns, q_lr = scenarios["q_codes"], scenarios["q_returns"], scenarios["q_lr"]
+    c_returns, c_lr = scenarios["c_returns"], scenarios["c_lr"]
+    progress.throughput("scenario_portfolio_risk", "quantum", shots, seconds["quantum"])
+    progress.throughput("scenario_portfolio_risk", "classical", shots, seconds["classical"])
     
-    q_port_returns = np.dot(q_returns, weights)
-    c_port_returns = np.dot(c_returns, weights)
+    q_port_returns = np.dot(q_returns, port_weights)
+    c_port_returns = np.dot(c_returns, port_weights)
     
     # 4. Calculate Risk Metrics
-    q_var, q_cvar = calculate_var_cvar(q_port_returns, 0.95)
-    c_var, c_cvar = calculate_var_cvar(c_port_returns, 0.95)
+    q_var, q_cvar = _var_cvar(q_port_returns, q_lr, 0.95)
+    c_var, c_cvar = _var_cvar(c_port_returns, c_lr, 0.95)
+    
+    by_confidence = {}
+    for cl in CONFIDENCE_LEVELS:
+        q_v, q_cv = _var_cvar(q_port_returns, q_lr, cl)
+        c_v, c_cv = _var_cvar(c_port_returns, c_lr, cl)
+        by_confidence[str(cl)] = {
+            "q_VaR": float(q_v), "q_CVaR": float(q_cv),
+            "c_VaR": float(c_v), "c_CVaR": float(c_cv),
+        }
     
     print("\n===== PORTFOLIO RISK (95%) =====")
     print(f"Quantum Portfolio VaR  : {q_var:.4f}")
@@ -50,22 +209,71 @@ def run_scenario_risk(mode="FULL"):
     print(f"Classical Portfolio CVaR: {c_cvar:.4f}")
     
     # Calculate Marginal VaR
-    q_mvar = calculate_marginal_var(q_returns, q_port_returns)
-    c_mvar = calculate_marginal_var(c_returns, c_port_returns)
+    q_mvar = _marginal_var(q_returns, q_port_returns, q_lr)
+    c_mvar = _marginal_var(c_returns, c_port_returns, c_lr)
     q_comp_var = calculate_component_var(q_mvar, weights)
+    c_comp_var = calculate_component_var(c_mvar, weights)
     
-    # 5. Persist State
-    np.savez(
-        os.path.join("data", "risk_state.npz"),
-        portfolio_returns_q=q_port_returns,
-        portfolio_returns_c=c_port_returns,
-        q_port_VaR=q_var,
-        q_port_CVaR=q_cvar,
-        c_port_VaR=c_var,
-        c_port_CVaR=c_cvar,
-        q_mvar=q_mvar,
-        q_comp_var=q_comp_var,
-        tickers=TICKERS
+    # Full metric grid for the run history: every confidence level at every horizon,
+    # evaluated on the same scenarios (GBM shocks rescaled to the horizon)
+    metric_rows = []
+    for horizon in HORIZONS + [TRADING_DAYS]:
+        T = horizon / TRADING_DAYS
+        for engine, asset_returns, lr in (("quantum", q_returns, q_lr), ("classical", c_returns, c_lr)):
+            if horizon != TRADING_DAYS:
+                asset_returns = rescale_horizon(asset_returns, mu, sigma, 1.0, T)
+            port = np.dot(asset_returns, port_weights)
+            for cl in CONFIDENCE_LEVELS:
+                v, cv = _var_cvar(port, lr, cl)
+                metric_rows.append((engine, cl, horizon, float(v), float(cv)))
+    
+    # 5. Persist State (versioned per run; asset-level scenarios kept for later slicing)
+    # Quantum scenarios are stored compactly as packed codes + shock lookup table,
+    # see src.engine.compact.rebuild_returns
+    arrays = {
+        "q_codes": pack_codes(q_codes, QUBITS_PER_ASSET),
+        "q_shock_lut": q_engine.shock_lookup_table(),
+        "c_asset_returns": c_returns,
+        "portfolio_returns_q": q_port_returns,
+        "portfolio_returns_c": c_port_returns,
+    }
+    is_meta = None
+    if importance_sampling:
+        arrays["q_lr_weights"] = q_lr
+        arrays["c_lr_weights"] = c_lr
+        is_meta = {
+            "shift": IS_SHIFT,
+            "tilt": tilt.tolist(),
+            "ess_quantum": effective_sample_size(q_lr),
+            "ess_classical": effective_sample_size(c_lr),
+        }
+    write_run(
+        run_id,
+        arrays=arrays,
+        metrics={
+            "q_port_VaR": float(q_var),
+            "q_port_CVaR": float(q_cvar),
+            "c_port_VaR": float(c_var),
+            "c_port_CVaR": float(c_cvar),
+            "q_mvar": q_mvar.tolist(),
+            "c_mvar": c_mvar.tolist(),
+            "q_comp_var": q_comp_var.tolist(),
+            "by_confidence": by_confidence,
+        },
+        mode=mode,
+        shots=shots,
+        tickers=list(TICKERS),
+        weights=weights.tolist(),
+        dtype=str(q_engine.dtype),
+        qubits_per_asset=QUBITS_PER_ASSET,
+        calibration={
+            "mu": mu.tolist(),
+            "sigma": sigma.tolist(),
+            "chol": np.linalg.cholesky(corr).tolist(),
+            "T": 1.0,
+        },
+        importance_sampling=is_meta,
+        adaptive=adaptive,
     )
     
     # Log Execution
@@ -75,27 +283,32 @@ def run_scenario_risk(mode="FULL"):
         "quantum_cvar_95": float(q_cvar),
         "classical_cvar_95": float(c_cvar)
     }
-    log_execution(mode, "SUCCESS", metrics)
-    
-    # 6. Generate Plots
-    plt.figure(figsize=(8,5))
-    plt.hist(c_port_returns, bins=50, density=True, alpha=0.6, label="Classical")
-    plt.hist(q_port_returns, bins=50, density=True, alpha=0.6, label="Quantum")
-    plt.axvline(-c_var, linestyle="--", label="Classical VaR")
-    plt.axvline(-q_var, linestyle="--", label="Quantum VaR", color="red")
-    plt.axvline(-c_cvar, linestyle=":", label="Classical CVaR")
-    plt.axvline(-q_cvar, linestyle=":", label="Quantum CVaR", color="red")
-    plt.xlabel("Returns")
-    plt.ylabel("Density")
-    plt.title("Quantum vs Classical Portfolio Risk Distribution")
-    plt.legend(loc="upper right")
-    plt.tight_layout()
-    plt.savefig("figures/distribution.png", dpi=300)
-    plt.close()
+    rel_error = adaptive["achieved_rel_error"] if adaptive else None
+    # Audit rows are written behind the pipeline by the audit writer thread
+    audit = get_audit_writer()
+    audit.submit_rows(log_executions, [(
+        datetime.utcnow().isoformat(), mode, "SUCCESS",
+        metrics["quantum_var_95"], metrics["classical_var_95"],
+        metrics["quantum_cvar_95"], metrics["classical_cvar_95"], run_id
+    )])
+    audit.submit_call(record_run, run_id, mode, "SUCCESS", shots=shots, tickers=TICKERS, weights=weights.tolist(),
+                      rel_error=rel_error)
+    audit.submit_rows(log_run_metrics, metric_rows, run_id)
+    audit.submit_rows(log_run_attribution, [
+        (engine, ticker, float(mv), float(cv))
+        for engine, mvar, comp in (("quantum", q_mvar, q_comp_var), ("classical", c_mvar, c_comp_var))
+        for ticker, mv, cv in zip(TICKERS, mvar, comp)
+    ], run_id)
     
-    print("Scenario generation completed.")
+    # Figures are rendered on demand from the stored arrays (src/engine/figures.py)
+    print(f"Scenario generation completed (run {run_id}).")
+    metrics["run_id"] = run_id
+    if adaptive:
+        metrics["shots"] = shots
+        metrics["rel_error"] = rel_error
     return metrics
 
 if __name__ == "__main__":
     mode = os.getenv("QMC_MODE", "FULL")
-    run_scenario_risk(mode)
+    metrics = run_scenario_risk(mode)
+    export_figures(open_run(metrics["run_id"]), ["distribution"])
@@ -1,13 +1,15 @@
 import os
 import numpy as np
-import matplotlib.pyplot as plt
 
 from src.engine.config import TICKERS, DEFAULT_WEIGHTS, FAST_SHOTS
 from src.engine.backtester import get_historical_data
 from src.engine.quantum_engine import QuantumRiskEngine
 from src.engine.risk_metrics import calculate_var_cvar
+from src.engine.scenario_store import update_manifest
+from src.engine.figures import export_figure
+from src.engine.progress import get_reporter
 
-def run_stress_testing(mode="FULL"):
+def run_stress_testing(mode="FULL", run_id=None):
     print("Running volatility stress testing sensitivity analysis...")
     
     # Define volatility shocks (10% to 40%)
@@ -37,7 +39,9 @@ def run_stress_testing(mode="FULL"):
     # We use a fixed mean of zero to isolate the volatility impact (zero-drift assumption)
     mu_zero = np.zeros(len(TICKERS))
     
-    for vol in vol_levels:
+    progress = get_reporter(run_id)
+    for i, vol in enumerate(vol_levels):
+        progress.progress("stress_testing", i, len(vol_levels), unit="volatility levels")
         # Create a volatility vector where assets scale with base volatility
         sigma = np.array([vol * 0.8, vol * 1.3, vol * 0.5])
         
@@ -53,20 +57,15 @@ def run_stress_testing(mode="FULL"):
         c_var, _ = calculate_var_cvar(c_port_returns, 0.95)
         c_vars.append(c_var)
         
-    # Plot results
-    plt.figure(figsize=(8, 5))
-    plt.plot(vol_levels * 100, np.array(q_vars) * 100, marker='o', label="Quantum VaR (95%)", color="red", linewidth=2)
-    plt.plot(vol_levels * 100, np.array(c_vars) * 100, marker='s', label="Classical VaR (95%)", color="blue", linewidth=2, linestyle='--')
-    plt.xlabel("Base Market Volatility (%)")
-    plt.ylabel("Portfolio VaR (%)")
-    plt.title("Volatility Sensitivity Analysis (Stress Testing)")
-    plt.grid(True, linestyle=":", alpha=0.6)
-    plt.legend()
-    plt.tight_layout()
-    
-    plt.savefig("figures/stress_test.png", dpi=300)
-    plt.close()
+    stress = {
+        "vol_levels": vol_levels.tolist(),
+        "quantum_var_95": [float(v) for v in q_vars],
+        "classical_var_95": [float(v) for v in c_vars],
+    }
+    if run_id is not None:
+        update_manifest(run_id, stress=stress)
     print("Stress testing analysis complete.")
+    return stress
 
 if __name__ == "__main__":
-    run_stress_testing()
+    export_figure("stress_test", run_stress_testing())
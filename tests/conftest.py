@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import backend.cache as cache
+from backend.app import app
+from src.engine import scenario_store, database
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(scenario_store, "RUNS_DIR", tmp_path / "runs")
+    database.configure(tmp_path / "test.db")
+    database.init_db()
+    cache.results_cache.clear()
+    cache.results_cache.hits = cache.results_cache.misses = 0
+    metrics = {
+        "q_port_VaR": 0.02, "q_port_CVaR": 0.03, "q_mvar": [0.01, 0.02], "q_comp_var": [0.01, 0.01],
+        "c_port_VaR": 0.021, "c_port_CVaR": 0.031,
+    }
+    arrays = {"portfolio_returns_q": np.linspace(-0.1, 0.1, 50), "portfolio_returns_c": np.zeros(50)}
+    scenario_store.write_run("run-a", arrays, metrics, tickers=["SPY", "GLD"])
+    yield TestClient(app)
+    database.configure()
@@ -0,0 +1,40 @@
+import threading
+from src.engine.audit import AuditWriter
+
+
+def test_rows_are_batched_and_flushed(tmp_path):
+    calls = []
+    writer = AuditWriter()
+
+    def sink(run_id, rows):
+        calls.append((run_id, list(rows)))
+
+    gate = threading.Event()
+    writer.submit_call(gate.wait, 5)  # hold the writer so the next submissions queue up
+    for i in range(10):
+        writer.submit_rows(sink, [(i,)], "run-1")
+    writer.submit_file(tmp_path / "fig.png", b"png-bytes")
+    gate.set()
+
+    assert writer.flush(timeout=5)
+    assert calls == [("run-1", [(i,) for i in range(10)])]
+    assert (tmp_path / "fig.png").read_bytes() == b"png-bytes"
+    stats = writer.stats()
+    assert stats["written"] == 12 and stats["dropped"] == 0
+    writer.close()
+
+
+def test_full_queue_applies_backpressure_then_drops():
+    writer = AuditWriter(max_queue=1, put_timeout=0.05)
+    gate = threading.Event()
+    writer.submit_call(gate.wait, 5)
+    writer.submit_call(lambda: None)  # may be taken by the writer or sit in the queue
+    writer.submit_call(lambda: None)
+    writer.submit_call(lambda: None)
+    assert not writer.flush(timeout=0.05)  # the queue is still full, so the flush marker cannot be queued
+    gate.set()
+
+    stats = writer.stats()
+    assert stats["backpressure_waits"] >= 1
+    assert stats["dropped"] >= 1
+    writer.close()
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from src.engine import batch_risk
+from src.engine.backtester import generate_mock_history
+from src.engine.risk_metrics import calculate_var_cvar
+
+
+@pytest.fixture(autouse=True)
+def offline_history(monkeypatch):
+    calls = []
+
+    def history(tickers, days=500):
+        calls.append(tuple(tickers))
+        np.random.seed(len(tickers))
+        return generate_mock_history(days, len(tickers))
+
+    monkeypatch.setattr(batch_risk, "get_historical_data", history)
+    batch_risk.simulate_universe.cache_clear()
+    batch_risk.result_cache.clear()
+    yield calls
+    batch_risk.simulate_universe.cache_clear()
+
+
+def test_vectorized_evaluation_matches_scalar_estimator():
+    rng = np.random.default_rng(0)
+    # Continuous returns, and coarsely discretised ones (like the quantum sampler's) with many ties
+    for asset_returns in (rng.normal(0, 0.02, size=(5000, 3)), rng.integers(-4, 4, size=(5000, 3)) / 100):
+        weights = rng.dirichlet(np.ones(3), size=20)
+        weights[3] = [1.0, 0.0, 0.0]
+        levels = [0.95, 0.99, 0.999]
+        var, cvar = batch_risk.evaluate_portfolios(asset_returns, weights, levels)
+        for p in (0, 3, 7, 19):
+            for j, level in enumerate(levels):
+                v, cv = calculate_var_cvar(asset_returns @ weights[p], level)
+                assert var[p, j] == pytest.approx(v) and cvar[p, j] == pytest.approx(cv)
+
+
+def test_batch_groups_by_universe_and_memoizes(offline_history):
+    rng = np.random.default_rng(1)
+    portfolios = []
+    for i in range(60):
+        tickers = ["SPY", "AAPL", "GLD"] if i % 2 else ["QQQ", "TLT"]
+        portfolios.append({
+            "tickers": tickers[::-1] if i % 3 == 0 else tickers,
+            "weights": list(rng.dirichlet(np.ones(len(tickers)))),
+            "confidence_levels": [0.99] if i % 4 == 0 else [0.95, 0.99],
+            "horizon_days": 10 if i % 5 == 0 else 1,
+        })
+
+    results, universes = batch_risk.compute_batch(portfolios, as_of="2026-01-02")
+    assert universes == 2 and len(offline_history) == 2
+    assert not any(r["cached"] for r in results)
+    assert set(results[0]["metrics"]["quantum"]) == {"0.99"}
+    assert results[5]["horizon_days"] == 10
+
+    again, universes = batch_risk.compute_batch(portfolios, as_of="2026-01-02")
+    assert universes == 0 and all(r["cached"] for r in again)
+    assert again[3]["metrics"] == results[3]["metrics"]
+
+    # A new data date recalibrates
+    batch_risk.compute_batch(portfolios[:1], as_of="2026-01-05")
+    assert len(offline_history) == 3
+
+
+def test_risk_endpoint_validates_and_serves(client):
+    body = {"portfolios": [{"id": "book-1", "tickers": ["SPY", "GLD"], "weights": [0.7, 0.3]}]}
+    r = client.post("/risk", json=body)
+    assert r.status_code == 200
+    item = r.json()["portfolios"][0]
+    assert item["id"] == "book-1" and item["weights"] == {"SPY": 0.7, "GLD": 0.3}
+    assert item["metrics"]["classical"]["0.99"]["CVaR"] >= item["metrics"]["classical"]["0.99"]["VaR"]
+
+    bad = {"portfolios": [{"tickers": ["SPY", "GLD"], "weights": [1.0]}]}
+    assert client.post("/risk", json=bad).status_code == 422
+
+
+def test_weighted_evaluation_matches_weighted_estimator():
+    from src.engine.risk_metrics import calculate_weighted_var_cvar
+    rng = np.random.default_rng(2)
+    asset_returns = rng.normal(0, 0.02, size=(4000, 2))
+    lr = rng.exponential(1.0, size=4000)
+    weights = rng.dirichlet(np.ones(2), size=5)
+    # Lattice-valued returns (like quantum register codes) put many scenarios on the same portfolio loss
+    lattice = np.round(asset_returns, 2)
+    levels = [0.95, 0.99]
+    for returns in (asset_returns, lattice):
+        var, cvar = batch_risk.evaluate_portfolios(returns, weights, levels, scenario_weights=lr)
+        for p in range(5):
+            for j, level in enumerate(levels):
+                v, cv = calculate_weighted_var_cvar(returns @ weights[p], lr, level)
+                assert var[p, j] == pytest.approx(v) and cvar[p, j] == pytest.approx(cv)
@@ -0,0 +1,79 @@
+import threading
+import pytest
+from src.engine import database
+
+
+@pytest.fixture
+def db(tmp_path):
+    database.configure(tmp_path / "test.db")
+    yield database
+    database.configure()
+
+
+def test_migration_runs_once(db):
+    db.init_db()
+    with db.connection() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == len(db.MIGRATIONS)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert db.migrate(conn) == len(db.MIGRATIONS)
+
+
+def test_batched_writes_and_reads(db):
+    rows = [(f"2026-01-01T00:00:{i:02d}", "FAST", "SUCCESS", 0.1, 0.1, 0.2, 0.2, None) for i in range(50)]
+    db.log_executions(rows)
+    db.log_execution("FULL", "SUCCESS", {"quantum_var_95": 0.3})
+
+    recent = db.get_recent_executions(limit=5)
+    assert len(recent) == 5
+    assert recent[0]["mode"] == "FULL"
+
+
+def test_concurrent_readers_and_writer(db):
+    db.init_db()
+    errors = []
+
+    def writer():
+        try:
+            for i in range(20):
+                db.log_backtest(i, i, 250, "GREEN")
+        except Exception as e:
+            errors.append(e)
+
+    def reader():
+        try:
+            for _ in range(20):
+                db.fetch_all("SELECT COUNT(*) AS n FROM backtest_results")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+    assert db.fetch_all("SELECT COUNT(*) AS n FROM backtest_results")[0]["n"] == 20
+
+
+def test_run_history_keyset_pagination(db):
+    for i in range(7):
+        run_id = f"run-{i}"
+        db.record_run(run_id, "FAST", "SUCCESS", shots=2000, tickers=["SPY", "GLD"],
+                      created_at=f"2026-01-0{i + 1}T00:00:00")
+        db.log_run_metrics(run_id, [("quantum", 0.99, 1, 0.02 + i, 0.03 + i), ("classical", 0.99, 1, 0.02, 0.03)])
+        db.log_backtest_series(run_id, [(d, 0.01, 0.02, 0.02, 0, 0) for d in range(10)])
+
+    page, cursor = db.list_runs(limit=3)
+    assert [r["run_id"] for r in page] == ["run-6", "run-5", "run-4"]
+    assert page[0]["tickers"] == ["SPY", "GLD"]
+    page, cursor = db.list_runs(limit=3, cursor=cursor)
+    assert [r["run_id"] for r in page] == ["run-3", "run-2", "run-1"]
+    page, cursor = db.list_runs(limit=3, cursor=cursor)
+    assert [r["run_id"] for r in page] == ["run-0"] and cursor is None
+
+    history, _ = db.get_metric_history("quantum", 0.99, 1, limit=2)
+    assert [h["var"] for h in history] == [6.02, 5.02]
+
+    series, next_after = db.get_backtest_series("run-0", limit=4)
+    assert [s["day"] for s in series] == [0, 1, 2, 3] and next_after == 3
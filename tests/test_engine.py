@@ -1,7 +1,10 @@
 import numpy as np
 import pytest
-from src.engine.risk_metrics import calculate_var_cvar, calculate_l_var, calculate_marginal_var
+from src.engine.risk_metrics import (
+    calculate_var_cvar, calculate_l_var, calculate_marginal_var, calculate_weighted_var_cvar, batch_means_errors
+)
 from src.engine.quantum_engine import QuantumRiskEngine
+from src.engine.compact import pack_codes, unpack_codes, rebuild_returns
 from src.engine.config import DEFAULT_WEIGHTS
 
 def test_var_cvar_calculation():
@@ -62,3 +65,153 @@ def test_cholesky_correlation():
     # Check empirical correlation is close to 1.0
     empirical_corr = np.corrcoef(r1, r2)[0, 1]
     assert np.isclose(empirical_corr, 1.0, atol=0.05)
+
+def test_packed_codes_rebuild_quantum_returns():
+    engine = QuantumRiskEngine(num_assets=3, qubits_per_asset=4, shots=200, seed=7)
+    mu = np.array([0.05, 0.10, 0.02])
+    sigma = np.array([0.15, 0.25, 0.10])
+    corr = np.array([[1.0, 0.5, 0.0], [0.5, 1.0, 0.2], [0.0, 0.2, 1.0]])
+
+    codes = engine.sample_codes()
+    packed = pack_codes(codes, 4)
+    assert packed.dtype == np.uint16 and packed.shape == (200,)
+    assert np.array_equal(unpack_codes(packed, 3, 4), codes)
+
+    returns = engine.generate_correlated_returns(mu, sigma, corr, codes=codes)
+    rebuilt = rebuild_returns(packed, engine.shock_lookup_table(), np.linalg.cholesky(corr), mu, sigma, 4)
+    assert np.array_equal(rebuilt, returns)
+
+def test_float32_mode():
+    engine = QuantumRiskEngine(num_assets=2, qubits_per_asset=2, shots=500, dtype="float32", seed=1)
+    corr = np.array([[1.0, 0.3], [0.3, 1.0]])
+
+    q_returns = engine.generate_correlated_returns([0.0, 0.0], [0.1, 0.2], corr)
+    c_returns = engine.generate_classical_returns([0.0, 0.0], [0.1, 0.2], corr)
+    assert q_returns.dtype == np.float32
+    assert c_returns.dtype == np.float32
+
+def test_analytic_noise_matches_density_matrix():
+    kwargs = dict(num_assets=2, qubits_per_asset=2, shots=20000, use_noise=True, noise_probability=0.3)
+    analytic = QuantumRiskEngine(noise_model="analytic", sampler="statevector", seed=3, **kwargs)
+    mixed = QuantumRiskEngine(noise_model="density_matrix", seed=3, **kwargs)
+    assert np.array_equal(analytic.theta, mixed.theta)
+
+    # Compare the per-wire outcome frequencies and the CNOT-induced parity between registers
+    a = analytic.apply_noise(np.asarray(analytic.qnode(analytic.theta), dtype=np.uint8))
+    m = np.asarray(mixed.qnode(mixed.theta))
+    assert np.allclose(a.mean(axis=0), m.mean(axis=0), atol=0.02)
+    assert np.isclose(np.mean(a[:, 0] ^ a[:, 2]), np.mean(m[:, 0] ^ m[:, 2]), atol=0.02)
+
+@pytest.mark.parametrize("use_noise", [False, True])
+def test_structured_sampler_matches_statevector(use_noise):
+    kwargs = dict(num_assets=3, qubits_per_asset=2, shots=40000, use_noise=use_noise, noise_probability=0.2)
+    structured = QuantumRiskEngine(sampler="structured", seed=11, **kwargs)
+    statevector = QuantumRiskEngine(sampler="statevector", seed=11, **kwargs)
+
+    def joint_distribution(engine):
+        packed = pack_codes(engine.sample_codes(), 2)
+        return np.bincount(packed, minlength=2 ** 6) / engine.shots
+
+    # Total variation distance between the two empirical joint code distributions
+    tv = 0.5 * np.abs(joint_distribution(structured) - joint_distribution(statevector)).sum()
+    assert tv < 0.03
+
+def test_structured_sampler_scales_to_large_universes():
+    engine = QuantumRiskEngine(num_assets=50, qubits_per_asset=8, shots=2000, seed=0)
+    assert engine.qnode is None
+
+    codes = engine.sample_codes()
+    assert codes.shape == (2000, 50)
+    assert codes.dtype == np.uint8
+    assert len(np.unique(engine.generate_independent_shocks(codes))) > 16
+
+def test_weighted_var_cvar_with_uniform_weights():
+    np.random.seed(0)
+    returns = np.random.normal(0, 0.1, 20000)
+    var, cvar = calculate_var_cvar(returns, 0.99)
+    w_var, w_cvar = calculate_weighted_var_cvar(returns, np.ones_like(returns), 0.99)
+    assert np.isclose(var, w_var, rtol=0.01)
+    assert np.isclose(cvar, w_cvar, rtol=0.01)
+
+def test_importance_sampling_matches_plain_tail_estimate():
+    mu = np.array([0.05, 0.10])
+    sigma = np.array([0.15, 0.25])
+    corr = np.array([[1.0, 0.4], [0.4, 1.0]])
+    weights = np.array([0.5, 0.5])
+
+    reference = QuantumRiskEngine(num_assets=2, qubits_per_asset=2, shots=400000, seed=0)
+    ref_var, _ = calculate_var_cvar(reference.generate_classical_returns(mu, sigma, corr) @ weights, 0.99)
+
+    engine = QuantumRiskEngine(num_assets=2, qubits_per_asset=2, shots=4000, seed=1)
+    tilt = engine.importance_tilt(weights, sigma, corr)
+    returns, lr = engine.generate_classical_returns_is(mu, sigma, corr, tilt)
+    is_var, _ = calculate_weighted_var_cvar(returns @ weights, lr, 0.99)
+    assert np.isclose(is_var, ref_var, rtol=0.03)
+
+    q_returns, q_lr, _ = engine.generate_correlated_returns_is(mu, sigma, corr, tilt)
+    assert q_lr.shape == (4000,)
+    assert np.isclose(q_lr.mean(), 1.0, atol=0.15)
+
+def test_batch_means_errors_match_replication_spread():
+    rng = np.random.default_rng(0)
+    replications = np.array([calculate_var_cvar(rng.normal(0, 0.1, 20000), 0.99) for _ in range(200)])
+    var_se, cvar_se = batch_means_errors(rng.normal(0, 0.1, 20000), 0.99, batches=20)
+    assert np.isclose(var_se, replications[:, 0].std(), rtol=0.4)
+    assert np.isclose(cvar_se, replications[:, 1].std(), rtol=0.4)
+
+def test_adaptive_run_reports_shots_and_achieved_error(client, monkeypatch):
+    import src.scenario_portfolio_risk as spr
+    from src.engine import backtester, database, scenario_store
+
+    np.random.seed(0)
+    history = backtester.generate_mock_history(500)
+    monkeypatch.setattr(spr, "get_historical_data", lambda *a, **k: history)
+    monkeypatch.setattr(spr, "ADAPTIVE_TARGET_REL_ERROR", 0.01)
+    metrics = spr.run_scenario_risk("ADAPTIVE")
+    spr.get_audit_writer().flush()
+
+    adaptive = scenario_store.read_manifest(metrics["run_id"])["adaptive"]
+    # Quantum returns live on a lattice: a quantile sitting on an atom boundary can stall the error
+    assert adaptive["stopped_by"] in ("target", "max_shots")
+    assert (metrics["rel_error"] <= 0.01) == (adaptive["stopped_by"] == "target")
+    assert metrics["shots"] == adaptive["rounds"][-1]["shots"] > spr.ADAPTIVE_INITIAL_SHOTS
+    assert len(scenario_store.open_run(metrics["run_id"]).array("portfolio_returns_q")) == metrics["shots"]
+    row = database.get_run(metrics["run_id"])
+    assert row["shots"] == metrics["shots"] and row["rel_error"] == pytest.approx(metrics["rel_error"])
+
+    monkeypatch.setattr(spr, "ADAPTIVE_MAX_SHOTS", 5000)
+    monkeypatch.setattr(spr, "ADAPTIVE_TARGET_REL_ERROR", 1e-6)
+    capped = spr.run_scenario_risk("ADAPTIVE")
+    assert scenario_store.read_manifest(capped["run_id"])["adaptive"]["stopped_by"] == "max_shots"
+
+def test_importance_sampling_without_structured_sampler_falls_back(client, monkeypatch):
+    import functools
+    import backend.routes.run as run_route
+    import src.scenario_portfolio_risk as spr
+    from src.engine import backtester, scenario_store
+
+    monkeypatch.setattr(run_route, "SAMPLER", "statevector")
+    assert client.post("/run", params={"mode": "FAST", "importance_sampling": True}).status_code == 400
+
+    np.random.seed(0)
+    history = backtester.generate_mock_history(500)
+    monkeypatch.setattr(spr, "get_historical_data", lambda *a, **k: history)
+    monkeypatch.setattr(spr, "QuantumRiskEngine", functools.partial(QuantumRiskEngine, sampler="statevector"))
+    metrics = spr.run_scenario_risk("FAST", importance_sampling=True)
+    spr.get_audit_writer().flush()
+    assert scenario_store.read_manifest(metrics["run_id"])["importance_sampling"] is None
+
+def test_student_t_importance_sampling(monkeypatch):
+    from src.engine import quantum_engine
+    monkeypatch.setattr(quantum_engine, "DISTRIBUTION", "Student-t")
+    mu = np.array([0.05, 0.10])
+    sigma = np.array([0.15, 0.25])
+    corr = np.array([[1.0, 0.4], [0.4, 1.0]])
+    weights = np.array([0.5, 0.5])
+
+    engine = QuantumRiskEngine(num_assets=2, qubits_per_asset=2, shots=20000, seed=3)
+    tilt = engine.importance_tilt(weights, sigma, corr)
+    returns, lr = engine.generate_classical_returns_is(mu, sigma, corr, tilt)
+    assert returns.shape == (20000, 2) and np.all(np.isfinite(lr)) and np.all(lr > 0)
+    # Likelihood ratios of a proper change of measure average to one
+    assert np.isclose(lr.mean(), 1.0, atol=0.1)
@@ -0,0 +1,47 @@
+import os
+
+from src.engine import scenario_store
+from src.engine.figures import figure_path
+
+PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
+
+def test_figures_render_on_demand_and_are_cached(client):
+    scenario_store.update_manifest("run-a", stress={
+        "vol_levels": [0.1, 0.2], "quantum_var_95": [0.1, 0.2], "classical_var_95": [0.11, 0.19],
+    })
+    listed = client.get("/figures", params={"run_id": "run-a"}).json()
+    assert listed["available_figures"] == ["distribution", "stress_test"]
+
+    response = client.get("/figures/stress_test", params={"run_id": "run-a", "dpi": 60})
+    assert response.status_code == 200 and response.headers["content-type"] == "image/png"
+    assert response.content.startswith(PNG_MAGIC)
+    cached = figure_path("run-a", "stress_test", 60, scenario_store.open_run("run-a").version)
+    assert cached.read_bytes() == response.content
+
+    again = client.get("/figures/stress_test", params={"run_id": "run-a", "dpi": 60},
+                       headers={"If-None-Match": response.headers["etag"]})
+    assert again.status_code == 304
+
+
+def test_missing_figures(client):
+    assert client.get("/figures/backtesting", params={"run_id": "run-a"}).status_code == 404
+    assert client.get("/figures/nope").status_code == 404
+    assert client.get("/figures/distribution", params={"dpi": 5000}).status_code == 422
+
+
+def test_cached_figure_is_rerendered_after_the_run_changes(client):
+    checks = {"VaR_95": {"value": 0.02, "limit": 0.03, "status": "OK"}}
+    scenario_store.update_manifest("run-a", limit_checks=checks)
+    first = client.get("/figures/risk_limits", params={"run_id": "run-a", "dpi": 60}).content
+
+    # A limit re-check overwrites limit_checks; bump the mtime in case the rewrite lands in the same tick
+    scenario_store.update_manifest("run-a", limit_checks={"VaR_95": {**checks["VaR_95"], "value": 0.05}})
+    path = scenario_store.run_dir("run-a") / scenario_store.MANIFEST_NAME
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    second = client.get("/figures/risk_limits", params={"run_id": "run-a", "dpi": 60}).content
+    assert second != first
+    assert [p.name for p in (scenario_store.run_dir("run-a") / "figures").iterdir()] == [
+        figure_path("run-a", "risk_limits", 60, scenario_store.open_run("run-a").version).name
+    ]
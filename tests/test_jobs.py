@@ -0,0 +1,119 @@
+import os
+import threading
+import time
+
+import pytest
+from backend.jobs import JobManager, QueueFullError
+from src.engine import scenario_store
+from src.engine.progress import ProgressReporter
+
+
+def _wait(job, timeout=5):
+    deadline = time.time() + timeout
+    while not job.done and time.time() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+def test_identical_requests_coalesce_into_one_run():
+    gate = threading.Event()
+    calls = []
+
+    def pipeline(mode, run_id, **params):
+        calls.append((mode, run_id, params))
+        gate.wait(5)
+        return {"run_id": run_id, "status": "SUCCESS"}
+
+    manager = JobManager(pipeline=pipeline, executor="thread", max_workers=2, max_pending=4)
+    first, coalesced_first = manager.submit("FAST")
+    second, coalesced_second = manager.submit("FAST")
+    other, _ = manager.submit("FAST", importance_sampling=True)
+    gate.set()
+
+    assert not coalesced_first and coalesced_second
+    assert second is first and first.coalesced == 1
+    assert other.run_id != first.run_id
+    assert _wait(first).status == "SUCCESS" and _wait(other).status == "SUCCESS"
+    assert len(calls) == 2
+
+    # Once finished, the same request starts a fresh run
+    again, coalesced = manager.submit("FAST")
+    assert not coalesced and again.run_id != first.run_id
+    _wait(again)
+    manager.shutdown(wait=True)
+
+
+def test_pending_limit_and_failures():
+    gate = threading.Event()
+
+    def pipeline(mode, run_id, **params):
+        gate.wait(5)
+        raise RuntimeError("boom")
+
+    manager = JobManager(pipeline=pipeline, executor="thread", max_workers=1, max_pending=1)
+    job, _ = manager.submit("FULL")
+    with pytest.raises(QueueFullError):
+        manager.submit("FAST")
+    gate.set()
+
+    assert _wait(job).status == "FAILED" and job.error == "boom"
+    assert manager.get(job.run_id).to_dict()["status"] == "FAILED"
+    manager.shutdown(wait=True)
+
+
+def test_started_at_is_set_while_running(tmp_path, monkeypatch):
+    monkeypatch.setattr(scenario_store, "RUNS_DIR", tmp_path)
+    gate, started = threading.Event(), threading.Event()
+
+    def pipeline(mode, run_id, **params):
+        ProgressReporter(run_id).emit("run_started", mode=mode)
+        started.set()
+        gate.wait(5)
+        return {"run_id": run_id}
+
+    manager = JobManager(pipeline=pipeline, executor="thread", max_workers=1, max_pending=2)
+    running, _ = manager.submit("FAST")
+    queued, _ = manager.submit("FULL")
+    assert started.wait(5)
+    assert running.to_dict()["started_at"] is not None
+    assert queued.to_dict()["status"] == "QUEUED" and queued.to_dict()["started_at"] is None
+    gate.set()
+    assert _wait(queued).to_dict()["started_at"] >= running.started_at
+    manager.shutdown(wait=True)
+
+
+def _report_pid(mode, run_id=None, **params):
+    return {"run_id": run_id, "pid": os.getpid()}
+
+
+def test_process_executor_runs_outside_the_api_process():
+    manager = JobManager(pipeline=_report_pid, executor="process", max_workers=1, initializer=None)
+    manager.start()
+    job, _ = manager.submit("FAST")
+
+    assert _wait(job, timeout=60).status == "SUCCESS"
+    assert job.result["run_id"] == job.run_id and job.result["pid"] != os.getpid()
+    assert manager.warmed_up()
+    manager.shutdown(wait=True)
+
+
+def _slow_init():
+    time.sleep(1.0)
+
+
+def test_readiness_follows_worker_warm_up():
+    manager = JobManager(pipeline=_report_pid, executor="process", max_workers=1, initializer=_slow_init)
+    assert manager.readiness() == "STOPPED"
+    manager.start()
+    assert manager.readiness() == "WARMING"
+    deadline = time.time() + 60
+    while manager.readiness() == "WARMING" and time.time() < deadline:
+        time.sleep(0.05)
+    assert manager.readiness() == "READY"
+    manager.shutdown(wait=True)
+
+
+def test_ready_probe_is_unavailable_until_the_pool_is_warm(client):
+    response = client.get("/ready")
+    assert response.status_code == 503 and response.json()["status"] == "STOPPED"
+    assert client.get("/health").status_code == 200
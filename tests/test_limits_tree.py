@@ -0,0 +1,118 @@
+import time
+
+import numpy as np
+import pytest
+
+import src.risk_limits as risk_limits
+from src.engine import scenario_store
+from src.engine.audit import get_audit_writer
+from src.engine.compact import pack_codes
+from src.engine.limits_tree import LimitTree, parse_limit_key
+from src.engine.risk_metrics import calculate_var_cvar
+
+TICKERS = ["SPY", "AAPL", "GLD"]
+
+NODES = [
+    {"id": "FIRM", "parent": None, "limits": {"VaR_95": 1.0, "CVaR_95": 1.0}},
+    {"id": "RATES", "parent": "FIRM", "limits": {"VaR_95": 1e-6}},
+    {"id": "EQ", "parent": "FIRM", "positions": {"SPY": 0.1}},
+    {"id": "EQ-1", "parent": "EQ", "positions": {"SPY": 0.2, "AAPL": 0.3}},
+    {"id": "EQ-2", "parent": "EQ", "positions": {"GLD": 0.4}, "limits": {"VaR_99": 10.0}},
+    {"id": "RATES-1", "parent": "RATES", "positions": {"GLD": 0.5}},
+]
+
+
+def test_limit_keys():
+    assert parse_limit_key("VaR_95") == ("VaR", 0.95)
+    assert parse_limit_key("CVaR_99.5") == ("CVaR", pytest.approx(0.995))
+    with pytest.raises(ValueError):
+        parse_limit_key("ES_95")
+
+
+def test_exposures_aggregate_up_the_tree():
+    tree = LimitTree(NODES, TICKERS)
+    exposure = dict(zip(tree.ids, tree.exposure))
+    assert tree.root == "FIRM" and list(tree.depths) == [0, 1, 1, 2, 2, 2]
+    np.testing.assert_allclose(exposure["EQ"], [0.3, 0.3, 0.4])
+    np.testing.assert_allclose(exposure["EQ"], exposure["EQ-1"] + exposure["EQ-2"] + [0.1, 0, 0])
+    np.testing.assert_allclose(exposure["FIRM"], [0.3, 0.3, 0.9])
+
+    rng = np.random.default_rng(0)
+    returns = rng.normal(0, 0.2, size=(4000, 3))
+    rows = []
+    values, utilization, status = tree.evaluate(returns, on_chunk=rows.extend, chunk=4)
+    assert len(rows) == len(tree) * len(tree.metrics)
+
+    m = tree.metrics.index("VaR_95")
+    var, _ = calculate_var_cvar(returns @ exposure["EQ-1"], 0.95)
+    assert values[tree.index["EQ-1"], m] == pytest.approx(var)
+    assert status[tree.index["RATES"], m] == "BREACH"
+    assert status[tree.index["FIRM"], m] == "PASS"
+    assert status[tree.index["EQ"], m] == "NO_LIMIT" and np.isnan(utilization[tree.index["EQ"], m])
+
+
+@pytest.mark.parametrize("nodes, message", [
+    ([{"id": "A", "parent": None}, {"id": "A", "parent": None}], "Duplicate"),
+    ([{"id": "A", "parent": None}, {"id": "B", "parent": "C"}], "unknown parent"),
+    ([{"id": "A", "parent": None}, {"id": "B", "parent": "C"}, {"id": "C", "parent": "B"}], "cycle"),
+    ([{"id": "A", "parent": None, "positions": {"TSLA": 1.0}}], "scenario universe"),
+])
+def test_invalid_trees_are_rejected(nodes, message):
+    with pytest.raises(ValueError, match=message):
+        LimitTree(nodes, TICKERS)
+
+
+def test_thousands_of_books_in_well_under_a_second():
+    rng = np.random.default_rng(1)
+    tickers = [f"T{i}" for i in range(20)]
+    nodes = [{"id": "FIRM", "parent": None, "limits": {"VaR_95": 0.3, "CVaR_95": 0.4}}]
+    for d in range(30):
+        nodes.append({"id": f"D{d}", "parent": "FIRM", "limits": {"VaR_95": 0.05}})
+        for b in range(100):
+            weights = rng.dirichlet(np.ones(20)) / 3000
+            nodes.append({"id": f"D{d}-B{b}", "parent": f"D{d}", "positions": dict(zip(tickers, weights)),
+                          "limits": {"VaR_95": 1e-5}})
+    tree = LimitTree(nodes, tickers)
+    returns = rng.normal(0.05, 0.2, size=(10_000, 20))
+
+    start = time.perf_counter()
+    values, _, status = tree.evaluate(returns)
+    assert time.perf_counter() - start < 1.0
+    np.testing.assert_allclose(tree.exposure[0], tree.exposure[1:31].sum(axis=0))
+    assert values.shape == (3031, 2) and (status == "BREACH").any()
+
+
+def test_pipeline_stage_persists_every_node(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(risk_limits, "LIMITS_FILE", tmp_path / "risk_limits.json")
+    rng = np.random.default_rng(2)
+    scenario_store.write_run(
+        "run-t",
+        {
+            "q_codes": pack_codes(rng.integers(0, 16, size=(2000, 3)), 4),
+            "q_shock_lut": np.linspace(-2.5, 2.5, 16),
+            "c_asset_returns": rng.normal(0.05, 0.2, size=(2000, 3)),
+        },
+        {},
+        tickers=TICKERS, weights=[0.4, 0.4, 0.2], qubits_per_asset=4,
+        calibration={"mu": [0.05] * 3, "sigma": [0.2] * 3, "chol": np.eye(3).tolist(), "T": 1.0},
+    )
+    tree = LimitTree(NODES, TICKERS)
+    summary = risk_limits.run_risk_limits("run-t", tree=tree)
+    assert get_audit_writer().flush()
+    assert set(summary) == {"Quantum VaR", "Quantum CVaR", "Classical VaR", "Classical CVaR"}
+
+    response = client.get("/results/limits/tree", params={"run_id": "run-t", "limit": 5})
+    body = response.json()
+    assert body["summary"]["nodes"] == len(tree) and len(body["items"]) == 5
+    seen = body["items"]
+    while body["next_cursor"]:
+        body = client.get("/results/limits/tree", params={
+            "run_id": "run-t", "limit": 5, "cursor": body["next_cursor"],
+        }).json()
+        seen += body["items"]
+    assert len(seen) == len(tree) * len(tree.metrics) * 2
+
+    breaches = client.get("/results/limits/tree", params={"run_id": "run-t", "status": "BREACH"}).json()
+    assert {row["node_id"] for row in breaches["items"]} == {"RATES"}
+    assert client.get("/results/limits", params={"run_id": "run-t"}).json() == summary
+    assert client.get("/results/limits/tree", params={"run_id": "run-t", "status": "BAD"}).status_code == 400
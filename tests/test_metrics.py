@@ -0,0 +1,36 @@
+import pickle
+
+from src.engine import database
+from src.engine.metrics import Registry
+
+
+def test_exposition_format_and_worker_merge():
+    worker, api = Registry(), Registry()
+    for registry in (worker, api):
+        registry.counter("runs_total", "Runs.", ("mode", "status"))
+        registry.histogram("stage_seconds", "Stage time.", (0.1, 1.0), ("stage",))
+
+    worker._metrics["runs_total"].inc(mode="FAST", status="SUCCESS")
+    for seconds in (0.05, 0.5, 5.0):
+        worker._metrics["stage_seconds"].observe(seconds, stage='scenario "risk"')
+    api.merge(pickle.loads(pickle.dumps(worker.drain())))  # crosses the process boundary like a job result
+    assert "runs_total" not in worker.render()
+
+    text = api.render()
+    assert "# TYPE stage_seconds histogram" in text
+    assert 'runs_total{mode="FAST",status="SUCCESS"} 1' in text
+    assert 'stage_seconds_bucket{stage="scenario \\"risk\\"",le="0.1"} 1' in text
+    assert 'stage_seconds_bucket{stage="scenario \\"risk\\"",le="+Inf"} 3' in text
+    assert 'stage_seconds_sum{stage="scenario \\"risk\\""} 5.55' in text
+
+
+def test_metrics_route(client):
+    client.get("/results/summary")
+    client.get("/results/summary")
+    client.get("/runs/some-run/profile")
+    text = client.get("/metrics").text
+    assert 'risk_cache_requests_total{cache="results",result="hit"} 1' in text
+    assert 'route="/runs/{run_id}/profile",status="404"' in text
+
+    database.log_backtest(1, 2, 250, "GREEN", "run-a")
+    assert "risk_db_write_seconds_count " in client.get("/metrics").text
@@ -0,0 +1,42 @@
+import pstats
+
+import numpy as np
+import pytest
+
+from src.engine import profiling, scenario_store
+from src.engine.risk_metrics import calculate_var_cvar
+
+
+def test_options():
+    assert profiling.parse_options("all") == set(profiling.OPTIONS)
+    assert profiling.parse_options("spans, cprofile") == {"spans", "cprofile"}
+    assert profiling.parse_options("off") == profiling.parse_options(None) == set()
+    with pytest.raises(ValueError):
+        profiling.parse_options("perf")
+
+
+def test_spans_and_snapshots_are_written_to_the_run(client):
+    returns = np.random.default_rng(0).normal(size=1000)
+    calculate_var_cvar(returns)  # not profiled: nothing active
+    assert profiling.span("x") is profiling.span("y")
+
+    profile = profiling.start_profile("run-a", "all")
+    assert profiling.start_profile("run-b", "spans") is None  # one profiled run per process
+    profile.stage = "scenario_portfolio_risk"
+    for _ in range(3):
+        calculate_var_cvar(returns)
+    report = profiling.stop_profile(profile)
+    assert profiling.span("x") is profiling.span("y")
+
+    spans = {(s["stage"], s["name"]): s for s in report["spans"]}
+    assert spans["scenario_portfolio_risk", "risk.var_cvar"]["count"] == 3
+    assert report["tracemalloc"]["peak_bytes"] > 0 and report["cprofile"]
+
+    body = client.get("/runs/run-a/profile").json()
+    assert body["spans"] == report["spans"]
+    raw = client.get("/runs/run-a/profile", params={"format": "pstats"})
+    path = scenario_store.run_dir("run-a").parent / "run-a.pstats"
+    path.write_bytes(raw.content)
+    assert pstats.Stats(str(path)).total_calls > 0
+    assert client.get("/runs/missing/profile").status_code == 404
+    assert client.post("/run", params={"mode": "FAST", "profile": "perf"}).status_code == 400
@@ -0,0 +1,56 @@
+import json
+import os
+import time
+
+from src.engine import database, progress, scenario_store
+
+
+def test_events_round_trip_and_partial_lines(tmp_path, monkeypatch):
+    monkeypatch.setattr(scenario_store, "RUNS_DIR", tmp_path)
+    reporter = progress.ProgressReporter("run-p")
+    reporter.stage_started("backtesting", 0, 1)
+    for day in range(3):
+        reporter.progress("backtesting", day, 3, unit="days", force=True)
+    reporter.stage_finished("backtesting")
+
+    # A half-written trailing line is left for the next read
+    with open(reporter.path, "ab") as f:
+        f.write(b'{"seq": 99')
+    events, offset = progress.read_events("run-p")
+    assert [e["event"] for e in events] == ["stage_started", "progress", "progress", "progress", "stage_finished"]
+    assert events[-1]["duration_sec"] is not None and events[1]["unit"] == "days"
+    assert progress.read_events("run-p", offset) == ([], offset)
+
+
+def test_sse_stream_replays_and_resumes(client):
+    reporter = progress.ProgressReporter("run-a")
+    reporter.emit("run_started", mode="FAST")
+    reporter.emit("stage_started", stage="scenario_portfolio_risk", index=0, total=1)
+    reporter.emit("run_finished", status="SUCCESS")
+
+    body = client.get("/runs/run-a/events").text
+    data = [json.loads(line[5:]) for line in body.splitlines() if line.startswith("data:")]
+    assert [e["event"] for e in data] == ["run_started", "stage_started", "run_finished"]
+    assert "event: run_finished" in body
+
+    resumed = client.get("/runs/run-a/events", headers={"Last-Event-ID": "2"}).text
+    assert resumed.count("data:") == 1
+    assert client.get("/runs/unknown-run/events").status_code == 404
+
+
+def test_sse_stream_ends_for_orphaned_runs(client):
+    # No job in this process and no final event: a crashed worker whose events file went quiet
+    reporter = progress.ProgressReporter("run-a")
+    reporter.emit("run_started", mode="FAST")
+    old = time.time() - 3600
+    os.utime(reporter.path, (old, old))
+    body = client.get("/runs/run-a/events").text
+    assert [line for line in body.splitlines() if line.startswith("event:")] == [
+        "event: run_started", "event: run_failed"
+    ]
+
+    # A fresh events file, but the run history already says FAILED
+    reporter = progress.ProgressReporter("run-b")
+    reporter.emit("run_started", mode="FAST")
+    database.record_run("run-b", "FAST", "FAILED")
+    assert "event: run_failed" in client.get("/runs/run-b/events").text
@@ -0,0 +1,54 @@
+import os
+
+import backend.cache as cache
+from src.engine import database, scenario_store
+
+
+def test_etag_revalidation_and_invalidation(client):
+    first = client.get("/results/summary")
+    assert first.status_code == 200 and first.json()["run_id"] == "run-a"
+    etag = first.headers["etag"]
+
+    assert client.get("/results/summary", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/results/summary").content == first.content
+    assert cache.results_cache.stats()["hits"] == 1
+
+    # Attaching limits rewrites the manifest: new version, new ETag
+    manifest = scenario_store.run_dir("run-a") / scenario_store.MANIFEST_NAME
+    scenario_store.update_manifest("run-a", limits={"VaR_95": "OK"})
+    st = manifest.stat()
+    os.utime(manifest, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    second = client.get("/results/summary", headers={"If-None-Match": etag})
+    assert second.status_code == 200 and second.headers["etag"] != etag
+
+
+def test_bundle_and_array_windows(client):
+    bundle = client.get("/results/bundle", params={"include_arrays": True}).json()
+    assert bundle["summary"]["portfolio"]["quantum"]["VaR"] == 0.02
+    assert len(bundle["arrays"]["portfolio_returns_quantum"]) == 50
+
+    window = client.get("/results/arrays", params={"start": 10, "stop": 20}).json()
+    assert len(window["portfolio_returns_quantum"]) == 10
+    assert client.get("/results/summary", params={"run_id": "missing"}).status_code == 404
+
+
+def test_latest_version_moves_when_results_are_attached(client):
+    latest = client.get("/results/latest").json()
+    assert latest["run_id"] == "run-a"
+
+    manifest = scenario_store.run_dir("run-a") / scenario_store.MANIFEST_NAME
+    scenario_store.update_manifest("run-a", limits={"VaR_95": "OK"})
+    st = manifest.stat()
+    os.utime(manifest, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert client.get("/results/latest").json()["version"] != latest["version"]
+    assert client.get("/results/latest", params={"run_id": "missing"}).status_code == 404
+
+
+def test_backtest_is_scoped_to_the_run(client):
+    database.log_backtest(3, 4, 250, "YELLOW", run_id="run-b")
+    assert client.get("/results/backtest").status_code == 404
+    assert client.get("/results/bundle").json()["backtest"] is None
+
+    database.log_backtest(1, 2, 250, "GREEN", run_id="run-a")
+    cache.results_cache.clear()
+    assert client.get("/results/backtest").json()["basel_status"] == "GREEN"
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from src.engine import scenario_store
+from src.engine.scenario_store import (
+    new_run_id, write_run, open_run, latest_run_id, list_runs, prune_runs, RunNotFoundError
+)
+
+
+def test_write_and_open_run_memory_mapped(tmp_path):
+    run_id = new_run_id()
+    returns = np.random.normal(0, 0.1, size=(500, 3))
+    write_run(run_id, {"q_asset_returns": returns}, {"q_port_VaR": 0.2}, root=tmp_path, mode="FAST")
+
+    run = open_run(root=tmp_path)
+    assert run.run_id == run_id
+    assert run.manifest["mode"] == "FAST"
+    assert run.metrics["q_port_VaR"] == 0.2
+
+    arr = run.array("q_asset_returns")
+    assert isinstance(arr, np.memmap)
+    assert np.array_equal(arr[10:20], returns[10:20])
+
+
+def test_runs_are_versioned_and_pruned(tmp_path):
+    ids = []
+    for i in range(5):
+        run_id = f"20260101T00000{i}-run{i}"
+        write_run(run_id, {"x": np.arange(10.0)}, {}, root=tmp_path)
+        ids.append(run_id)
+
+    assert latest_run_id(tmp_path) == ids[-1]
+    assert list_runs(tmp_path) == ids
+
+    removed = prune_runs(keep=2, root=tmp_path)
+    assert removed == ids[:3]
+    assert list_runs(tmp_path) == ids[3:]
+
+
+def test_missing_run_and_invalid_id(tmp_path):
+    with pytest.raises(RunNotFoundError):
+        open_run(root=tmp_path)
+    with pytest.raises(ValueError):
+        open_run("../etc", root=tmp_path)
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from src.engine import backtester, price_store
+from src.engine.synthetic import synthetic_returns, synthetic_history, write_synthetic_market
+
+
+def test_synthetic_returns_are_seeded_fat_tailed_and_clustered():
+    returns, states = synthetic_returns(40, 2520, seed=7)
+    again, _ = synthetic_returns(40, 2520, seed=7)
+    assert returns.shape == (2520, 40) and np.array_equal(returns, again)
+    assert not np.array_equal(returns, synthetic_returns(40, 2520, seed=8)[0])
+
+    centered = returns - returns.mean(axis=0)
+    excess_kurtosis = (centered ** 4).mean(axis=0) / centered.var(axis=0) ** 2 - 3
+    assert np.median(excess_kurtosis) > 1
+    abs_returns = np.abs(centered)
+    acf = [np.corrcoef(abs_returns[1:, i], abs_returns[:-1, i])[0, 1] for i in range(40)]
+    assert np.median(acf) > 0.05
+
+    assert 0 < states.mean() < 0.5
+    off_diagonal = ~np.eye(40, dtype=bool)
+    calm = np.corrcoef(returns[states == 0], rowvar=False)[off_diagonal].mean()
+    stressed = np.corrcoef(returns[states == 1], rowvar=False)[off_diagonal].mean()
+    assert stressed > calm > 0
+    assert synthetic_history(["A", "B"], 300).shape == (300, 2)
+
+
+def test_price_store_feeds_get_historical_data(tmp_path, monkeypatch):
+    manifest = write_synthetic_market(12, 400, seed=3, root=tmp_path)
+    assert manifest["tickers"][:3] == ["SPY", "AAPL", "GLD"] and manifest["days"] == 401
+
+    monkeypatch.setattr(price_store, "PRICE_STORE_DIR", tmp_path)
+    monkeypatch.setattr(backtester, "PRICE_SOURCE", "local")
+    history = backtester.get_historical_data(["GLD", "SYN00002"], days=250)
+    expected, _ = synthetic_returns(12, 400, seed=3)
+    np.testing.assert_allclose(history, expected[-250:, [2, 4]])
+
+    with pytest.raises(price_store.MissingPricesError):
+        backtester.get_historical_data(["QQQ"])
+    assert np.array_equal(
+        backtester.generate_mock_history(50, seed=1), backtester.generate_mock_history(50, seed=1)
+    )
@@ -0,0 +1,52 @@
+import io
+
+import numpy as np
+import pytest
+
+from backend import transport
+
+
+def test_negotiation_prefers_format_then_accept_quality():
+    assert transport.negotiate(None) == transport.MEDIA_JSON
+    assert transport.negotiate("application/x-npy;q=0.5, application/octet-stream") == transport.MEDIA_RAW
+    assert transport.negotiate("text/html, */*") == transport.MEDIA_JSON
+    assert transport.negotiate("application/json", "npy") == transport.MEDIA_NPY
+    with pytest.raises(ValueError):
+        transport.negotiate(None, "csv")
+
+
+def test_binary_arrays_round_trip(client):
+    expected = np.linspace(-0.1, 0.1, 50)[5:25].astype("<f4")
+
+    raw = client.get("/results/arrays", params={"start": 5, "stop": 25},
+                     headers={"Accept": "application/octet-stream"})
+    assert raw.headers["x-array-shape"] == "20,2" and raw.headers["x-array-dtype"] == "<f4"
+    matrix = np.frombuffer(raw.content, dtype="<f4").reshape(20, 2)
+    np.testing.assert_array_equal(matrix[:, 0], expected)
+
+    npy = client.get("/results/arrays", params={"start": 5, "stop": 25, "format": "npy", "series": "quantum"})
+    np.testing.assert_array_equal(np.load(io.BytesIO(npy.content))[:, 0], expected)
+
+    etag = raw.headers["etag"]
+    assert client.get("/results/arrays", params={"start": 5, "stop": 25},
+                      headers={"Accept": "application/octet-stream", "If-None-Match": etag}).status_code == 304
+
+
+def test_arrow_stream(client):
+    pa = pytest.importorskip("pyarrow")
+    r = client.get("/results/arrays", params={"format": "arrow"})
+    table = pa.ipc.open_stream(r.content).read_all()
+    assert table.column_names == ["quantum", "classical"] and table.num_rows == 50
+
+
+def test_distribution_summaries(client):
+    hist = client.get("/results/distribution/histogram", params={"bins": 10}).json()
+    assert len(hist["edges"]) == 11 and sum(hist["series"]["quantum"]["counts"]) == 50
+
+    quantiles = client.get("/results/distribution/quantiles", params={"q": "0.05,0.5"}).json()
+    assert quantiles["series"]["quantum"][1] == pytest.approx(0.0, abs=1e-12)
+
+    tail = client.get("/results/distribution/tail",
+                      params={"series": "quantum", "confidence": 0.9, "max_points": 3}).json()["series"]["quantum"]
+    assert tail["returns"][0] == pytest.approx(-0.1) and len(tail["returns"]) == 3
+    assert tail["tail_count"] >= 3